@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from typing import Any, Coroutine, Optional, Set
+
+
+logger = logging.getLogger("library_api")
+
+# Strong references: the event loop only keeps weak ones to tasks
+_tasks: Set[asyncio.Task] = set()
+
+# Application loop, for work submitted from threads (sync endpoints)
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def bind_loop() -> None:
+    """Remember the running loop as the application loop (startup)."""
+    global _loop
+    _loop = asyncio.get_running_loop()
+
+
+def spawn(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Run a coroutine in the background on the running loop.
+
+    Exceptions are logged instead of being lost with the task.
+
+    Args:
+        coro (Coroutine): Coroutine to run.
+
+    Returns:
+        asyncio.Task: The scheduled task.
+    """
+    task = asyncio.get_running_loop().create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+def submit(coro: Coroutine[Any, Any, Any]) -> Optional[asyncio.Task]:
+    """Run a coroutine in the background from any thread.
+
+    On the loop thread this is ``spawn``; from other threads the coroutine
+    is handed to the application loop. Without a loop it is discarded.
+
+    Args:
+        coro (Coroutine): Coroutine to run.
+
+    Returns:
+        Optional[asyncio.Task]: The task, when scheduled from the loop
+            thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        if _loop is None or _loop.is_closed():
+            coro.close()
+            logger.warning("No event loop for background task, skipped")
+            return None
+        _loop.call_soon_threadsafe(spawn, coro)
+        return None
+    return spawn(coro)
+
+
+def _on_done(task: asyncio.Task) -> None:
+    """Drop the task reference and log unexpected failures."""
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            f"Background task failed: {task.exception()!r}"
+        )
+
+
+async def cancel_all() -> None:
+    """Cancel pending background tasks (application shutdown)."""
+    for task in list(_tasks):
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    global _loop
+    _loop = None
@@ -1,96 +1,575 @@
-import json
+import fnmatch
+import inspect
 import logging
-from typing import Any, Optional
-import redis
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+)
 
+from app.core.cache_backends import CacheBackend, get_backend
+from app.core.codecs import CodecError, serializer
 from app.core.config import settings
+from app.core.metrics import (
+    CACHE_BACKEND_LATENCY, CACHE_BYTES, CACHE_EVICTIONS, CACHE_ITEMS,
+    CACHE_TIER_REQUESTS, Sample, metrics
+)
+
+
+_MISSING = object()
+
+
+def cache_tag(resource: str, ident: Any = None) -> str:
+    """Build an invalidation tag.
+
+    Args:
+        resource (str): Resource name, e.g. a table name or a
+            ``CACHE_KEYS`` value.
+        ident (Any, optional): Resource id. Defaults to None.
+
+    Returns:
+        str: ``resource`` or ``resource:ident``.
+    """
+    if ident is None:
+        return resource
+    return f"{resource}:{ident}"
+
+
+class LocalCache:
+    """In-process LRU cache with per-key TTL and a memory budget.
+
+    Entry sizes are approximated by the length of their serialized form,
+    so ``max_bytes`` bounds the cached payload rather than the exact
+    interpreter memory.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        max_bytes: Optional[int],
+        default_ttl: int
+    ) -> None:
+        """Initialize local cache.
+
+        Args:
+            max_items (int): Maximum number of entries.
+            max_bytes (Optional[int]): Maximum total size of entries in
+                bytes, or None to bound the cache by ``max_items`` only.
+            default_ttl (int): Default time to live in seconds.
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Get value from local cache.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Any: Cached value or ``_MISSING`` if absent or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return _MISSING
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        size: int = 0,
+        ttl: Optional[float] = None
+    ) -> bool:
+        """Set value in local cache.
+
+        Args:
+            key (str): Cache key.
+            value (Any): Value to cache.
+            size (int): Approximate size of the value in bytes. Only
+                needed with a ``max_bytes`` budget.
+            ttl (Optional[float]): Time to live in seconds. Capped by the
+                default TTL so remote invalidations are picked up.
+
+        Returns:
+            bool: True if the value was stored, False if it is too large.
+        """
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return False
+
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, time.monotonic() + ttl, size)
+            self.size_bytes += size
+
+            while (
+                len(self._data) > self.max_items or (
+                    self.max_bytes is not None
+                    and self.size_bytes > self.max_bytes
+                )
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete value from local cache.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            bool: True if the key was present.
+        """
+        with self._lock:
+            return self._remove(key)
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete local entries whose key matches a glob pattern.
+
+        Args:
+            pattern (str): Glob-style pattern, as accepted by Redis SCAN.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            keys = fnmatch.filter(list(self._data), pattern)
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Clear all local entries."""
+        with self._lock:
+            self._data.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get local cache statistics.
+
+        Returns:
+            Dict[str, int]: Hit, miss and eviction counters and usage.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "items": len(self._data),
+            "bytes": self.size_bytes
+        }
+
+    def _remove(self, key: str) -> bool:
+        """Remove an entry. Caller must hold the lock."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self.size_bytes -= entry[2]
+        return True
 
 
 class Cache:
-    """Redis cache implementation."""
-    
-    def __init__(self) -> None:
-        """Initialize cache connection."""
-        try:
-            self.redis = redis.from_url(settings.REDIS_URL)
-            self.logger = logging.getLogger("library_api")
-        except redis.ConnectionError as e:
-            self.logger.error(f"Failed to connect to Redis: {str(e)}")
-            raise
-    
-    def get(self, key: str) -> Optional[Any]:
+    """Two-tier cache: in-process LRU in front of a shared backend.
+
+    The local tier keeps the serialized form of each value and decodes it
+    on every hit, so callers always get their own copy, as with a backend
+    hit, and never alter what later requests read.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None) -> None:
+        """Initialize cache.
+
+        Args:
+            backend (Optional[CacheBackend]): Backend to use instead of
+                the one selected by ``CACHE_BACKEND``. Defaults to None.
+        """
+        self.logger = logging.getLogger("library_api")
+        self.local = LocalCache(
+            max_items=settings.LOCAL_CACHE_MAX_ITEMS,
+            max_bytes=settings.LOCAL_CACHE_MAX_BYTES,
+            default_ttl=settings.LOCAL_CACHE_TTL
+        )
+        self.backend_hits = 0
+        self.backend_misses = 0
+        self._backend = backend
+
+    @property
+    def backend(self) -> CacheBackend:
+        """Shared backend, the configured one unless overridden."""
+        if self._backend is not None:
+            return self._backend
+        return get_backend()
+
+    async def get(self, key: str) -> Optional[Any]:
         """Get value from cache.
-        
+
+        The local tier is checked first; the backend is only queried on a
+        local miss and the result is promoted to the local tier.
+
         Args:
             key (str): Cache key.
-            
+
         Returns:
             Optional[Any]: Cached value or None if not found.
         """
-        try:
-            value = self.redis.get(key)
-            if value:
-                return json.loads(value)
-            return None
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to decode cached value: {str(e)}")
-            return None
-        except Exception as e:
-            self.logger.error(f"Cache get error: {str(e)}")
-            return None
-    
-    def set(
+        return (await self.get_many([key])).get(key)
+
+    async def set(
         self,
         key: str,
         value: Any,
-        expire: Optional[int] = None
+        expire: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
         """Set value in cache.
-        
+
         Args:
             key (str): Cache key.
             value (Any): Value to cache.
             expire (Optional[int]): Expiration time in seconds.
-            
+            tags (Optional[Iterable[str]]): Invalidation tags the entry is
+                registered under. Defaults to None.
+
+        Returns:
+            bool: True if successful, False otherwise.
+        """
+        return await self.set_many(
+            {key: value},
+            expire,
+            tags={key: tags} if tags else None
+        )
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values in one round trip.
+
+        Keys found in the local tier are not sent to the backend; the rest
+        are fetched in a single call and promoted to the local tier.
+
+        Args:
+            keys (Iterable[str]): Cache keys.
+
+        Returns:
+            Dict[str, Any]: Cached values of the keys that were found.
+        """
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            raw = self.local.get(key)
+            if raw is _MISSING:
+                missing.append(key)
+                continue
+            try:
+                found[key] = serializer.decode(raw)
+            except CodecError as e:
+                self.logger.error(f"Failed to decode cached value: {str(e)}")
+                self.local.delete(key)
+                missing.append(key)
+        if not missing:
+            return found
+
+        backend = self.backend
+        try:
+            with metrics.timer(
+                CACHE_BACKEND_LATENCY, backend=backend.name, operation="get"
+            ):
+                entries = await backend.get_many(missing)
+        except Exception as e:
+            self.logger.error(f"Cache get error: {str(e)}")
+            return found
+
+        for key, (raw, ttl) in zip(missing, entries):
+            if not raw:
+                self.backend_misses += 1
+                continue
+            try:
+                value = serializer.decode(raw)
+            except CodecError as e:
+                self.logger.error(f"Failed to decode cached value: {str(e)}")
+                continue
+            self.backend_hits += 1
+            found[key] = value
+            self.local.set(key, raw, len(raw), ttl)
+        return found
+
+    async def set_many(
+        self,
+        items: Mapping[str, Any],
+        expire: Optional[int] = None,
+        ttls: Optional[Mapping[str, Optional[int]]] = None,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> bool:
+        """Set several values in one round trip.
+
+        Args:
+            items (Mapping[str, Any]): Values by cache key.
+            expire (Optional[int]): Default expiration time in seconds.
+            ttls (Optional[Mapping[str, Optional[int]]]): Per-key
+                expiration overriding ``expire``.
+            tags (Optional[Mapping[str, Iterable[str]]]): Invalidation tags
+                by cache key.
+
         Returns:
             bool: True if successful, False otherwise.
         """
+        if not items:
+            return True
+        ttls = ttls or {}
         try:
-            serialized = json.dumps(value)
-            if expire:
-                return bool(self.redis.setex(key, expire, serialized))
-            return bool(self.redis.set(key, serialized))
+            encoded = {
+                key: (serializer.encode(value), ttls.get(key, expire))
+                for key, value in items.items()
+            }
+            backend = self.backend
+            with metrics.timer(
+                CACHE_BACKEND_LATENCY, backend=backend.name, operation="set"
+            ):
+                await backend.set_many(encoded, tags)
         except Exception as e:
+            for key in items:
+                self.local.delete(key)
             self.logger.error(f"Cache set error: {str(e)}")
             return False
-    
-    def delete(self, key: str) -> bool:
+
+        for key, (serialized, key_expire) in encoded.items():
+            self.local.set(key, serialized, len(serialized), key_expire)
+        return True
+
+    async def get_or_load_many(
+        self,
+        ids: Iterable[Hashable],
+        loader: Callable[[List[Hashable]], Any],
+        key: Callable[[Hashable], str] = str,
+        expire: Optional[int] = None,
+        tags: Optional[Callable[[Hashable], Iterable[str]]] = None
+    ) -> Dict[Hashable, Any]:
+        """Get values by id, loading only the missing ones.
+
+        The loader receives every missing id at once, so a single ``IN``
+        query serves the whole batch::
+
+            await cache.get_or_load_many(
+                ids,
+                lambda missing: {
+                    livro.id: jsonable_encoder(livro)
+                    for livro in db.query(Livro).filter(
+                        Livro.id.in_(missing)
+                    )
+                },
+                key=lambda livro_id: f"livro:{livro_id}",
+                tags=lambda livro_id: [cache_tag("livro", livro_id)]
+            )
+
+        Args:
+            ids (Iterable[Hashable]): Ids to fetch.
+            loader (Callable[[List[Hashable]], Any]): Sync or async
+                function returning a mapping of id to value for the ids
+                it found.
+            key (Callable[[Hashable], str]): Cache key of an id.
+            expire (Optional[int]): Expiration time in seconds.
+            tags (Optional[Callable[[Hashable], Iterable[str]]]):
+                Invalidation tags of an id.
+
+        Returns:
+            Dict[Hashable, Any]: Values of the ids that were found, in
+                request order.
+        """
+        keys = {item_id: key(item_id) for item_id in ids}
+        cached = await self.get_many(keys.values())
+
+        missing = [
+            item_id for item_id, item_key in keys.items()
+            if item_key not in cached
+        ]
+        loaded: Mapping[Hashable, Any] = {}
+        if missing:
+            loaded = loader(missing)
+            if inspect.isawaitable(loaded):
+                loaded = await loaded
+            # Loaders may return rows that were not asked for (an IN query
+            # matching more, ids of another type): keep the requested ones
+            loaded = {
+                item_id: value for item_id, value in loaded.items()
+                if item_id in keys
+            }
+            await self.set_many(
+                {keys[item_id]: value for item_id, value in loaded.items()},
+                expire,
+                tags={
+                    keys[item_id]: tags(item_id) for item_id in loaded
+                } if tags else None
+            )
+
+        values = {}
+        for item_id, item_key in keys.items():
+            if item_key in cached:
+                values[item_id] = cached[item_key]
+            elif item_id in loaded:
+                values[item_id] = loaded[item_id]
+        return values
+
+    async def delete(self, key: str) -> bool:
         """Delete value from cache.
-        
+
         Args:
             key (str): Cache key.
-            
+
         Returns:
             bool: True if successful, False otherwise.
         """
+        return bool(await self.delete_many([key]))
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several values in one round trip.
+
+        Args:
+            keys (Iterable[str]): Cache keys.
+
+        Returns:
+            int: Number of backend keys removed.
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        for key in keys:
+            self.local.delete(key)
         try:
-            return bool(self.redis.delete(key))
+            return await self.backend.delete_many(keys)
         except Exception as e:
             self.logger.error(f"Cache delete error: {str(e)}")
-            return False
-    
-    def clear(self) -> bool:
+            return 0
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every entry registered under any of the given tags.
+
+        Only the members of the tags are touched, so the cost is
+        proportional to the number of invalidated entries rather than to
+        the size of the keyspace.
+
+        Args:
+            *tags (str): Invalidation tags.
+
+        Returns:
+            int: Number of backend keys removed.
+        """
+        if not tags:
+            return 0
+        try:
+            deleted, keys = await self.backend.invalidate_tags(list(tags))
+        except Exception as e:
+            self.logger.error(f"Cache invalidate error: {str(e)}")
+            return 0
+        for key in keys:
+            self.local.delete(key)
+        return deleted
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete entries matching a glob pattern.
+
+        The Redis backend uses incremental SCAN so Redis is never blocked
+        the way KEYS blocks it. Prefer ``invalidate_tags`` for known
+        resources.
+
+        Args:
+            pattern (str): Glob-style key pattern.
+
+        Returns:
+            int: Number of backend keys removed.
+        """
+        self.local.delete_matching(pattern)
+        try:
+            return await self.backend.delete_pattern(pattern)
+        except Exception as e:
+            self.logger.error(f"Cache delete pattern error: {str(e)}")
+            return 0
+
+    async def clear(self) -> bool:
         """Clear all cache entries.
-        
+
         Returns:
             bool: True if successful, False otherwise.
         """
+        self.local.clear()
         try:
-            return bool(self.redis.flushdb())
+            return await self.backend.clear()
         except Exception as e:
             self.logger.error(f"Cache clear error: {str(e)}")
             return False
 
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get hit/miss statistics per tier.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Statistics for the local tier and
+                the backend.
+        """
+        return {
+            "local": self.local.stats(),
+            "backend": {
+                "hits": self.backend_hits,
+                "misses": self.backend_misses
+            }
+        }
+
+    async def collect_metrics(self) -> List[Sample]:
+        """Report per-tier statistics to the metrics registry.
+
+        Returns:
+            List[Sample]: Lookups, evictions and size of each tier. Backend
+                size and evictions are omitted if it cannot be reached.
+        """
+        local = self.local.stats()
+        backend = self.backend
+        samples: List[Sample] = [
+            (CACHE_TIER_REQUESTS, {"tier": "local", "result": "hit"},
+             local["hits"]),
+            (CACHE_TIER_REQUESTS, {"tier": "local", "result": "miss"},
+             local["misses"]),
+            (CACHE_TIER_REQUESTS, {"tier": backend.name, "result": "hit"},
+             self.backend_hits),
+            (CACHE_TIER_REQUESTS, {"tier": backend.name, "result": "miss"},
+             self.backend_misses),
+            (CACHE_EVICTIONS, {"tier": "local"}, local["evictions"]),
+            (CACHE_ITEMS, {"tier": "local"}, local["items"]),
+            (CACHE_BYTES, {"tier": "local"}, local["bytes"])
+        ]
+        try:
+            backend_stats = await backend.stats()
+        except Exception as e:
+            self.logger.warning(f"Cache stats error: {str(e)}")
+            return samples
+        for name, stat in (
+            (CACHE_EVICTIONS, "evictions"),
+            (CACHE_ITEMS, "items"),
+            (CACHE_BYTES, "bytes")
+        ):
+            if stat in backend_stats:
+                samples.append(
+                    (name, {"tier": backend.name}, backend_stats[stat])
+                )
+        return samples
+
 
-# Create cache instance
-cache = Cache() 
\ No newline at end of file
+# Create cache instance (no connection is opened at import time)
+cache = Cache()
+metrics.register_collector(cache.collect_metrics)
@@ -0,0 +1,827 @@
+import asyncio
+import fnmatch
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+)
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+from app.core.redis_pool import close_redis, get_redis, init_redis
+
+
+logger = logging.getLogger("library_api")
+
+# Prefix of the Redis sets holding the keys registered under a tag
+TAG_PREFIX = "tag:"
+
+# Keys deleted per command when clearing by pattern or by tag
+SCAN_BATCH_SIZE = 500
+
+# Deletes a lock only if it still belongs to whoever acquired it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Adds a key to a tag set. New sets get the key's TTL and sets with a TTL
+# are only extended, while sets made persistent by a member without
+# expiration stay so (``EXPIRE NX``/``GT`` would require Redis 7)
+REGISTER_TAG_SCRIPT = """
+local created = redis.call("exists", KEYS[1]) == 0
+redis.call("sadd", KEYS[1], ARGV[1])
+local expire = tonumber(ARGV[2])
+local ttl = redis.call("ttl", KEYS[1])
+if created or (ttl >= 0 and ttl < expire) then
+    redis.call("expire", KEYS[1], expire)
+end
+return 0
+"""
+
+# Reads and deletes tag sets and their keys at once, so keys registered
+# concurrently are not dropped from a set without being deleted. Returns
+# the number of keys deleted (tag sets excluded) and the keys
+INVALIDATE_TAGS_SCRIPT = """
+local keys, seen = {}, {}
+for _, tag_key in ipairs(KEYS) do
+    for _, key in ipairs(redis.call("smembers", tag_key)) do
+        if not seen[key] then
+            seen[key] = true
+            keys[#keys + 1] = key
+        end
+    end
+end
+local deleted = 0
+for i = 1, #keys, tonumber(ARGV[1]) do
+    local last = math.min(i + tonumber(ARGV[1]) - 1, #keys)
+    deleted = deleted + redis.call("unlink", unpack(keys, i, last))
+end
+redis.call("unlink", unpack(KEYS))
+return {deleted, keys}
+"""
+
+# (value, expire in seconds) pairs written by ``set_many``
+Items = Mapping[str, Tuple[bytes, Optional[float]]]
+
+# (value, remaining time to live in seconds) pairs read by ``get_many``
+Entry = Tuple[Optional[bytes], Optional[float]]
+
+
+def register_tags(
+    pipe: Any,
+    key: str,
+    tags: Iterable[str],
+    expire: Optional[float] = None
+) -> None:
+    """Queue commands adding ``key`` to the sets of ``tags``.
+
+    Tag sets never expire before their members: the TTL is set if the set
+    has none and only extended afterwards. Tags of keys without expiration
+    are kept persistent. Runs on Redis versions before 7.0, which lack
+    ``EXPIRE NX``/``GT``.
+
+    Args:
+        pipe (Any): Redis pipeline.
+        key (str): Cache key.
+        tags (Iterable[str]): Invalidation tags.
+        expire (Optional[float]): Expiration of ``key`` in seconds.
+    """
+    if expire:
+        expire = math.ceil(expire)
+    for tag in tags:
+        tag_key = f"{TAG_PREFIX}{tag}"
+        if expire:
+            pipe.eval(REGISTER_TAG_SCRIPT, 1, tag_key, key, expire)
+        else:
+            pipe.sadd(tag_key, key)
+            pipe.persist(tag_key)
+
+
+class CacheBackend(ABC):
+    """Storage used by ``Cache`` and the response cache.
+
+    Values are opaque bytes. Plain values and hashes (named fields, used
+    for cached responses) live under keys that expire and can be
+    registered under invalidation tags. Errors are raised to the caller,
+    which decides how to fail open.
+    """
+
+    name = ""
+
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> List[Entry]:
+        """Get plain values and their remaining TTL, in key order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_many(
+        self,
+        items: Items,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> None:
+        """Set plain values with optional expiration and tags."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_many(self, keys: List[str]) -> int:
+        """Delete keys, returning how many existed."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether a key exists."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Set a value only if the key does not exist (locks)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_if_equal(self, key: str, value: bytes) -> bool:
+        """Delete a key only if it still holds ``value`` (unlock)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def hget(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        """Get fields of a hash, in field order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def hset(
+        self,
+        key: str,
+        mapping: Mapping[str, bytes],
+        expire: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> None:
+        """Replace a hash with the given fields."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate_tags(self, tags: List[str]) -> Tuple[int, Set[str]]:
+        """Delete the keys registered under tags.
+
+        Returns:
+            Tuple[int, Set[str]]: Number of keys removed and the keys, so
+                upper tiers can drop them too.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_pattern(self, pattern: str) -> int:
+        """Delete keys matching a glob pattern."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear(self) -> bool:
+        """Delete every key."""
+        raise NotImplementedError
+
+    async def stats(self) -> Dict[str, int]:
+        """Size and eviction statistics (``items``, ``bytes``,
+        ``evictions``), whichever the backend can report."""
+        return {}
+
+    async def open(self) -> None:
+        """Prepare the backend at application startup."""
+
+    async def close(self) -> None:
+        """Release resources at application shutdown."""
+
+
+class RedisBackend(CacheBackend):
+    """Redis backend, shared by every worker and node."""
+
+    name = "redis"
+
+    def __init__(self, client: Optional[aioredis.Redis] = None) -> None:
+        """Initialize Redis backend.
+
+        Args:
+            client (Optional[aioredis.Redis]): Client to use instead of
+                the shared pool. Defaults to None.
+        """
+        self._client = client
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Redis client, the shared async pool unless overridden."""
+        if self._client is not None:
+            return self._client
+        return get_redis()
+
+    async def get_many(self, keys: List[str]) -> List[Entry]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.mget(keys)
+        for key in keys:
+            pipe.pttl(key)
+        values, *ttls = await pipe.execute()
+        return [
+            (value, ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None)
+            for value, ttl_ms in zip(values, ttls)
+        ]
+
+    async def set_many(
+        self,
+        items: Items,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> None:
+        tags = tags or {}
+        pipe = self.client.pipeline(transaction=False)
+        for key, (value, expire) in items.items():
+            if expire:
+                pipe.set(key, value, px=int(expire * 1000))
+            else:
+                pipe.set(key, value)
+            if tags.get(key):
+                register_tags(pipe, key, tags[key], expire)
+        await pipe.execute()
+
+    async def delete_many(self, keys: List[str]) -> int:
+        if not keys:
+            return 0
+        return int(await self.client.unlink(*keys))
+
+    async def exists(self, key: str) -> bool:
+        return bool(await self.client.exists(key))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(
+            await self.client.set(key, value, nx=True, px=int(ttl * 1000))
+        )
+
+    async def delete_if_equal(self, key: str, value: bytes) -> bool:
+        return bool(await self.client.eval(RELEASE_LOCK_SCRIPT, 1, key, value))
+
+    async def hget(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        return await self.client.hmget(key, *fields)
+
+    async def hset(
+        self,
+        key: str,
+        mapping: Mapping[str, bytes],
+        expire: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        # Drop fields of previous versions (e.g. compressed variants)
+        pipe.delete(key)
+        pipe.hset(key, mapping=dict(mapping))
+        if expire:
+            pipe.pexpire(key, int(expire * 1000))
+        if tags:
+            register_tags(pipe, key, tags, expire)
+        await pipe.execute()
+
+    async def invalidate_tags(self, tags: List[str]) -> Tuple[int, Set[str]]:
+        if not tags:
+            return 0, set()
+        tag_keys = [f"{TAG_PREFIX}{tag}" for tag in tags]
+        deleted, members = await self.client.eval(
+            INVALIDATE_TAGS_SCRIPT,
+            len(tag_keys),
+            *tag_keys,
+            SCAN_BATCH_SIZE
+        )
+        keys = {
+            member.decode() if isinstance(member, bytes) else member
+            for member in members
+        }
+        return int(deleted), keys
+
+    async def delete_pattern(self, pattern: str) -> int:
+        deleted = 0
+        batch: List[Any] = []
+        async for key in self.client.scan_iter(
+            match=pattern,
+            count=SCAN_BATCH_SIZE
+        ):
+            batch.append(key)
+            if len(batch) >= SCAN_BATCH_SIZE:
+                deleted += await self.client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self.client.unlink(*batch)
+        return deleted
+
+    async def clear(self) -> bool:
+        return bool(await self.client.flushdb())
+
+    async def stats(self) -> Dict[str, int]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.dbsize()
+        pipe.info("memory")
+        pipe.info("stats")
+        items, memory, stats = await pipe.execute()
+        return {
+            "items": items,
+            "bytes": memory.get("used_memory", 0),
+            "evictions": stats.get("evicted_keys", 0)
+        }
+
+    async def open(self) -> None:
+        if self._client is None:
+            await init_redis()
+
+    async def close(self) -> None:
+        if self._client is None:
+            await close_redis()
+
+
+class MemoryBackend(CacheBackend):
+    """In-process backend: no server, nothing shared between workers.
+
+    Meant for development, tests and benchmarks. Keys are evicted in LRU
+    order beyond ``max_items``.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_items: int = settings.LOCAL_CACHE_MAX_ITEMS) -> None:
+        """Initialize memory backend.
+
+        Args:
+            max_items (int): Maximum number of keys.
+        """
+        self.max_items = max_items
+        # key -> (bytes value or dict of hash fields, monotonic expiry)
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float]]]" = (
+            OrderedDict()
+        )
+        # tag -> keys, and key -> tags to untag keys when they are removed
+        self._tags: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Set[str]] = {}
+        self.evictions = 0
+
+    def _get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Entry of a key, dropping it if expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            self._drop(key)
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _put(self, key: str, value: Any, expire: Optional[float]) -> None:
+        """Store an entry and evict beyond the size limit."""
+        expires_at = time.monotonic() + expire if expire else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_items:
+            self._drop(next(iter(self._data)))
+            self.evictions += 1
+
+    def _drop(self, key: str) -> bool:
+        """Remove an entry and its tag registrations."""
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return self._data.pop(key, None) is not None
+
+    def _tag(self, key: str, tags: Iterable[str]) -> None:
+        """Register a key under tags."""
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+            self._key_tags.setdefault(key, set()).add(tag)
+
+    async def get_many(self, keys: List[str]) -> List[Entry]:
+        now = time.monotonic()
+        entries = []
+        for key in keys:
+            entry = self._get(key)
+            if entry is None or not isinstance(entry[0], bytes):
+                entries.append((None, None))
+                continue
+            value, expires_at = entry
+            entries.append(
+                (value, expires_at - now if expires_at is not None else None)
+            )
+        return entries
+
+    async def set_many(
+        self,
+        items: Items,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> None:
+        tags = tags or {}
+        for key, (value, expire) in items.items():
+            self._put(key, value, expire)
+            self._tag(key, tags.get(key) or [])
+
+    async def delete_many(self, keys: List[str]) -> int:
+        return sum(self._drop(key) for key in set(keys))
+
+    async def exists(self, key: str) -> bool:
+        return self._get(key) is not None
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        if self._get(key) is not None:
+            return False
+        self._put(key, value, ttl)
+        return True
+
+    async def delete_if_equal(self, key: str, value: bytes) -> bool:
+        entry = self._get(key)
+        if entry is None or entry[0] != value:
+            return False
+        return self._drop(key)
+
+    async def hget(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        entry = self._get(key)
+        if entry is None or not isinstance(entry[0], dict):
+            return [None] * len(fields)
+        return [entry[0].get(field) for field in fields]
+
+    async def hset(
+        self,
+        key: str,
+        mapping: Mapping[str, bytes],
+        expire: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> None:
+        self._put(key, dict(mapping), expire)
+        self._tag(key, tags or [])
+
+    async def invalidate_tags(self, tags: List[str]) -> Tuple[int, Set[str]]:
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.pop(tag, ()))
+        return await self.delete_many(list(keys)), keys
+
+    async def delete_pattern(self, pattern: str) -> int:
+        return await self.delete_many(
+            fnmatch.filter(list(self._data), pattern)
+        )
+
+    async def clear(self) -> bool:
+        self._data.clear()
+        self._tags.clear()
+        self._key_tags.clear()
+        return True
+
+    async def stats(self) -> Dict[str, int]:
+        return {"items": len(self._data), "evictions": self.evictions}
+
+
+class DiskBackend(CacheBackend):
+    """SQLite backend for single-node deployments.
+
+    One database file is shared by every uvicorn worker of the node (WAL
+    mode). Queries run in a worker thread so they never block the event
+    loop; the connection is opened on first use.
+    """
+
+    name = "disk"
+
+    # Writes between purges of expired rows
+    PURGE_INTERVAL = 1000
+
+    # Host parameters per query (SQLite default limit is 999)
+    CHUNK_SIZE = 500
+
+    def __init__(self, path: str = settings.CACHE_DISK_PATH) -> None:
+        """Initialize disk backend.
+
+        Args:
+            path (str): SQLite database file.
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the tables if needed."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=settings.CACHE_LOCK_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Plain values use the empty field name
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT NOT NULL, field TEXT NOT NULL, value BLOB, "
+            "expires_at REAL, PRIMARY KEY (key, field)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tags ("
+            "tag TEXT NOT NULL, key TEXT NOT NULL, "
+            "PRIMARY KEY (tag, key)) WITHOUT ROWID"
+        )
+        return conn
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(conn, *args)`` in a worker thread."""
+        return await asyncio.to_thread(self._call, func, *args)
+
+    def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func`` holding the connection lock."""
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            return func(self._conn, *args)
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        func: Callable[..., Any],
+        *args: Any
+    ) -> Any:
+        """Run ``func`` in a write transaction, purging now and then."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn, *args)
+            self._writes += 1
+            if self._writes >= self.PURGE_INTERVAL:
+                self._writes = 0
+                self._purge(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    @staticmethod
+    def _purge(conn: sqlite3.Connection) -> None:
+        """Drop expired rows and tags of missing keys."""
+        conn.execute(
+            "DELETE FROM entries WHERE expires_at <= ?",
+            (time.time(),)
+        )
+        conn.execute(
+            "DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)"
+        )
+
+    @classmethod
+    def _chunks(cls, values: List[Any]) -> Iterable[List[Any]]:
+        """Split values to stay under the host parameter limit."""
+        for start in range(0, len(values), cls.CHUNK_SIZE):
+            yield values[start:start + cls.CHUNK_SIZE]
+
+    @staticmethod
+    def _expires_at(expire: Optional[float]) -> Optional[float]:
+        """Absolute expiry; wall clock, as it is shared across processes."""
+        return time.time() + expire if expire else None
+
+    @staticmethod
+    def _delete_keys(conn: sqlite3.Connection, keys: List[str]) -> int:
+        """Delete keys and count how many were alive."""
+        deleted = 0
+        now = time.time()
+        for chunk in DiskBackend._chunks(keys):
+            marks = ",".join("?" * len(chunk))
+            deleted += conn.execute(
+                f"SELECT COUNT(DISTINCT key) FROM entries WHERE key IN "
+                f"({marks}) AND (expires_at IS NULL OR expires_at > ?)",
+                (*chunk, now)
+            ).fetchone()[0]
+            conn.execute(f"DELETE FROM entries WHERE key IN ({marks})", chunk)
+        return deleted
+
+    async def get_many(self, keys: List[str]) -> List[Entry]:
+        def query(conn):
+            now = time.time()
+            found = {}
+            for chunk in self._chunks(keys):
+                marks = ",".join("?" * len(chunk))
+                for key, value, expires_at in conn.execute(
+                    f"SELECT key, value, expires_at FROM entries "
+                    f"WHERE field = '' AND key IN ({marks}) "
+                    f"AND (expires_at IS NULL OR expires_at > ?)",
+                    (*chunk, now)
+                ):
+                    found[key] = (
+                        value,
+                        expires_at - now if expires_at is not None else None
+                    )
+            return [found.get(key, (None, None)) for key in keys]
+
+        return await self._run(query)
+
+    async def set_many(
+        self,
+        items: Items,
+        tags: Optional[Mapping[str, Iterable[str]]] = None
+    ) -> None:
+        tags = tags or {}
+
+        def write(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, '', ?, ?)",
+                [
+                    (key, value, self._expires_at(expire))
+                    for key, (value, expire) in items.items()
+                ]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?)",
+                [
+                    (tag, key)
+                    for key in items
+                    for tag in tags.get(key) or []
+                ]
+            )
+
+        await self._run(self._write, write)
+
+    async def delete_many(self, keys: List[str]) -> int:
+        if not keys:
+            return 0
+        return await self._run(self._write, self._delete_keys, list(keys))
+
+    async def exists(self, key: str) -> bool:
+        def query(conn):
+            return conn.execute(
+                "SELECT 1 FROM entries WHERE key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?) LIMIT 1",
+                (key, time.time())
+            ).fetchone() is not None
+
+        return await self._run(query)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        def write(conn):
+            conn.execute(
+                "DELETE FROM entries WHERE key = ? AND expires_at <= ?",
+                (key, time.time())
+            )
+            return conn.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, '', ?, ?)",
+                (key, value, self._expires_at(ttl))
+            ).rowcount == 1
+
+        return await self._run(self._write, write)
+
+    async def delete_if_equal(self, key: str, value: bytes) -> bool:
+        def write(conn):
+            return conn.execute(
+                "DELETE FROM entries WHERE key = ? AND field = '' "
+                "AND value = ?",
+                (key, value)
+            ).rowcount == 1
+
+        return await self._run(self._write, write)
+
+    async def hget(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        def query(conn):
+            marks = ",".join("?" * len(fields))
+            found = dict(conn.execute(
+                f"SELECT field, value FROM entries WHERE key = ? "
+                f"AND field IN ({marks}) "
+                f"AND (expires_at IS NULL OR expires_at > ?)",
+                (key, *fields, time.time())
+            ))
+            return [found.get(field) for field in fields]
+
+        return await self._run(query)
+
+    async def hset(
+        self,
+        key: str,
+        mapping: Mapping[str, bytes],
+        expire: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> None:
+        expires_at = self._expires_at(expire)
+
+        def write(conn):
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?)",
+                [
+                    (key, field, value, expires_at)
+                    for field, value in mapping.items()
+                ]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?)",
+                [(tag, key) for tag in tags or []]
+            )
+
+        await self._run(self._write, write)
+
+    async def invalidate_tags(self, tags: List[str]) -> Tuple[int, Set[str]]:
+        def write(conn):
+            keys = set()
+            for chunk in self._chunks(tags):
+                marks = ",".join("?" * len(chunk))
+                keys.update(
+                    key for key, in conn.execute(
+                        f"SELECT key FROM tags WHERE tag IN ({marks})",
+                        chunk
+                    )
+                )
+                conn.execute(f"DELETE FROM tags WHERE tag IN ({marks})", chunk)
+            return self._delete_keys(conn, list(keys)), keys
+
+        return await self._run(self._write, write)
+
+    async def delete_pattern(self, pattern: str) -> int:
+        def write(conn):
+            keys = [
+                key for key, in conn.execute(
+                    "SELECT DISTINCT key FROM entries WHERE key GLOB ?",
+                    (pattern,)
+                )
+            ]
+            return self._delete_keys(conn, keys)
+
+        return await self._run(self._write, write)
+
+    async def clear(self) -> bool:
+        def write(conn):
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM tags")
+            return True
+
+        return await self._run(self._write, write)
+
+    async def stats(self) -> Dict[str, int]:
+        def query(conn):
+            (items,) = conn.execute(
+                "SELECT COUNT(DISTINCT key) FROM entries "
+                "WHERE expires_at IS NULL OR expires_at > ?",
+                (time.time(),)
+            ).fetchone()
+            return items
+
+        items = await self._run(query)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return {"items": items, "bytes": size}
+
+    async def close(self) -> None:
+        def close(conn):
+            conn.close()
+            self._conn = None
+
+        if self._conn is not None:
+            await self._run(close)
+
+
+BACKENDS: Dict[str, Callable[[], CacheBackend]] = {
+    "redis": RedisBackend,
+    "memory": MemoryBackend,
+    "disk": DiskBackend
+}
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_backend() -> CacheBackend:
+    """Get the process-wide backend selected by ``CACHE_BACKEND``.
+
+    Created on first use; creating it does not connect to anything.
+
+    Returns:
+        CacheBackend: Shared backend.
+    """
+    global _backend
+    if _backend is None:
+        factory = BACKENDS.get(settings.CACHE_BACKEND)
+        if factory is None:
+            raise ValueError(
+                f"Unknown cache backend: {settings.CACHE_BACKEND}"
+            )
+        _backend = factory()
+    return _backend
+
+
+async def init_backend() -> CacheBackend:
+    """Open the shared backend at application startup.
+
+    Returns:
+        CacheBackend: Shared backend.
+    """
+    backend = get_backend()
+    await backend.open()
+    return backend
+
+
+async def close_backend() -> None:
+    """Close the shared backend at application shutdown."""
+    if _backend is not None:
+        await _backend.close()
@@ -0,0 +1,324 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+
+logger = logging.getLogger("library_api")
+
+
+class CodecError(ValueError):
+    """Raised when a cached value cannot be decoded."""
+
+
+def encode_default(obj: Any) -> Any:
+    """Convert values the codecs do not support natively.
+
+    Mirrors FastAPI's ``jsonable_encoder`` so cached values have the same
+    shape as API responses.
+
+    Args:
+        obj (Any): Value to convert.
+
+    Returns:
+        Any: Serializable representation.
+
+    Raises:
+        TypeError: If the value type is not supported.
+    """
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, Decimal):
+        # Same rule as jsonable_encoder: integral values become int
+        if obj.as_tuple().exponent >= 0:
+            return int(obj)
+        return float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class Codec(ABC):
+    """Base serialization codec."""
+
+    name = ""
+
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to bytes."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Deserialize bytes produced by ``dumps``."""
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """Standard library JSON codec (always available)."""
+
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(
+            value,
+            default=encode_default,
+            separators=(",", ":")
+        ).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(bytes(data))
+
+
+class OrjsonCodec(Codec):
+    """orjson codec: datetime, Enum and UUID are handled in C."""
+
+    name = "orjson"
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(
+            value,
+            default=encode_default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack codec: compact binary encoding."""
+
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(
+            value,
+            default=encode_default,
+            use_bin_type=True
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class Compressor(ABC):
+    """Base compressor."""
+
+    name = ""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ZstdCompressor(Compressor):
+    """Zstandard compression."""
+
+    name = "zstd"
+
+    def __init__(self, level: int = 3) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    """LZ4 frame compression: lower ratio, faster than zstd."""
+
+    name = "lz4"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+# Header byte ids. Never reuse a value: ids are persisted in Redis.
+CODEC_IDS = {"json": 1, "orjson": 2, "msgpack": 3}
+COMPRESSION_IDS = {"none": 0, "zstd": 1, "lz4": 2}
+
+_CODEC_FACTORIES: Dict[str, Callable[[], Codec]] = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec
+}
+_COMPRESSOR_FACTORIES: Dict[str, Callable[[], Compressor]] = {
+    "zstd": ZstdCompressor,
+    "lz4": Lz4Compressor
+}
+_AVAILABLE = {
+    "json": True,
+    "orjson": orjson is not None,
+    "msgpack": msgpack is not None,
+    "zstd": zstandard is not None,
+    "lz4": lz4_frame is not None
+}
+
+
+class Serializer:
+    """Codec plus optional compression above a size threshold.
+
+    Every payload starts with one header byte: the codec id in the high
+    nibble and the compression id in the low nibble. Values written with
+    another configuration can therefore still be decoded.
+    """
+
+    def __init__(
+        self,
+        codec: str = "orjson",
+        compression: str = "none",
+        threshold: int = 1024
+    ) -> None:
+        """Initialize serializer.
+
+        Unavailable optional libraries fall back to stdlib JSON and no
+        compression.
+
+        Args:
+            codec (str): ``orjson``, ``msgpack`` or ``json``.
+            compression (str): ``zstd``, ``lz4`` or ``none``.
+            threshold (int): Minimum payload size in bytes to compress.
+        """
+        if not _AVAILABLE.get(codec):
+            logger.warning(f"Cache codec {codec!r} unavailable, using json")
+            codec = "json"
+        if compression != "none" and not _AVAILABLE.get(compression):
+            logger.warning(
+                f"Cache compression {compression!r} unavailable, disabled"
+            )
+            compression = "none"
+
+        self.codec = _CODEC_FACTORIES[codec]()
+        self.compressor: Optional[Compressor] = None
+        if compression != "none":
+            self.compressor = _COMPRESSOR_FACTORIES[compression]()
+        self.threshold = threshold
+        self._codec_id = CODEC_IDS[codec]
+        self._codecs: Dict[int, Codec] = {self._codec_id: self.codec}
+        self._compressors: Dict[int, Compressor] = {}
+        if self.compressor is not None:
+            self._compressors[COMPRESSION_IDS[compression]] = self.compressor
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize and, above the threshold, compress a value.
+
+        Args:
+            value (Any): Value to encode.
+
+        Returns:
+            bytes: Header byte followed by the payload.
+        """
+        data = self.codec.dumps(value)
+        compression_id = 0
+        if self.compressor is not None and len(data) >= self.threshold:
+            data = self.compressor.compress(data)
+            compression_id = COMPRESSION_IDS[self.compressor.name]
+        return bytes(((self._codec_id << 4) | compression_id,)) + data
+
+    def decode(self, data: bytes) -> Any:
+        """Decode bytes produced by ``encode``.
+
+        Args:
+            data (bytes): Encoded value.
+
+        Returns:
+            Any: Decoded value.
+
+        Raises:
+            CodecError: If the payload is malformed or its codec or
+                compression is not available.
+        """
+        if not data:
+            raise CodecError("Empty payload")
+        codec_id, compression_id = data[0] >> 4, data[0] & 0x0F
+        payload = memoryview(data)[1:]
+        try:
+            if compression_id:
+                payload = self._get_compressor(compression_id).decompress(
+                    payload
+                )
+            return self._get_codec(codec_id).loads(payload)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Failed to decode cached value: {str(e)}")
+
+    def _get_codec(self, codec_id: int) -> Codec:
+        """Get (and memoize) the codec for a header id."""
+        codec = self._codecs.get(codec_id)
+        if codec is None:
+            name = _name_for(CODEC_IDS, codec_id)
+            if name is None or not _AVAILABLE[name]:
+                raise CodecError(f"Unknown or unavailable codec {codec_id}")
+            codec = self._codecs[codec_id] = _CODEC_FACTORIES[name]()
+        return codec
+
+    def _get_compressor(self, compression_id: int) -> Compressor:
+        """Get (and memoize) the compressor for a header id."""
+        compressor = self._compressors.get(compression_id)
+        if compressor is None:
+            name = _name_for(COMPRESSION_IDS, compression_id)
+            if name is None or not _AVAILABLE.get(name):
+                raise CodecError(
+                    f"Unknown or unavailable compression {compression_id}"
+                )
+            compressor = _COMPRESSOR_FACTORIES[name]()
+            self._compressors[compression_id] = compressor
+        return compressor
+
+
+def _name_for(ids: Dict[str, int], value: int) -> Optional[str]:
+    """Reverse lookup of a header id."""
+    for name, id_ in ids.items():
+        if id_ == value:
+            return name
+    return None
+
+
+# Serializer configured from settings, shared by the cache implementations
+serializer = Serializer(
+    codec=settings.CACHE_CODEC,
+    compression=settings.CACHE_COMPRESSION,
+    threshold=settings.CACHE_COMPRESSION_THRESHOLD
+)
@@ -0,0 +1,137 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the given parts.
+
+    Args:
+        *parts (Any): Values identifying the representation, e.g. id and
+            updated_at, or the serialized body.
+
+    Returns:
+        str: Quoted entity tag.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode()
+        digest.update(part)
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP date.
+
+    Naive datetimes are assumed to be UTC, as stored by the models.
+
+    Args:
+        value (datetime): Datetime to format.
+
+    Returns:
+        str: RFC 7231 IMF-fixdate.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Dict[str, str]:
+    """Build ETag and Last-Modified headers.
+
+    Args:
+        etag (str): Entity tag.
+        last_modified (Optional[datetime]): Last modification time.
+
+    Returns:
+        Dict[str, str]: Validator headers.
+    """
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_conditional(request: Request) -> bool:
+    """Check whether the request carries cache validators.
+
+    Args:
+        request (Request): Incoming request.
+
+    Returns:
+        bool: True if If-None-Match or If-Modified-Since is present.
+    """
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since preconditions.
+
+    If-None-Match takes precedence and uses weak comparison, as required
+    for GET; If-Modified-Since is only checked when it is absent.
+
+    Args:
+        request (Request): Incoming request.
+        etag (str): Current entity tag.
+        last_modified (Optional[datetime]): Current modification time.
+
+    Returns:
+        bool: True if the client's copy is still valid (send 304).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = etag[2:] if etag.startswith("W/") else etag
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == current:
+                return True
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """Build an empty 304 response carrying the validators.
+
+    Args:
+        etag (str): Entity tag.
+        last_modified (Optional[datetime]): Last modification time.
+
+    Returns:
+        Response: 304 Not Modified response.
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified)
+    )
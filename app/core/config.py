@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 from functools import lru_cache
 
 
@@ -15,20 +15,71 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"  # Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000  # verified JWTs kept; 0 disables
     
     # Database
     DATABASE_URL: str = "sqlite:///./biblioteca.db"
     
+    # Cache backend: redis, memory (per process) or disk (sqlite, per node)
+    CACHE_BACKEND: str = "redis"
+    CACHE_DISK_PATH: str = "cache.sqlite3"
+    
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 1.0  # seconds
     CACHE_EXPIRE: int = 300  # 5 minutes
+    CACHE_LOCK_TIMEOUT: float = 5.0  # seconds a worker may hold a miss lock
+    CACHE_LOCK_POLL_INTERVAL: float = 0.05  # seconds between lock polls
+    CACHE_CODEC: str = "orjson"  # orjson, msgpack or json
+    CACHE_COMPRESSION: str = "none"  # zstd, lz4 or none
+    CACHE_COMPRESSION_THRESHOLD: int = 1024  # bytes
+    CACHE_PRECOMPRESS_MIN_SIZE: int = 512  # bytes; smaller bodies stay raw
+    CACHE_DEBUG_HEADER: bool = False  # X-Cache: HIT, MISS or STALE
+    # /metrics (Prometheus text), admin token required
+    METRICS_ENABLED: bool = False
+    
+    # Negative cache (lookups that found nothing)
+    NEGATIVE_CACHE_TTL: int = 30  # seconds
+    # Bloom filters assume every insert goes through the routers
+    BLOOM_FILTER_ENABLED: bool = False
+    BLOOM_FILTER_CAPACITY: int = 1_000_000
+    BLOOM_FILTER_ERROR_RATE: float = 0.01
+    
+    # Startup cache warm-up
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIME_BUDGET: float = 10.0  # seconds
+    WARMUP_CONCURRENCY: int = 4  # concurrent queries
+    WARMUP_EXPIRE: int = 3600  # seconds; commits invalidate earlier
+    WARMUP_TOP_LIVROS: int = 100
+    
+    # Local (in-process) cache tier
+    LOCAL_CACHE_MAX_ITEMS: int = 10000
+    LOCAL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MB
+    LOCAL_CACHE_TTL: int = 30  # seconds
+    # Authenticated users (id, ativo, roles) cached per process
+    PRINCIPAL_CACHE_MAX_ITEMS: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 30  # seconds; local commits invalidate earlier
     
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE: str = "app.log"
+    LOG_QUEUE_SIZE: int = 10000  # records waiting for the writer thread
+    LOG_QUEUE_HIGH_WATER: float = 0.8  # fill ratio where sampling starts
+    LOG_QUEUE_SAMPLE_RATE: int = 10  # keep 1 in N records below WARNING
+    LOG_BATCH_SIZE: int = 256  # records written between flushes
+    # Request body logging (DEBUG only): first N bytes of sampled requests
+    LOG_BODY_ENABLED: bool = False
+    LOG_BODY_MAX_BYTES: int = 1024
+    LOG_BODY_SAMPLE_RATE: float = 1.0  # fraction of requests captured
+    LOG_BODY_ROUTES: List[str] = []  # path patterns; empty means all
+    # Access log: one JSON line per request, sampled by status class
+    # (e.g. {"5xx": 1.0, "2xx": 0.01}); missing classes are always logged
+    ACCESS_LOG_SAMPLE_RATES: Dict[str, float] = {}
+    ACCESS_LOG_HEADERS: List[str] = ["user-agent"]  # request headers logged
     
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
@@ -38,11 +89,25 @@ class Settings(BaseSettings):
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_BURST: Optional[int] = None  # defaults to RATE_LIMIT_PER_MINUTE
+    RATE_LIMIT_MAX_CLIENTS: int = 100_000
+    RATE_LIMIT_SWEEP_INTERVAL: float = 60.0  # seconds between idle sweeps
+    # local (per worker) or redis (shared by every worker and node)
+    RATE_LIMIT_BACKEND: str = "local"
+    RATE_LIMIT_REDIS_TIMEOUT: float = 0.05  # seconds before falling back
+    RATE_LIMIT_REDIS_RETRY: float = 5.0  # seconds on local limits after that
+    # API key -> requests per minute (sent in the X-API-Key header)
+    RATE_LIMIT_API_KEYS: Dict[str, int] = {}
     
     # Pagination
     DEFAULT_PAGE_SIZE: int = 10
     MAX_PAGE_SIZE: int = 100
     
+    @property
+    def REDIS_URL(self) -> str:
+        """Redis connection URL built from host, port and db."""
+        return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+    
     class Config:
         """Pydantic config."""
         case_sensitive = True
@@ -52,4 +117,7 @@ class Settings(BaseSettings):
 @lru_cache()
 def get_settings() -> Settings:
     """Get cached settings instance."""
-    return Settings() 
\ No newline at end of file
+    return Settings()
+
+
+settings = get_settings()
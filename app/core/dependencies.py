@@ -1,12 +1,13 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from .config import get_settings
 from .exceptions import AuthenticationException
 from .logging import get_logger
+from .principal import Principal, get_principal, remember_principal
 from app.database import get_db
+from app.middleware.auth import AuthHandler
 from app.models.pessoa import Pessoa
 
 settings = get_settings()
@@ -18,30 +19,39 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> Pessoa:
-    """Get current authenticated user."""
+) -> Principal:
+    """Get current authenticated user.
+
+    The token goes through the verification cache and the user is read
+    from ``principal_cache`` when possible, so most requests neither
+    check the signature nor query the database.
+    """
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: Optional[int] = payload.get("sub")
-        if user_id is None:
-            raise AuthenticationException("Invalid token")
-    except JWTError:
+        payload = AuthHandler(
+            settings.SECRET_KEY, settings.ALGORITHM
+        ).verify_token(token)
+    except HTTPException:
+        raise AuthenticationException("Invalid token")
+    user_id: Optional[int] = payload.get("sub")
+    if user_id is None:
         raise AuthenticationException("Invalid token")
     
+    principal = get_principal(user_id)
+    if principal is not None:
+        return principal
+
     user = db.query(Pessoa).filter(Pessoa.id == user_id).first()
     if user is None:
         raise AuthenticationException("User not found")
     
-    return user
+    principal = Principal.from_user(user)
+    remember_principal(principal)
+    return principal
 
 
 def get_current_active_user(
-    current_user: Pessoa = Depends(get_current_user)
-) -> Pessoa:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Get current active user."""
     if not current_user.ativo:
         raise AuthenticationException("Inactive user")
@@ -49,8 +59,8 @@ def get_current_active_user(
 
 
 def get_current_admin_user(
-    current_user: Pessoa = Depends(get_current_active_user)
-) -> Pessoa:
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
     """Get current admin user."""
     if not current_user.admin:
         raise HTTPException(
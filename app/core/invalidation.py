@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from typing import Any, Iterable, Optional, Set, Tuple
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.background import submit
+from app.core.cache import cache, cache_tag
+from app.core.negative_cache import negative_cache
+from app.core.principal import PRINCIPAL_TABLE, forget_principals
+
+
+logger = logging.getLogger("library_api")
+
+# Keys of the per-session state kept in ``Session.info``
+CHANGES_KEY = "cache_changes"
+TASK_KEY = "cache_invalidation"
+
+# (table name, primary key, created)
+Change = Tuple[str, Any, bool]
+
+
+def _identity(obj: Any) -> Optional[Tuple[str, Any]]:
+    """Table name and primary key of a mapped object."""
+    table = getattr(obj, "__tablename__", None)
+    if table is None:
+        return None
+    state = sa_inspect(obj)
+    # New rows have no identity key yet, but their primary key is set
+    identity = state.identity or tuple(
+        state.mapper.primary_key_from_instance(obj)
+    )
+    if any(part is None for part in identity):
+        return None
+    return table, identity[0] if len(identity) == 1 else identity
+
+
+def _after_flush(session: Session, flush_context: Any) -> None:
+    """Collect the rows written by a flush."""
+    changes: Set[Change] = session.info.setdefault(CHANGES_KEY, set())
+    # ``dirty`` also lists objects whose attributes were set to the same
+    # value; those did not change any row
+    modified = [obj for obj in session.dirty if session.is_modified(obj)]
+    for created, objects in (
+        (True, session.new),
+        (False, modified),
+        (False, session.deleted)
+    ):
+        for obj in objects:
+            identity = _identity(obj)
+            if identity is not None:
+                changes.add((*identity, created))
+
+
+def _after_commit(session: Session) -> None:
+    """Invalidate the cache entries of the committed rows in one batch.
+
+    Cached principals of changed users are dropped right away.
+    """
+    changes = session.info.pop(CHANGES_KEY, None)
+    if changes:
+        # In-process, so the next request already sees the change
+        forget_principals(*(
+            ident for table, ident, _ in changes if table == PRINCIPAL_TABLE
+        ))
+        session.info[TASK_KEY] = submit(invalidate_changes(changes))
+
+
+def _after_soft_rollback(session: Session, previous_transaction: Any) -> None:
+    """Forget changes that were rolled back.
+
+    Rolling back a savepoint keeps the changes flushed before it in the
+    outer transaction, so only a rollback of the root transaction clears
+    them.
+    """
+    if previous_transaction.parent is None:
+        session.info.pop(CHANGES_KEY, None)
+
+
+async def invalidate_changes(changes: Iterable[Change]) -> int:
+    """Drop the cached entries of changed rows.
+
+    Entries tagged with the table (lists) or with ``table:id`` are
+    removed, and negative entries of created ids are forgotten.
+
+    Args:
+        changes (Iterable[Change]): (table, id, created) triples.
+
+    Returns:
+        int: Number of Redis keys removed.
+    """
+    tags = set()
+    created = {}
+    for table, ident, is_new in changes:
+        tags.add(cache_tag(table))
+        tags.add(cache_tag(table, ident))
+        if is_new:
+            created.setdefault(table, []).append(ident)
+
+    deleted = await cache.invalidate_tags(*tags)
+    for table, idents in created.items():
+        await negative_cache(table).forget(*idents)
+    return deleted
+
+
+async def invalidation_done(session: Session) -> None:
+    """Wait for the invalidation scheduled by the last commit.
+
+    Lets endpoints answer only once their writes are visible to readers.
+
+    Args:
+        session (Session): Session that committed.
+    """
+    task = session.info.pop(TASK_KEY, None)
+    if task is not None:
+        await asyncio.shield(task)
+
+
+def setup_invalidation_listeners() -> None:
+    """Invalidate cache entries whenever a session commits."""
+    if event.contains(Session, "after_flush", _after_flush):
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_soft_rollback", _after_soft_rollback)
+
+
+setup_invalidation_listeners()
@@ -1,9 +1,196 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED, Sample, metrics
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dump_json(fields: Dict[str, Any]) -> str:
+    """Encode a log line, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(fields, default=str).decode()
+    return json.dumps(fields, separators=(",", ":"), default=str)
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter writing access records as one JSON object per line.
+
+    Records carrying an ``access`` attribute (a dict of fields, see
+    ``app.middleware.logging``) are encoded as JSON with a ``ts`` field;
+    every other record uses the regular text format. Encoding happens
+    here, on the writer thread, not in the request.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "access", None)
+        if fields is None:
+            return super().format(record)
+        ts = datetime.fromtimestamp(record.created, timezone.utc)
+        return dump_json({"ts": ts.isoformat(), **fields})
+
+
+class DeferredFlushMixin:
+    """Stream handler flushed by the log writer once per batch.
+
+    ``emit`` writes into the stream buffer only; the writer thread calls
+    ``flush_now`` when the queue drains (or every ``LOG_BATCH_SIZE``
+    records), so a burst of records costs one write system call.
+    """
+
+    def flush(self) -> None:
+        pass
+
+    def flush_now(self) -> None:
+        # At interpreter exit the stream may already be closed (e.g. the
+        # stdout pytest captured when logging was set up)
+        if getattr(self.stream, "closed", False):
+            return
+        try:
+            super().flush()
+        except Exception:
+            self.handleError(logging.makeLogRecord({"msg": "Log flush"}))
+
+    def close(self) -> None:
+        self.flush_now()
+        super().close()
+
+
+class BatchStreamHandler(DeferredFlushMixin, logging.StreamHandler):
+    """Console handler with batched flushes."""
+
+
+class BatchFileHandler(DeferredFlushMixin, logging.FileHandler):
+    """File handler with batched flushes."""
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to the writer thread without ever blocking.
+
+    Above the high-water mark, records below WARNING are sampled (one in
+    ``sample_rate`` is kept) so the remaining room is left for warnings
+    and errors. A full queue drops the record. Drops are counted and
+    reported by the writer.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord]",
+        high_water: float = settings.LOG_QUEUE_HIGH_WATER,
+        sample_rate: int = settings.LOG_QUEUE_SAMPLE_RATE
+    ) -> None:
+        """Initialize queue handler.
+
+        Args:
+            log_queue (queue.Queue): Bounded queue read by the writer.
+            high_water (float): Fraction of the queue above which low
+                level records are sampled.
+            sample_rate (int): Keep one in ``sample_rate`` low level
+                records above the high-water mark.
+        """
+        super().__init__(log_queue)
+        self.high_water = int(log_queue.maxsize * high_water)
+        self.sample_rate = max(sample_rate, 1)
+        self.dropped = 0
+        self._pressure = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if (
+                record.levelno < logging.WARNING
+                and self.queue.qsize() >= self.high_water
+            ):
+                self._pressure += 1
+                if self._pressure % self.sample_rate:
+                    self.dropped += 1
+                    return
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+
+class LogWriter(QueueListener):
+    """Background thread writing queued records to the real handlers."""
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord]",
+        source: BoundedQueueHandler,
+        *handlers: logging.Handler,
+        batch_size: int = settings.LOG_BATCH_SIZE
+    ) -> None:
+        """Initialize writer.
+
+        Args:
+            log_queue (queue.Queue): Queue filled by ``source``.
+            source (BoundedQueueHandler): Handler whose drops are reported.
+            handlers (logging.Handler): Handlers doing the actual I/O.
+            batch_size (int): Maximum records written between flushes.
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.source = source
+        self.batch_size = batch_size
+        self._pending = 0
+        self._reported_drops = 0
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        # Flush once the queue drains, before waiting for more records
+        if self._pending and (
+            self._pending >= self.batch_size or self.queue.empty()
+        ):
+            self.flush()
+        return self.queue.get(block)
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        self._pending += 1
+
+    def flush(self) -> None:
+        """Report drops and flush every handler."""
+        dropped = self.source.dropped - self._reported_drops
+        if dropped:
+            self._reported_drops += dropped
+            super().handle(logging.makeLogRecord({
+                "name": "library_api",
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Log queue saturated: {dropped} records dropped"
+            }))
+        for handler in self.handlers:
+            try:
+                if isinstance(handler, DeferredFlushMixin):
+                    handler.flush_now()
+                else:
+                    handler.flush()
+            except Exception:
+                # Nowhere left to report a failing log handler
+                pass
+        self._pending = 0
+
+    def enqueue_sentinel(self) -> None:
+        # The queue may be full at shutdown: wait for room instead
+        self.queue.put(self._sentinel, timeout=5)
+
+    def stop(self) -> None:
+        super().stop()
+        self.flush()
+
+
+_writer: Optional[LogWriter] = None
+_queue_handler: Optional[BoundedQueueHandler] = None
 
 
 def setup_logging(
@@ -11,55 +198,98 @@ def setup_logging(
     log_level: Optional[str] = None
 ) -> logging.Logger:
     """Configure logging for the application.
-    
+
+    Every logger propagates to a bounded queue on the root logger; a
+    background thread does the file and console writes, so logging never
+    blocks the event loop on I/O. Calling it again while the writer runs
+    does nothing; call ``stop_logging`` first to reconfigure.
+
     Args:
         log_file (Optional[str]): Path to log file. If None, logs to stdout.
-        log_level (Optional[str]): Logging level. If None, uses 
+        log_level (Optional[str]): Logging level. If None, uses
             settings.LOG_LEVEL.
-        
+
     Returns:
         logging.Logger: Configured logger instance.
     """
-    # Get logger
+    global _writer, _queue_handler
+    level = log_level or settings.LOG_LEVEL
+    root = logging.getLogger()
     logger = logging.getLogger("library_api")
-    logger.setLevel(log_level or settings.LOG_LEVEL)
-    
+    if _writer is not None:
+        return logger
+
     # Create formatter
-    formatter = logging.Formatter(settings.LOG_FORMAT)
-    
+    formatter = StructuredFormatter(settings.LOG_FORMAT)
+
     # Add console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    handlers: List[logging.Handler] = [BatchStreamHandler(sys.stdout)]
+
     # Add file handler if log_file is provided
+    errors = []
     if log_file:
         try:
             # Create log directory if it doesn't exist
             log_path = Path(log_file)
             log_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create file handler
-            file_handler = logging.FileHandler(log_file)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            handlers.append(BatchFileHandler(log_file))
         except Exception as e:
-            logger.error(f"Failed to setup file logging: {str(e)}")
-    
+            errors.append(f"Failed to setup file logging: {str(e)}")
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+        maxsize=settings.LOG_QUEUE_SIZE
+    )
+    _queue_handler = BoundedQueueHandler(log_queue)
+    _writer = LogWriter(log_queue, _queue_handler, *handlers)
+    _writer.start()
+
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    logger.setLevel(level)
+    for error in errors:
+        logger.error(error)
     return logger
 
 
-# Create default logger
-logger = setup_logging()
+def stop_logging() -> None:
+    """Write pending records and stop the writer thread."""
+    global _writer, _queue_handler
+    # Cleared first: a failing handler must not make the atexit call
+    # stop the same writer twice
+    writer, queue_handler = _writer, _queue_handler
+    _writer = None
+    _queue_handler = None
+    if queue_handler is not None:
+        logging.getLogger().removeHandler(queue_handler)
+    if writer is not None:
+        writer.stop()
+        for handler in writer.handlers:
+            handler.close()
+
+
+def collect_metrics() -> List[Sample]:
+    """Report records dropped by the queue handler."""
+    if _queue_handler is None:
+        return []
+    return [(LOG_RECORDS_DROPPED, {}, _queue_handler.dropped)]
+
+
+metrics.register_collector(collect_metrics)
+atexit.register(stop_logging)
+
+# Default logger; handlers are installed by ``setup_logging`` at startup
+logger = logging.getLogger("library_api")
 
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the specified name.
-    
+
     Args:
         name (str): Logger name
-        
+
     Returns:
         logging.Logger: Logger instance
     """
-    return logging.getLogger(name) 
\ No newline at end of file
+    return logging.getLogger(name)
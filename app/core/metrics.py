@@ -0,0 +1,310 @@
+import inspect
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+)
+
+
+logger = logging.getLogger("library_api")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Sample reported by a collector: (metric name, labels, value)
+Sample = Tuple[str, Dict[str, Any], float]
+Collector = Callable[
+    [], Union[Iterable[Sample], Awaitable[Iterable[Sample]]]
+]
+
+# Seconds; backend round trips are expected well under 10ms
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0
+)
+
+# Bytes of serialized cache entries
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Cache metric names
+CACHE_REQUESTS = "cache_requests_total"
+CACHE_BACKEND_LATENCY = "cache_backend_latency_seconds"
+CACHE_ENTRY_SIZE = "cache_entry_size_bytes"
+CACHE_TIER_REQUESTS = "cache_tier_requests_total"
+CACHE_EVICTIONS = "cache_evictions_total"
+CACHE_ITEMS = "cache_items"
+CACHE_BYTES = "cache_bytes"
+
+# Rate limiter metric names
+RATE_LIMIT_CLIENTS = "rate_limit_clients"
+RATE_LIMIT_EVICTIONS = "rate_limit_evictions_total"
+RATE_LIMIT_FALLBACKS = "rate_limit_fallbacks_total"
+
+# Logging metric names
+LOG_RECORDS_DROPPED = "log_records_dropped_total"
+
+# Authentication metric names
+AUTH_TOKEN_CACHE_REQUESTS = "auth_token_cache_requests_total"
+AUTH_TOKEN_CACHE_HIT_RATIO = "auth_token_cache_hit_ratio"
+AUTH_TOKEN_CACHE_ITEMS = "auth_token_cache_items"
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # One slot per bound plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Process-local counters, histograms and collectors.
+
+    Counters and histograms are updated on the request path and cost a
+    dict lookup under a lock. Collectors are only read when the metrics
+    are rendered.
+    """
+
+    def __init__(self) -> None:
+        """Initialize registry."""
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._collectors: List[Collector] = []
+
+    def describe(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> None:
+        """Declare a metric.
+
+        Args:
+            name (str): Metric name.
+            kind (str): ``counter``, ``histogram`` or ``gauge``.
+            help_text (str): Description shown in the exposition.
+            buckets (Tuple[float, ...]): Histogram bucket bounds.
+        """
+        self._types[name] = kind
+        self._help[name] = help_text
+        if kind == "histogram":
+            self._buckets[name] = buckets
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Increment a counter."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record a histogram observation."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(
+                    self._buckets.get(name, LATENCY_BUCKETS)
+                )
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def register_collector(self, collector: Collector) -> None:
+        """Register a function (sync or async) reporting samples.
+
+        Collectors report values kept elsewhere (e.g. cache statistics);
+        the declared type of each metric is used in the exposition.
+        """
+        self._collectors.append(collector)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        """Current value of a counter series (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def histogram(self, name: str, **labels: Any) -> Histogram:
+        """Histogram series, empty if never observed."""
+        with self._lock:
+            histogram = self._histograms.get(name, {}).get(_labels(labels))
+        return histogram or Histogram(self._buckets.get(name, LATENCY_BUCKETS))
+
+    async def collect(self) -> List[Sample]:
+        """Read every collector; failing collectors are skipped."""
+        samples: List[Sample] = []
+        for collector in self._collectors:
+            try:
+                result = collector()
+                if inspect.isawaitable(result):
+                    result = await result
+                samples.extend(result)
+            except Exception as e:
+                logger.warning(f"Metrics collector error: {str(e)}")
+        return samples
+
+    async def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        collected: Dict[str, List[Tuple[Labels, float]]] = {}
+        for name, labels, value in await self.collect():
+            collected.setdefault(name, []).append((_labels(labels), value))
+
+        with self._lock:
+            counters = {
+                name: list(series.items())
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    (key, list(h.counts), h.sum, h.count)
+                    for key, h in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+
+        # Counters and collectors may report the same metric name
+        for name, series in collected.items():
+            counters.setdefault(name, []).extend(series)
+
+        lines: List[str] = []
+        for name, series in counters.items():
+            self._header(lines, name)
+            for key, value in series:
+                lines.append(f"{name}{_format_labels(key)} {_number(value)}")
+        for name, series in histograms.items():
+            self._header(lines, name)
+            buckets = self._buckets.get(name, LATENCY_BUCKETS)
+            for key, counts, total, count in series:
+                cumulative = 0
+                for bound, bucket_count in zip(
+                    (*map(_number, buckets), "+Inf"), counts
+                ):
+                    cumulative += bucket_count
+                    bucket_labels = _format_labels(key + (("le", bound),))
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str) -> None:
+        if name in self._help:
+            lines.append(f"# HELP {name} {self._help[name]}")
+        lines.append(f"# TYPE {name} {self._types.get(name, 'untyped')}")
+
+    def reset(self) -> None:
+        """Drop recorded counters and histograms (collectors are kept)."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in labels
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+metrics = MetricsRegistry()
+
+metrics.describe(
+    CACHE_REQUESTS,
+    "counter",
+    "Response cache lookups per route and result (hit, miss, stale)."
+)
+metrics.describe(
+    CACHE_BACKEND_LATENCY,
+    "histogram",
+    "Latency of cache backend calls per backend and operation."
+)
+metrics.describe(
+    CACHE_ENTRY_SIZE,
+    "histogram",
+    "Serialized size of cached entries per route.",
+    SIZE_BUCKETS
+)
+metrics.describe(
+    CACHE_TIER_REQUESTS,
+    "counter",
+    "Cache lookups per tier and result since startup."
+)
+metrics.describe(
+    CACHE_EVICTIONS,
+    "counter",
+    "Entries evicted per tier since startup."
+)
+metrics.describe(CACHE_ITEMS, "gauge", "Entries stored per tier.")
+metrics.describe(CACHE_BYTES, "gauge", "Bytes stored per tier.")
+metrics.describe(
+    RATE_LIMIT_CLIENTS,
+    "gauge",
+    "Clients tracked by the local rate limiter."
+)
+metrics.describe(
+    RATE_LIMIT_EVICTIONS,
+    "counter",
+    "Clients dropped because the rate limiter table was full."
+)
+metrics.describe(
+    RATE_LIMIT_FALLBACKS,
+    "counter",
+    "Rate limit checks decided locally because Redis was unavailable."
+)
+metrics.describe(
+    LOG_RECORDS_DROPPED,
+    "counter",
+    "Log records dropped or sampled out because the log queue was full."
+)
+metrics.describe(
+    AUTH_TOKEN_CACHE_REQUESTS,
+    "counter",
+    "JWT verification cache lookups per result (hit, miss)."
+)
+metrics.describe(
+    AUTH_TOKEN_CACHE_HIT_RATIO,
+    "gauge",
+    "Fraction of JWT verifications served from cache since startup."
+)
+metrics.describe(
+    AUTH_TOKEN_CACHE_ITEMS,
+    "gauge",
+    "Verified tokens held by the JWT verification cache."
+)
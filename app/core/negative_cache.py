@@ -0,0 +1,280 @@
+import hashlib
+import logging
+import math
+from typing import Any, Iterable, List, Optional
+from redis import asyncio as aioredis
+
+from app.core.cache_backends import CacheBackend, RedisBackend, get_backend
+from app.core.config import settings
+from app.core.redis_pool import get_redis
+
+
+logger = logging.getLogger("library_api")
+
+# Values whose bits are set per pipeline while building a filter
+BLOOM_BUILD_BATCH_SIZE = 1000
+
+
+class BloomFilter:
+    """Redis-backed Bloom filter of existing values.
+
+    Answers "definitely absent" or "maybe present". Bits are only ever
+    set, so values added while the filter is being built are never lost;
+    removed values just become false positives. An extra bit past the end
+    of the filter marks it as complete: until it is set (or if Redis
+    evicts the key) every lookup answers "maybe present".
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int = settings.BLOOM_FILTER_CAPACITY,
+        error_rate: float = settings.BLOOM_FILTER_ERROR_RATE,
+        redis_client: Optional[aioredis.Redis] = None
+    ) -> None:
+        """Initialize Bloom filter.
+
+        Args:
+            name (str): Filter name, e.g. ``pessoa:cpf``.
+            capacity (int): Expected number of values.
+            error_rate (float): Target false positive rate.
+            redis_client (Optional[aioredis.Redis]): Client to use instead
+                of the shared pool. Defaults to None.
+        """
+        self.key = f"bloom:{name}"
+        self.size = max(
+            int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)),
+            8
+        )
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._redis = redis_client
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """Redis client, the shared async pool unless overridden."""
+        if self._redis is not None:
+            return self._redis
+        return get_redis()
+
+    def offsets(self, value: Any) -> List[int]:
+        """Bit offsets of a value (double hashing).
+
+        Args:
+            value (Any): Value, compared by its string form.
+
+        Returns:
+            List[int]: ``hashes`` offsets in ``[0, size)``.
+        """
+        digest = hashlib.blake2b(str(value).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def queue_check(self, pipe: Any, value: Any) -> None:
+        """Queue the readiness bit and the value bits on a pipeline.
+
+        The results are interpreted by ``is_absent``.
+
+        Args:
+            pipe (Any): Redis pipeline.
+            value (Any): Value to check.
+        """
+        pipe.getbit(self.key, self.size)
+        for offset in self.offsets(value):
+            pipe.getbit(self.key, offset)
+
+    def is_absent(self, results: List[int]) -> bool:
+        """Interpret the results queued by ``queue_check``.
+
+        Args:
+            results (List[int]): Pipeline results, readiness bit first.
+
+        Returns:
+            bool: True if the filter is complete and the value is
+                definitely absent.
+        """
+        ready, *bits = results
+        return bool(ready) and not all(bits)
+
+    async def add(self, *values: Any) -> None:
+        """Add values to the filter.
+
+        Args:
+            *values (Any): Values to add.
+        """
+        if not values:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for value in values:
+            for offset in self.offsets(value):
+                pipe.setbit(self.key, offset, 1)
+        await pipe.execute()
+
+    async def build(self, values: Iterable[Any]) -> bool:
+        """Add every existing value and mark the filter as complete.
+
+        Skipped if another worker already completed the filter.
+
+        Args:
+            values (Iterable[Any]): All existing values.
+
+        Returns:
+            bool: True if the filter was built by this call.
+        """
+        if await self.redis.getbit(self.key, self.size):
+            return False
+        batch = []
+        for value in values:
+            batch.append(value)
+            if len(batch) >= BLOOM_BUILD_BATCH_SIZE:
+                await self.add(*batch)
+                batch = []
+        await self.add(*batch)
+        await self.redis.setbit(self.key, self.size, 1)
+        return True
+
+
+class NegativeCache:
+    """Short-lived memory of lookups that found nothing.
+
+    Lookups for values recorded as missing (or ruled out by the optional
+    Bloom filter) can be answered with a 404 without querying the
+    database. Entries live in the shared backend only (not in the local
+    tier), so a ``forget`` is seen by every worker immediately.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int = settings.NEGATIVE_CACHE_TTL,
+        bloom: Optional[BloomFilter] = None,
+        backend: Optional[CacheBackend] = None
+    ) -> None:
+        """Initialize negative cache.
+
+        Args:
+            namespace (str): Key namespace, e.g. a table name.
+            ttl (int): Seconds a miss is remembered.
+            bloom (Optional[BloomFilter]): Filter of existing values. Only
+                used with the Redis backend, whose server it shares.
+            backend (Optional[CacheBackend]): Backend to use instead of
+                the configured one. Defaults to None.
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.bloom = bloom
+        self._backend = backend
+
+    @property
+    def backend(self) -> CacheBackend:
+        """Shared backend, the configured one unless overridden."""
+        if self._backend is not None:
+            return self._backend
+        return get_backend()
+
+    def key(self, value: Any) -> str:
+        """Backend key of the negative entry for a value."""
+        return f"neg:{self.namespace}:{value}"
+
+    async def is_missing(self, value: Any) -> bool:
+        """Check whether a value is known not to exist.
+
+        Bloom filter and negative entry are checked in one round trip.
+        Backend errors fail open (the caller queries the database).
+
+        Args:
+            value (Any): Looked up value.
+
+        Returns:
+            bool: True if the lookup can be answered as not found.
+        """
+        try:
+            if self.bloom is None:
+                return await self.backend.exists(self.key(value))
+            pipe = self.bloom.redis.pipeline(transaction=False)
+            self.bloom.queue_check(pipe, value)
+            pipe.exists(self.key(value))
+            *bloom_results, exists = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Negative cache get error: {str(e)}")
+            return False
+        return self.bloom.is_absent(bloom_results) or bool(exists)
+
+    async def remember(self, value: Any) -> None:
+        """Record a lookup that found nothing.
+
+        Args:
+            value (Any): Looked up value.
+        """
+        try:
+            await self.backend.set_many({self.key(value): (b"1", self.ttl)})
+        except Exception as e:
+            logger.warning(f"Negative cache set error: {str(e)}")
+
+    async def forget(self, *values: Any) -> None:
+        """Drop negative entries of values that now exist.
+
+        Must be called after creating rows (or changing the looked up
+        column) so they are found immediately.
+
+        Args:
+            *values (Any): Values that now exist.
+        """
+        values = [value for value in values if value is not None]
+        if not values:
+            return
+        if self.bloom is not None:
+            try:
+                await self.bloom.add(*values)
+            except Exception as e:
+                logger.error(f"Bloom filter add error: {str(e)}")
+                await self._drop_filter()
+        try:
+            await self.backend.delete_many(
+                [self.key(value) for value in values]
+            )
+        except Exception as e:
+            logger.error(f"Negative cache forget error: {str(e)}")
+
+    async def _drop_filter(self) -> None:
+        """Discard a filter that may be missing values.
+
+        A filter without the new values would answer "absent" for rows
+        that exist; without the key every lookup answers "maybe present".
+        """
+        try:
+            await self.bloom.redis.unlink(self.bloom.key)
+        except Exception as e:
+            logger.error(f"Bloom filter drop error: {str(e)}")
+
+    async def build_filter(self, values: Iterable[Any]) -> None:
+        """Fill the Bloom filter with every existing value, if enabled.
+
+        Args:
+            values (Iterable[Any]): All existing values.
+        """
+        if self.bloom is None:
+            return
+        try:
+            if await self.bloom.build(values):
+                logger.info(f"Bloom filter {self.bloom.key} built")
+        except Exception as e:
+            logger.error(f"Bloom filter build error: {str(e)}")
+
+
+def negative_cache(namespace: str) -> NegativeCache:
+    """Build a negative cache configured from settings.
+
+    Args:
+        namespace (str): Key namespace, e.g. a table name.
+
+    Returns:
+        NegativeCache: Cache with a Bloom filter when enabled and the
+            backend is Redis.
+    """
+    bloom = None
+    if settings.BLOOM_FILTER_ENABLED and isinstance(
+        get_backend(), RedisBackend
+    ):
+        bloom = BloomFilter(namespace)
+    return NegativeCache(namespace, bloom=bloom)
@@ -0,0 +1,89 @@
+from typing import Any, FrozenSet, List, NamedTuple, Optional
+
+from app.core.cache import LocalCache
+from app.core.config import settings
+from app.core.constants import UserRole
+from app.core.metrics import (
+    CACHE_EVICTIONS, CACHE_ITEMS, CACHE_TIER_REQUESTS, Sample, metrics
+)
+
+
+# Table whose commits invalidate principals (see app.core.invalidation)
+PRINCIPAL_TABLE = "pessoa"
+
+
+class Principal(NamedTuple):
+    """Authenticated user, as needed to authorize a request.
+
+    A compact, immutable snapshot of a ``Pessoa`` row, cached so that
+    authenticated requests do not query the user table. Endpoints that
+    need the full row load it themselves.
+
+    Attributes:
+        id (int): User id (``sub`` claim).
+        ativo (bool): Whether the user is active.
+        roles (FrozenSet[str]): User type (``tipo``) and ``admin`` for
+            administrators.
+    """
+    id: int
+    ativo: bool
+    roles: FrozenSet[str] = frozenset()
+
+    @property
+    def admin(self) -> bool:
+        return UserRole.ADMIN.value in self.roles
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        """Snapshot a user row."""
+        roles = set()
+        tipo = getattr(user, "tipo", None)
+        if tipo is not None:
+            roles.add(getattr(tipo, "value", tipo))
+        if getattr(user, "admin", False):
+            roles.add(UserRole.ADMIN.value)
+        return cls(id=user.id, ativo=bool(user.ativo), roles=frozenset(roles))
+
+
+# Per process: commits in other workers are picked up after the TTL
+principal_cache = LocalCache(
+    max_items=settings.PRINCIPAL_CACHE_MAX_ITEMS,
+    max_bytes=None,
+    default_ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+
+def get_principal(user_id: Any) -> Optional[Principal]:
+    """Cached principal of a user, or None."""
+    principal = principal_cache.get(str(user_id))
+    return principal if isinstance(principal, Principal) else None
+
+
+def remember_principal(principal: Principal) -> None:
+    """Cache a principal for ``PRINCIPAL_CACHE_TTL`` seconds."""
+    principal_cache.set(str(principal.id), principal)
+
+
+def forget_principals(*user_ids: Any) -> int:
+    """Drop the cached principals of users.
+
+    Returns:
+        int: Number of entries removed.
+    """
+    return sum(principal_cache.delete(str(user_id)) for user_id in user_ids)
+
+
+def collect_metrics() -> List[Sample]:
+    """Report principal cache lookups, evictions and size."""
+    stats = principal_cache.stats()
+    return [
+        (CACHE_TIER_REQUESTS, {"tier": "principal", "result": "hit"},
+         stats["hits"]),
+        (CACHE_TIER_REQUESTS, {"tier": "principal", "result": "miss"},
+         stats["misses"]),
+        (CACHE_EVICTIONS, {"tier": "principal"}, stats["evictions"]),
+        (CACHE_ITEMS, {"tier": "principal"}, stats["items"])
+    ]
+
+
+metrics.register_collector(collect_metrics)
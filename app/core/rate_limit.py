@@ -1,87 +1,470 @@
+import asyncio
+import math
 import time
-from typing import Dict, Tuple
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from fastapi import Request, HTTPException, status
+from fastapi.responses import JSONResponse
+from redis import asyncio as aioredis
 import logging
 
 from app.core.config import settings
+from app.core.metrics import (
+    RATE_LIMIT_CLIENTS, RATE_LIMIT_EVICTIONS, RATE_LIMIT_FALLBACKS, Sample,
+    metrics
+)
+from app.core.redis_pool import get_redis
+from app.core.responses import error_response
+
+
+# Prefix of the keys holding each client's TAT in Redis
+RATE_LIMIT_KEY_PREFIX = "ratelimit:"
+
+# GCRA check-and-update in one round trip. Uses the Redis clock so every
+# worker and node agrees on "now". Floats are returned as strings, since
+# Lua numbers are truncated to integers in replies.
+GCRA_SCRIPT = """
+redis.replicate_commands()
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+    return {0, tostring(tat - now), tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX',
+           math.ceil((new_tat - now) * 1000))
+return {1, tostring(new_tat - now), '0'}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a rate limit check.
+
+    Attributes:
+        allowed (bool): Whether the request may proceed.
+        limit (int): Requests allowed in a burst from an idle client.
+        remaining (int): Requests still allowed right now.
+        reset_after (float): Seconds until the full burst is available
+            again.
+        retry_after (float): Seconds until the next request is allowed
+            (0 if allowed).
+    """
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+    def headers(self) -> Dict[str, str]:
+        """``X-RateLimit-*`` (and ``Retry-After``) response headers."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after))
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
 
 
 class RateLimiter:
-    """Rate limiter implementation."""
-    
-    def __init__(self) -> None:
-        """Initialize rate limiter."""
-        self.requests: Dict[str, list] = {}
+    """Rate limiter based on GCRA (generic cell rate algorithm).
+
+    Equivalent to a token bucket refilled at ``limit / period`` requests
+    per second holding up to ``burst`` requests, but each client only
+    keeps one number: the theoretical arrival time (TAT) of its next
+    request. Checks are O(1) in time and memory.
+
+    The client table is bounded: beyond ``max_clients`` the least recently
+    seen client is dropped, and ``sweep`` removes idle clients (whose TAT
+    is in the past, so forgetting them changes nothing) off the request
+    path.
+    """
+
+    def __init__(
+        self,
+        limit: int = settings.RATE_LIMIT_PER_MINUTE,
+        period: float = 60.0,
+        burst: Optional[int] = settings.RATE_LIMIT_BURST,
+        max_clients: int = settings.RATE_LIMIT_MAX_CLIENTS,
+        name: str = "default"
+    ) -> None:
+        """Initialize rate limiter.
+
+        Args:
+            limit (int): Sustained requests per ``period``.
+            period (float): Period in seconds. Defaults to one minute.
+            burst (Optional[int]): Requests allowed back to back from an
+                idle client. Defaults to ``limit``.
+            max_clients (int): Maximum clients tracked at once.
+            name (str): Policy name, used in Redis keys and metrics.
+        """
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.burst = burst or limit
+        # Seconds between requests at the sustained rate
+        self.interval = period / limit
+        # How far ahead of now a client's TAT may be
+        self.tolerance = self.interval * self.burst
+        self.max_clients = max_clients
+        # client id -> TAT, least recently seen first
+        self.requests: "OrderedDict[str, float]" = OrderedDict()
+        self.evictions = 0
         self.logger = logging.getLogger("library_api")
-    
+
     def _get_client_id(self, request: Request) -> str:
         """Get client identifier from request.
-        
+
         Args:
             request (Request): FastAPI request object.
-            
+
         Returns:
             str: Client identifier.
         """
         forwarded = request.headers.get("X-Forwarded-For")
         if forwarded:
-            return forwarded.split(",")[0]
+            return forwarded.split(",")[0].strip()
         return request.client.host if request.client else "unknown"
-    
-    def _cleanup_old_requests(self, client_id: str) -> None:
-        """Remove expired requests from client history.
-        
+
+    def acquire(
+        self,
+        client_id: str,
+        now: Optional[float] = None
+    ) -> RateLimitResult:
+        """Count a request from a client if within its limit.
+
         Args:
             client_id (str): Client identifier.
+            now (Optional[float]): Current monotonic time. Defaults to
+                ``time.monotonic()``.
+
+        Returns:
+            RateLimitResult: Whether the request is allowed and the values
+                for the ``X-RateLimit-*`` headers.
         """
-        current_time = time.time()
-        self.requests[client_id] = [
-            req_time for req_time in self.requests[client_id]
-            if current_time - req_time < 60
+        if now is None:
+            now = time.monotonic()
+        tat = max(self.requests.get(client_id, now), now)
+        new_tat = tat + self.interval
+        allow_at = new_tat - self.tolerance
+
+        if now < allow_at:
+            return RateLimitResult(
+                allowed=False,
+                limit=self.burst,
+                remaining=0,
+                reset_after=tat - now,
+                retry_after=allow_at - now
+            )
+
+        self._store(client_id, new_tat)
+        # Small epsilon so float error never costs a whole request
+        remaining = int(
+            (self.tolerance - (new_tat - now)) / self.interval + 1e-9
+        )
+        return RateLimitResult(
+            allowed=True,
+            limit=self.burst,
+            remaining=remaining,
+            reset_after=new_tat - now,
+            retry_after=0.0
+        )
+
+    def _store(self, client_id: str, tat: float) -> None:
+        """Save a client's TAT, evicting the least recently seen client
+        when the table is full."""
+        requests = self.requests
+        requests[client_id] = tat
+        requests.move_to_end(client_id)
+        if len(requests) > self.max_clients:
+            requests.popitem(last=False)
+            # Under pressure an active client may lose its state: it gets
+            # a fresh burst instead of the worker running out of memory
+            self.evictions += 1
+
+    async def sweep(
+        self,
+        now: Optional[float] = None,
+        batch_size: int = 10000
+    ) -> int:
+        """Remove idle clients, yielding to the event loop between batches.
+
+        Args:
+            now (Optional[float]): Current monotonic time. Defaults to
+                ``time.monotonic()``.
+            batch_size (int): Clients checked between yields.
+
+        Returns:
+            int: Number of clients removed.
+        """
+        if now is None:
+            now = time.monotonic()
+        snapshot = list(self.requests.items())
+        removed = 0
+        for start in range(0, len(snapshot), batch_size):
+            for client_id, tat in snapshot[start:start + batch_size]:
+                # Skip clients that made a request since the snapshot
+                if tat <= now and self.requests.get(client_id) == tat:
+                    del self.requests[client_id]
+                    removed += 1
+            await asyncio.sleep(0)
+        return removed
+
+    def collect_metrics(self) -> List[Sample]:
+        """Report the client table size and evictions."""
+        return [
+            (RATE_LIMIT_CLIENTS, {"policy": self.name}, len(self.requests)),
+            (RATE_LIMIT_EVICTIONS, {"policy": self.name}, self.evictions)
         ]
-    
+
     def check_rate_limit(self, request: Request) -> Tuple[bool, int]:
         """Check if request is within rate limits.
-        
+
         Args:
             request (Request): FastAPI request object.
-            
+
         Returns:
             Tuple[bool, int]: (is_allowed, remaining_requests)
-            
+
         Raises:
             HTTPException: If rate limit is exceeded.
         """
         client_id = self._get_client_id(request)
-        current_time = time.time()
-        
-        # Initialize client request history
-        if client_id not in self.requests:
-            self.requests[client_id] = []
-        
-        # Clean up old requests
-        self._cleanup_old_requests(client_id)
-        
-        # Check rate limit
-        if len(self.requests[client_id]) >= settings.RATE_LIMIT_PER_MINUTE:
+        result = self.acquire(client_id)
+
+        if not result.allowed:
             self.logger.warning(
                 f"Rate limit exceeded for client {client_id}"
             )
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded"
+                detail="Rate limit exceeded",
+                headers=result.headers()
+            )
+
+        return True, result.remaining
+
+
+class RedisRateLimiter:
+    """Rate limiter sharing each client's budget across workers and nodes.
+
+    Runs the same GCRA as ``RateLimiter`` in a Lua script, so a check is
+    one atomic round trip. When Redis errors or takes longer than
+    ``timeout``, the local limiter decides instead (per-worker quota) and
+    Redis is skipped for ``retry_after`` seconds, so an outage never adds
+    latency to every request.
+    """
+
+    def __init__(
+        self,
+        local: RateLimiter,
+        client: Optional[aioredis.Redis] = None,
+        timeout: float = settings.RATE_LIMIT_REDIS_TIMEOUT,
+        retry_after: float = settings.RATE_LIMIT_REDIS_RETRY
+    ) -> None:
+        """Initialize Redis rate limiter.
+
+        Args:
+            local (RateLimiter): Fallback limiter; also provides the limits.
+            client (Optional[aioredis.Redis]): Client to use instead of the
+                shared pool. Defaults to None.
+            timeout (float): Seconds to wait for Redis per request.
+            retry_after (float): Seconds to use the local limiter after a
+                Redis failure.
+        """
+        self.local = local
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._client = client
+        self._script = None
+        self._skip_until = 0.0
+        self.logger = logging.getLogger("library_api")
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Redis client, the shared async pool unless overridden."""
+        if self._client is not None:
+            return self._client
+        return get_redis()
+
+    async def acquire(self, client_id: str) -> RateLimitResult:
+        """Count a request from a client against the shared budget.
+
+        Args:
+            client_id (str): Client identifier.
+
+        Returns:
+            RateLimitResult: Whether the request is allowed and the values
+                for the ``X-RateLimit-*`` headers.
+        """
+        if time.monotonic() < self._skip_until:
+            return self._fallback(client_id)
+        local = self.local
+        try:
+            if self._script is None:
+                self._script = self.client.register_script(GCRA_SCRIPT)
+            allowed, reset_after, retry_after = await asyncio.wait_for(
+                self._script(
+                    keys=[
+                        f"{RATE_LIMIT_KEY_PREFIX}{local.name}:{client_id}"
+                    ],
+                    args=[local.interval, local.tolerance],
+                    client=self.client
+                ),
+                self.timeout
+            )
+        except Exception as e:
+            self._skip_until = time.monotonic() + self.retry_after
+            self.logger.warning(
+                f"Redis rate limiter unavailable, using local limits "
+                f"for {self.retry_after:g}s: {e!r}"
+            )
+            return self._fallback(client_id)
+
+        reset_after = float(reset_after)
+        if not allowed:
+            return RateLimitResult(
+                allowed=False,
+                limit=local.burst,
+                remaining=0,
+                reset_after=reset_after,
+                retry_after=float(retry_after)
             )
-        
-        # Add current request
-        self.requests[client_id].append(current_time)
-        
-        # Calculate remaining requests
-        remaining = settings.RATE_LIMIT_PER_MINUTE - len(
-            self.requests[client_id]
+        return RateLimitResult(
+            allowed=True,
+            limit=local.burst,
+            remaining=int(
+                (local.tolerance - reset_after) / local.interval + 1e-9
+            ),
+            reset_after=reset_after,
+            retry_after=0.0
         )
-        
-        return True, remaining
 
+    def _fallback(self, client_id: str) -> RateLimitResult:
+        """Decide with the local limiter."""
+        metrics.inc(RATE_LIMIT_FALLBACKS)
+        return self.local.acquire(client_id)
+
+
+# Limiters by policy name, swept and reported together
+limiters: Dict[str, RateLimiter] = {}
+_distributed: Dict[str, RedisRateLimiter] = {}
+
+
+def register_limiter(limiter: RateLimiter) -> RateLimiter:
+    """Track a limiter for sweeps, metrics and Redis mode.
+
+    Args:
+        limiter (RateLimiter): Limiter; its name must be unique.
+
+    Returns:
+        RateLimiter: The registered limiter.
+    """
+    limiters[limiter.name] = limiter
+    _distributed[limiter.name] = RedisRateLimiter(limiter)
+    return limiter
+
+
+# Create rate limiter instance (default policy)
+rate_limiter = register_limiter(RateLimiter())
+
+
+async def acquire(
+    client_id: str,
+    limiter: RateLimiter = rate_limiter
+) -> RateLimitResult:
+    """Check a client with the limiter selected by ``RATE_LIMIT_BACKEND``.
+
+    Args:
+        client_id (str): Client identifier.
+        limiter (RateLimiter): Policy to check. Defaults to the global
+            limit.
+
+    Returns:
+        RateLimitResult: Outcome of the check.
+    """
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        distributed = _distributed.get(limiter.name)
+        if distributed is not None:
+            return await distributed.acquire(client_id)
+    return limiter.acquire(client_id)
+
+
+async def run_sweeper(
+    interval: float = settings.RATE_LIMIT_SWEEP_INTERVAL
+) -> None:
+    """Sweep idle clients of every limiter until cancelled.
+
+    Args:
+        interval (float): Seconds between sweeps.
+    """
+    logger = logging.getLogger("library_api")
+    while True:
+        await asyncio.sleep(interval)
+        for limiter in list(limiters.values()):
+            try:
+                removed = await limiter.sweep()
+            except Exception as e:
+                logger.error(f"Rate limiter sweep failed: {str(e)}")
+                continue
+            if removed:
+                logger.debug(
+                    f"Rate limiter {limiter.name} swept {removed} idle "
+                    f"clients"
+                )
+
+
+def collect_metrics() -> List[Sample]:
+    """Report the client tables of every limiter."""
+    return [
+        sample
+        for limiter in list(limiters.values())
+        for sample in limiter.collect_metrics()
+    ]
+
+
+metrics.register_collector(collect_metrics)
+
+
+def too_many_requests(result: RateLimitResult) -> JSONResponse:
+    """429 response for a rejected request."""
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content=error_response(
+            "Too many requests",
+            {"retry_after": math.ceil(result.retry_after)}
+        ),
+        headers=result.headers()
+    )
+
+
+async def rate_limit_middleware(request: Request, call_next):
+    """Reject clients over their limit and add ``X-RateLimit-*`` headers.
+
+    Args:
+        request (Request): Incoming request.
+        call_next: Next ASGI handler.
+
+    Returns:
+        Response: 429 response when the limit is exceeded, otherwise the
+            endpoint response.
+    """
+    client_id = rate_limiter._get_client_id(request)
+    result = await acquire(client_id)
+    if not result.allowed:
+        rate_limiter.logger.warning(
+            f"Rate limit exceeded for client {client_id}"
+        )
+        return too_many_requests(result)
 
-# Create rate limiter instance
-rate_limiter = RateLimiter() 
\ No newline at end of file
+    response = await call_next(request)
+    response.headers.update(result.headers())
+    return response
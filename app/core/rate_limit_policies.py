@@ -0,0 +1,357 @@
+import fnmatch
+import hashlib
+import logging
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from fastapi import FastAPI, Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.constants import UserRole
+from app.core.rate_limit import (
+    RateLimiter, acquire, limiters, rate_limiter, register_limiter,
+    too_many_requests
+)
+from app.middleware.auth import AuthHandler
+
+
+logger = logging.getLogger("library_api")
+
+# Header identifying API clients with their own quota
+API_KEY_HEADER = "X-API-Key"
+
+# Methods resolved for handlers without a method list (404s)
+HTTP_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+# (method, role, API key) -> limiter
+PolicyTable = Dict[Tuple[str, Optional[str], Optional[str]], RateLimiter]
+
+
+class RateLimitPolicy(NamedTuple):
+    """Declarative rate limit rule.
+
+    A rule applies to a request when every selector it sets matches; the
+    most specific applicable rule wins, then the first declared. Route
+    rules win over any rule without routes, so expensive endpoints keep
+    their small budgets for every caller; among the rest, API key beats
+    role. Requests matching no rule use the global
+    ``RATE_LIMIT_PER_MINUTE``.
+
+    Attributes:
+        name (str): Unique name, used in Redis keys and metrics. Each rule
+            is one budget, shared by all routes it matches.
+        limit (int): Sustained requests per ``period``.
+        period (float): Period in seconds.
+        burst (Optional[int]): Requests allowed back to back. Defaults to
+            ``limit``.
+        routes (Tuple[str, ...]): Route patterns, ``"METHOD /path"`` or
+            ``"/path"`` (any method), matched with ``fnmatch`` against the
+            route template (e.g. ``/pessoas/{item_id}``).
+        roles (Tuple[str, ...]): JWT roles (``role`` claim).
+        clients (Tuple[str, ...]): API keys (``X-API-Key`` header).
+    """
+    name: str
+    limit: int
+    period: float = 60.0
+    burst: Optional[int] = None
+    routes: Tuple[str, ...] = ()
+    roles: Tuple[str, ...] = ()
+    clients: Tuple[str, ...] = ()
+
+    def matches_route(self, method: str, path: str) -> bool:
+        """Whether the rule covers a route (rules without routes do)."""
+        if not self.routes:
+            return True
+        return any(
+            fnmatch.fnmatchcase(f"{method} {path}", pattern)
+            if " " in pattern else fnmatch.fnmatchcase(path, pattern)
+            for pattern in self.routes
+        )
+
+    def applies(self, role: Optional[str], client: Optional[str]) -> bool:
+        """Whether the rule covers a role and API key."""
+        return (
+            (not self.roles or role in self.roles)
+            and (not self.clients or client in self.clients)
+        )
+
+    @property
+    def specificity(self) -> Tuple[bool, bool, bool]:
+        return bool(self.routes), bool(self.clients), bool(self.roles)
+
+
+# Expensive endpoints get their own, smaller budgets; staff gets more
+RATE_LIMIT_POLICIES: List[RateLimitPolicy] = [
+    RateLimitPolicy(
+        name="health",
+        limit=600,
+        routes=("/health",)
+    ),
+    RateLimitPolicy(
+        name="search",
+        limit=20,
+        burst=5,
+        routes=("GET /pessoas/buscar/nome",)
+    ),
+    RateLimitPolicy(
+        name="listings",
+        limit=30,
+        burst=10,
+        routes=(
+            "GET /*/",
+            "GET /pessoas/funcionarios",
+            "GET /pessoas/clientes"
+        )
+    ),
+    RateLimitPolicy(
+        name="staff",
+        limit=300,
+        roles=(UserRole.ADMIN.value, UserRole.LIBRARIAN.value)
+    )
+]
+
+
+def api_key_policies(
+    api_keys: Dict[str, int] = settings.RATE_LIMIT_API_KEYS
+) -> List[RateLimitPolicy]:
+    """One rule per API key configured in ``RATE_LIMIT_API_KEYS``.
+
+    Names use a digest of the key, so keys never reach Redis or metrics.
+    """
+    return [
+        RateLimitPolicy(
+            name=f"client:{hashlib.sha256(key.encode()).hexdigest()[:12]}",
+            limit=limit,
+            clients=(key,)
+        )
+        for key, limit in api_keys.items()
+    ]
+
+
+class RateLimitPolicies:
+    """Resolves rules into one lookup table per route.
+
+    Resolution happens once, at startup: each route gets a table keyed by
+    ``(method, role, API key)`` covering every combination its rules can
+    tell apart, so a request costs a single dict lookup.
+    """
+
+    def __init__(
+        self,
+        policies: Iterable[RateLimitPolicy],
+        default: RateLimiter = rate_limiter
+    ) -> None:
+        """Initialize policies.
+
+        Args:
+            policies (Iterable[RateLimitPolicy]): Rules, in priority order.
+            default (RateLimiter): Limiter used when no rule applies.
+        """
+        self.policies = list(policies)
+        self.default = default
+        for policy in self.policies:
+            if policy.name not in limiters:
+                register_limiter(RateLimiter(
+                    limit=policy.limit,
+                    period=policy.period,
+                    burst=policy.burst,
+                    name=policy.name
+                ))
+
+    def select(
+        self,
+        candidates: List[RateLimitPolicy],
+        role: Optional[str],
+        client: Optional[str]
+    ) -> RateLimiter:
+        """Limiter of the most specific rule applying to a request."""
+        best = None
+        for policy in candidates:
+            if policy.applies(role, client) and (
+                best is None or policy.specificity > best.specificity
+            ):
+                best = policy
+        return self.default if best is None else limiters[best.name]
+
+    def resolve(
+        self,
+        path: Optional[str],
+        methods: Iterable[str]
+    ) -> Tuple[PolicyTable, FrozenSet[str], FrozenSet[str]]:
+        """Build the lookup table of a route.
+
+        Args:
+            path (Optional[str]): Route template, or None for requests that
+                match no route (only rules without routes apply).
+            methods (Iterable[str]): Methods served by the route.
+
+        Returns:
+            Tuple[PolicyTable, FrozenSet[str], FrozenSet[str]]: Table, and
+                the roles and API keys it distinguishes (any other value
+                is looked up as None).
+        """
+        candidates = {
+            method: [
+                policy for policy in self.policies
+                if (policy.matches_route(method, path) if path is not None
+                    else not policy.routes)
+            ]
+            for method in methods
+        }
+        rules = [policy for group in candidates.values() for policy in group]
+        roles = frozenset(role for policy in rules for role in policy.roles)
+        clients = frozenset(
+            client for policy in rules for client in policy.clients
+        )
+
+        table: PolicyTable = {}
+        for method, group in candidates.items():
+            for role in (None, *roles):
+                for client in (None, *clients):
+                    table[(method, role, client)] = self.select(
+                        group, role, client
+                    )
+
+        # Drop the roles and API keys that never change the outcome (e.g.
+        # route rules outranking role rules), so requests to the route do
+        # not decode their token or read their key for nothing
+        roles = frozenset(
+            role for role in roles
+            if any(
+                table[(method, role, client)]
+                is not table[(method, None, client)]
+                for method in candidates for client in (None, *clients)
+            )
+        )
+        clients = frozenset(
+            client for client in clients
+            if any(
+                table[(method, role, client)]
+                is not table[(method, role, None)]
+                for method in candidates for role in (None, *roles)
+            )
+        )
+        table = {
+            key: limiter for key, limiter in table.items()
+            if key[1] in (None, *roles) and key[2] in (None, *clients)
+        }
+        return table, roles, clients
+
+
+def _token_role(headers: Headers) -> Optional[str]:
+    """Role claim of a valid bearer token, if any."""
+    authorization = headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return AuthHandler().verify_token(token).get("role")
+    except Exception:
+        # Invalid tokens are rejected by the endpoint, not here
+        return None
+
+
+def limit_app(
+    app: ASGIApp,
+    table: PolicyTable,
+    roles: FrozenSet[str],
+    clients: FrozenSet[str],
+    default: RateLimiter = rate_limiter
+) -> ASGIApp:
+    """Wrap a route's ASGI app with its resolved rate limits.
+
+    Methods missing from the table (requests answered with 405 by a
+    route serving other methods) use ``default``.
+
+    Args:
+        app (ASGIApp): Route (or not-found) handler.
+        table (PolicyTable): Table from ``RateLimitPolicies.resolve``.
+        roles (FrozenSet[str]): Roles the table distinguishes.
+        clients (FrozenSet[str]): API keys the table distinguishes.
+        default (RateLimiter): Limiter of methods missing from the table.
+
+    Returns:
+        ASGIApp: Handler answering 429 over the limit and adding
+            ``X-RateLimit-*`` headers otherwise.
+    """
+    async def limited(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        client = headers.get(API_KEY_HEADER) if clients else None
+        if client not in clients:
+            client = None
+        role = _token_role(headers) if roles else None
+        if role not in roles:
+            role = None
+        limiter = table.get((scope["method"], role, client), default)
+
+        # API clients are counted by key, everyone else by address
+        client_id = client or rate_limiter._get_client_id(Request(scope))
+        result = await acquire(client_id, limiter)
+        if not result.allowed:
+            logger.warning(
+                f"Rate limit {limiter.name} exceeded for client {client_id}"
+            )
+            await too_many_requests(result)(scope, receive, send)
+            return
+
+        rate_headers = result.headers()
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(rate_headers)
+            await send(message)
+
+        await app(scope, receive, send_with_headers)
+
+    limited.__wrapped__ = app
+    return limited
+
+
+def install_rate_limits(
+    app: FastAPI,
+    policies: Optional[RateLimitPolicies] = None
+) -> RateLimitPolicies:
+    """Resolve rate limit rules and attach them to every route.
+
+    Call once all routes are registered (application startup). Calling it
+    again re-resolves from the original handlers.
+
+    Args:
+        app (FastAPI): Application.
+        policies (Optional[RateLimitPolicies]): Rules to apply. Defaults to
+            ``RATE_LIMIT_POLICIES`` plus the configured API keys.
+
+    Returns:
+        RateLimitPolicies: The applied rules.
+    """
+    if policies is None:
+        policies = RateLimitPolicies(
+            [*api_key_policies(), *RATE_LIMIT_POLICIES]
+        )
+
+    for route in app.router.routes:
+        if not isinstance(route, Route):
+            continue
+        # ``handle`` also answers path matches with another method (405),
+        # which never reach ``route.app``
+        handler = getattr(route.handle, "__wrapped__", route.handle)
+        route.handle = limit_app(
+            handler,
+            *policies.resolve(route.path, route.methods or HTTP_METHODS),
+            default=policies.default
+        )
+
+    # Paths matching no route are still limited (scanners, typos)
+    router = app.router
+    not_found = getattr(router.default, "__wrapped__", router.default)
+    router.default = limit_app(
+        not_found,
+        *policies.resolve(None, HTTP_METHODS),
+        default=policies.default
+    )
+    return policies
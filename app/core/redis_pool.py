@@ -0,0 +1,58 @@
+import logging
+from typing import Optional
+from redis import asyncio as aioredis
+
+from app.core.config import settings
+
+
+logger = logging.getLogger("library_api")
+
+_pool: Optional[aioredis.ConnectionPool] = None
+_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Get the process-wide async Redis client.
+
+    The pool is created lazily if ``init_redis`` has not run yet (scripts,
+    tests). Creating it does not open any connection.
+
+    Returns:
+        aioredis.Redis: Client backed by the shared connection pool.
+    """
+    global _pool, _client
+    if _client is None:
+        _pool = aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+        _client = aioredis.Redis(connection_pool=_pool)
+    return _client
+
+
+async def init_redis() -> aioredis.Redis:
+    """Create the shared pool at application startup.
+
+    Returns:
+        aioredis.Redis: Client backed by the shared connection pool.
+    """
+    client = get_redis()
+    try:
+        await client.ping()
+    except Exception as e:
+        # Cache is optional: the API keeps serving from the database.
+        logger.warning(f"Redis not reachable at startup: {str(e)}")
+    return client
+
+
+async def close_redis() -> None:
+    """Close the shared pool at application shutdown."""
+    global _pool, _client
+    if _client is not None:
+        await _client.aclose()
+    if _pool is not None:
+        await _pool.disconnect()
+    _pool = None
+    _client = None
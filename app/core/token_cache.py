@@ -0,0 +1,136 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import (
+    AUTH_TOKEN_CACHE_HIT_RATIO, AUTH_TOKEN_CACHE_ITEMS,
+    AUTH_TOKEN_CACHE_REQUESTS, Sample, metrics
+)
+
+
+class TokenCache:
+    """Bounded LRU of verified JWT payloads, keyed by a token hash.
+
+    A hit skips the signature and claims check; entries are held until the
+    token's ``exp`` (tokens without ``exp`` are not cached). Keys are
+    SHA-256 digests, so raw tokens are never kept in memory; an entry only
+    answers for the secret key that verified it. Verification
+    runs both on the event loop and in the threadpool (sync dependencies),
+    hence the lock.
+
+    Evicting an entry does not reject the token: it is fully verified
+    again on its next use. Revocation hooks call ``revoke``/
+    ``revoke_subject`` so no cached verification outlives a change.
+    """
+
+    def __init__(self, max_items: int = settings.AUTH_TOKEN_CACHE_SIZE):
+        """Initialize token cache.
+
+        Args:
+            max_items (int): Maximum cached tokens; 0 disables the cache.
+        """
+        self.max_items = max_items
+        self.entries: "OrderedDict[bytes, Tuple[dict, float, str]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str, secret_key: str) -> Optional[dict]:
+        """Cached payload of a token still valid, or None.
+
+        Args:
+            token (str): Encoded JWT.
+            secret_key (str): Key the caller verifies tokens with.
+
+        Returns:
+            Optional[dict]: Copy of the payload, or None on a miss.
+        """
+        key = self.key(token)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[2] != secret_key:
+                self.misses += 1
+                return None
+            if entry[1] <= time.time():
+                del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            # Copy: callers may modify the payload
+            return dict(entry[0])
+
+    def set(self, token: str, payload: dict, secret_key: str):
+        """Cache a payload verified with ``secret_key`` until it expires."""
+        expires = payload.get("exp")
+        if not self.max_items or not isinstance(expires, (int, float)):
+            return
+        key = self.key(token)
+        with self._lock:
+            self.entries[key] = (dict(payload), float(expires), secret_key)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_items:
+                self.entries.popitem(last=False)
+
+    def revoke(self, token: str) -> bool:
+        """Evict a token; it is verified again on its next use."""
+        with self._lock:
+            return self.entries.pop(self.key(token), None) is not None
+
+    def revoke_subject(self, subject) -> int:
+        """Evict every token of a subject (``sub`` claim).
+
+        Returns:
+            int: Number of entries evicted.
+        """
+        subject = str(subject)
+        with self._lock:
+            keys = [
+                key for key, (payload, _, _) in self.entries.items()
+                if str(payload.get("sub")) == subject
+            ]
+            for key in keys:
+                del self.entries[key]
+        return len(keys)
+
+    def clear(self):
+        """Evict everything (e.g. after rotating SECRET_KEY)."""
+        with self._lock:
+            self.entries.clear()
+
+    def collect_metrics(self) -> List[Sample]:
+        """Report lookups, hit ratio and size."""
+        lookups = self.hits + self.misses
+        return [
+            (AUTH_TOKEN_CACHE_REQUESTS, {"result": "hit"}, self.hits),
+            (AUTH_TOKEN_CACHE_REQUESTS, {"result": "miss"}, self.misses),
+            (
+                AUTH_TOKEN_CACHE_HIT_RATIO, {},
+                self.hits / lookups if lookups else 0.0
+            ),
+            (AUTH_TOKEN_CACHE_ITEMS, {}, len(self.entries))
+        ]
+
+
+# Shared by every AuthHandler (one is created per request)
+token_cache = TokenCache()
+metrics.register_collector(token_cache.collect_metrics)
+
+
+def revoke_token(token: str) -> bool:
+    """Revocation hook: drop a token from the verification cache."""
+    return token_cache.revoke(token)
+
+
+def revoke_subject(subject) -> int:
+    """Revocation hook: drop every cached token of a user."""
+    return token_cache.revoke_subject(subject)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Tuple
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.config import settings
+
+
+logger = logging.getLogger("library_api")
+
+
+class Dataset(NamedTuple):
+    """Cached dataset loaded in one query.
+
+    Attributes:
+        name (str): Name used in logs.
+        key (str): Cache key.
+        loader (Callable[[Session], Any]): Builds the cached value from the
+            database; must return JSON-compatible data.
+        expire (int): Expiration time in seconds.
+        tags (Tuple[str, ...]): Invalidation tags, usually the source
+            tables.
+    """
+    name: str
+    key: str
+    loader: Callable[[Session], Any]
+    expire: int = settings.WARMUP_EXPIRE
+    tags: Tuple[str, ...] = ()
+
+
+async def load_dataset(
+    dataset: Dataset,
+    session_factory: Callable[[], Session],
+    refresh: bool = False
+) -> Any:
+    """Get a dataset from the cache, loading and caching it on a miss.
+
+    The query runs in a worker thread with its own session, so it never
+    blocks the event loop.
+
+    Args:
+        dataset (Dataset): Dataset to load.
+        session_factory (Callable[[], Session]): Creates database sessions.
+        refresh (bool): Skip the cache lookup. Defaults to False.
+
+    Returns:
+        Any: Dataset value.
+    """
+    if not refresh:
+        value = await cache.get(dataset.key)
+        if value is not None:
+            return value
+
+    def load():
+        db = session_factory()
+        try:
+            return dataset.loader(db)
+        finally:
+            db.close()
+
+    value = await asyncio.to_thread(load)
+    await cache.set(dataset.key, value, dataset.expire, dataset.tags)
+    return value
+
+
+async def warm_up(
+    datasets: Iterable[Dataset],
+    session_factory: Callable[[], Session],
+    budget: float = settings.WARMUP_TIME_BUDGET,
+    concurrency: int = settings.WARMUP_CONCURRENCY
+) -> Dict[str, str]:
+    """Preload datasets into the cache before serving traffic.
+
+    At most ``concurrency`` queries run at once. Datasets not loaded
+    within ``budget`` seconds are abandoned and loaded on first use
+    instead; failures are logged and never prevent startup.
+
+    Args:
+        datasets (Iterable[Dataset]): Datasets to preload.
+        session_factory (Callable[[], Session]): Creates database sessions.
+        budget (float): Time budget in seconds.
+        concurrency (int): Maximum concurrent queries.
+
+    Returns:
+        Dict[str, str]: Outcome per dataset: ``loaded``, ``failed`` or
+            ``timeout``.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.monotonic()
+
+    async def run(dataset: Dataset) -> None:
+        async with semaphore:
+            await load_dataset(dataset, session_factory, refresh=True)
+
+    tasks = {
+        asyncio.create_task(run(dataset)): dataset.name
+        for dataset in datasets
+    }
+    if not tasks:
+        return {}
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    for task, name in tasks.items():
+        if task in pending:
+            results[name] = "timeout"
+        elif task.exception() is not None:
+            results[name] = "failed"
+            logger.error(
+                f"Cache warm-up of {name} failed: {task.exception()!r}"
+            )
+        else:
+            results[name] = "loaded"
+
+    logger.info(
+        f"Cache warm-up finished in {time.monotonic() - start:.2f}s: "
+        f"{results}"
+    )
+    return results
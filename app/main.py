@@ -1,15 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from routers.base import build_negative_filters
 from routers.pessoa import pessoa_router
-from middleware.logging import LoggingMiddleware, RequestLogger
+from app.services.catalogo_service import HOT_DATASETS
+from database import SessionLocal
+from middleware.logging import LoggingMiddleware
 from middleware.cache import cache_response
 from middleware.auth import require_auth
-import time
+from app.core.background import bind_loop, cancel_all, spawn
+from app.core.config import settings
+from app.core.logging import setup_logging, stop_logging
+from app.core.cache_backends import close_backend, init_backend
+from app.core.redis_pool import close_redis
+from app.core.metrics import metrics
+from app.core.rate_limit import run_sweeper
+from app.core.rate_limit_policies import install_rate_limits
+from app.core.warmup import warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Escrita de logs numa thread, fora do event loop
+    setup_logging(settings.LOG_FILE, settings.LOG_LEVEL)
+    # Backend de cache compartilhado (pool Redis, arquivo sqlite...)
+    await init_backend()
+    # Invalidações disparadas por commits em endpoints síncronos
+    bind_loop()
+    # Resolve as políticas de rate limit de cada rota uma única vez
+    install_rate_limits(app)
+    # Remove clientes ociosos do rate limiter fora do caminho da requisição
+    spawn(run_sweeper())
+    if settings.BLOOM_FILTER_ENABLED:
+        await build_negative_filters()
+    # Pré-carrega dados quentes antes de aceitar requisições
+    if settings.WARMUP_ENABLED:
+        await warm_up(HOT_DATASETS, SessionLocal)
+    yield
+    await cancel_all()
+    await close_backend()
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        await close_redis()
+    stop_logging()
+
 
 app = FastAPI(
     title="Biblioteca API",
     description="API para gerenciamento de biblioteca",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuração de CORS
@@ -21,33 +61,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Adicionar middleware de logging
+# Request id, tempo de processamento e log de acesso numa única camada
+# ASGI (a mais externa, para medir também o CORS)
 app.add_middleware(LoggingMiddleware)
 
-# Middleware para adicionar request_id
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    request_id = request.headers.get("X-Request-ID", str(time.time()))
-    request.state.request_id = request_id
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    return response
-
-# Middleware para logging de requisições
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    RequestLogger.log_request(request)
-    
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        RequestLogger.log_response(response, process_time)
-        return response
-    except Exception as e:
-        RequestLogger.log_error(e, request)
-        raise
-
 # Rotas
 app.include_router(pessoa_router)
 
@@ -57,6 +74,17 @@ app.include_router(pessoa_router)
 async def health_check():
     return {"status": "healthy"}
 
+# Métricas do processo no formato de texto do Prometheus: expõem rotas e
+# tamanhos internos, então só com METRICS_ENABLED e token de admin
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    @require_auth(roles=["admin"])
+    async def metrics_endpoint(request: Request):
+        return PlainTextResponse(
+            await metrics.render(),
+            media_type="text/plain; version=0.0.4"
+        )
+
 # Rota protegida de exemplo
 @app.get("/protected")
 @require_auth(roles=["admin"])
@@ -6,6 +6,8 @@ from typing import Optional
 from functools import wraps
 import os
 
+from app.core.token_cache import token_cache
+
 # Configurações de segurança
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
@@ -15,9 +17,13 @@ security = HTTPBearer()
 
 
 class AuthHandler:
-    def __init__(self):
-        self.secret_key = SECRET_KEY
-        self.algorithm = ALGORITHM
+    def __init__(
+        self,
+        secret_key: Optional[str] = None,
+        algorithm: Optional[str] = None
+    ):
+        self.secret_key = secret_key or SECRET_KEY
+        self.algorithm = algorithm or ALGORITHM
 
     def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
@@ -38,13 +44,26 @@ class AuthHandler:
         return encoded_jwt
 
     def verify_token(self, token: str) -> dict:
-        """Verify and decode a JWT token."""
+        """Verify and decode a JWT token.
+
+        Tokens already verified are served from ``token_cache`` until
+        they expire.
+        """
+        if not isinstance(token, str):
+            raise HTTPException(
+                status_code=401,
+                detail="Token inválido ou expirado"
+            )
+        payload = token_cache.get(token, self.secret_key)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(
                 token,
                 self.secret_key,
                 algorithms=[self.algorithm]
             )
+            token_cache.set(token, payload, self.secret_key)
             return payload
         except JWTError:
             raise HTTPException(
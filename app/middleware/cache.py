@@ -1,66 +1,611 @@
-from fastapi import Request, Response
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
-from typing import Optional, Callable
-import json
-import redis
+from sqlalchemy.orm import Session
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+)
+from enum import Enum
+import asyncio
+import gzip
+import hashlib
+import inspect
+import logging
 import os
+import time
+import uuid
 from functools import wraps
 
-# Configurações do Redis
-REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
-REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
-REDIS_DB = int(os.getenv("REDIS_DB", 0))
+from app.core.background import spawn
+from app.core.cache import cache
+from app.core.cache_backends import CacheBackend, get_backend
+from app.core.codecs import serializer
+from app.core.config import settings
+from app.core.metrics import (
+    CACHE_BACKEND_LATENCY, CACHE_ENTRY_SIZE, CACHE_REQUESTS, metrics
+)
+from .auth import AuthHandler
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
 CACHE_EXPIRE = int(os.getenv("CACHE_EXPIRE", 300))  # 5 minutos
 
+# Parâmetro injetado quando a rota não declara um Request
+REQUEST_PARAM = "_cache_request"
+
+# Prefixo das chaves de respostas (seguido de um hash de tamanho fixo)
+CACHE_KEY_PREFIX = "cache:"
+
+# Dimensões especiais aceitas em ``vary`` além de nomes de cabeçalhos
+VARY_USER = "user"
+VARY_ROLE = "role"
+VARY_TENANT = "tenant"
+TENANT_HEADER = "X-Tenant-ID"
+
+# Cabeçalho de depuração com o resultado da consulta ao cache
+CACHE_STATUS_HEADER = "X-Cache"
+
+# Variantes pré-comprimidas, em ordem de preferência do servidor
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+}
+if brotli is not None:
+    COMPRESSORS = {
+        "br": lambda body: brotli.compress(body, quality=6),
+        **COMPRESSORS
+    }
+
+logger = logging.getLogger(__name__)
+
 
 class CacheHandler:
-    def __init__(self):
-        self.redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB,
-            decode_responses=True
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        # Backend compartilhado do processo (nenhuma conexão é aberta aqui)
+        self.backend = backend or get_backend()
+
+    def get_cache_key(
+        self,
+        request: Request,
+        vary: Optional[Iterable[str]] = None,
+        defaults: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Generate a canonical cache key for the request.
+
+        Query parameters are sorted by name and those equal to the
+        endpoint default are dropped, so equivalent URLs share one entry.
+        The key is a fixed-length hash of the method, path, parameters
+        and ``vary`` values.
+
+        Args:
+            request (Request): Incoming request.
+            vary (Optional[Iterable[str]]): Header names or ``user``,
+                ``role`` and ``tenant`` the response depends on.
+            defaults (Optional[Dict[str, Any]]): Query parameter defaults.
+
+        Returns:
+            str: Cache key.
+        """
+        defaults = defaults or {}
+        params = sorted(
+            (
+                (name, value)
+                for name, value in request.query_params.multi_items()
+                if not (
+                    name in defaults and _is_default(value, defaults[name])
+                )
+            ),
+            # Ordenação estável: preserva a ordem de valores repetidos
+            key=lambda item: item[0]
         )
 
-    def get_cache_key(self, request: Request) -> str:
-        """Generate a unique cache key for the request."""
-        return f"{request.method}:{request.url.path}:{request.query_params}"
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (request.method, request.url.path):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        for name, value in params:
+            digest.update(f"{name}={value}".encode())
+            digest.update(b"\0")
+        for name in vary or []:
+            value = _vary_value(request, name)
+            digest.update(f"{name.lower()}:{value}".encode())
+            digest.update(b"\0")
+        return f"{CACHE_KEY_PREFIX}{digest.hexdigest()}"
+
+    def get_lock_key(self, cache_key: str) -> str:
+        """Key of the lock guarding recomputation of ``cache_key``."""
+        return f"lock:{cache_key}"
+
+    async def get_cached_entry(
+        self,
+        cache_key: str,
+        encodings: Iterable[str] = ()
+    ) -> Optional[Tuple[Dict[str, Any], bytes, Optional[str]]]:
+        """Get cached metadata and body if they exist.
+
+        Only the first stored variant among ``encodings`` and the
+        uncompressed body are fetched.
+
+        Args:
+            cache_key (str): Cache key.
+            encodings (Iterable[str]): Acceptable content codings, in
+                order of preference.
 
-    def get_cached_response(self, cache_key: str) -> Optional[Response]:
+        Returns:
+            Optional[Tuple[Dict[str, Any], bytes, Optional[str]]]: Metadata,
+                body and its content coding (None if uncompressed).
+        """
+        encodings = [name for name in encodings if name in COMPRESSORS]
+        try:
+            with metrics.timer(
+                CACHE_BACKEND_LATENCY,
+                backend=self.backend.name,
+                operation="hget"
+            ):
+                meta, body, *variants = await self.backend.hget(
+                    cache_key, ["meta", "body", *encodings]
+                )
+        except Exception as e:
+            logger.warning(f"Cache get error: {str(e)}")
+            return None
+        if meta is None or body is None:
+            return None
+        try:
+            meta = serializer.decode(meta)
+        except ValueError as e:
+            logger.warning(f"Cache decode error: {str(e)}")
+            return None
+        for encoding, variant in zip(encodings, variants):
+            if variant is not None:
+                return meta, variant, encoding
+        return meta, body, None
+
+    async def get_cached_response(
+        self,
+        cache_key: str,
+        encodings: Iterable[str] = ()
+    ) -> Optional[Response]:
         """Get cached response if exists."""
-        cached_data = self.redis_client.get(cache_key)
-        if cached_data:
-            return JSONResponse(
-                content=json.loads(cached_data),
-                status_code=200
-            )
-        return None
+        entry = await self.get_cached_entry(cache_key, encodings)
+        if entry is None:
+            return None
+        meta, body, encoding = entry
+        return _build_response(meta, body, encoding=encoding)
 
-    def set_cached_response(
+    async def set_cached_response(
         self,
         cache_key: str,
         response: Response,
-        expire: int = CACHE_EXPIRE
+        expire: int = CACHE_EXPIRE,
+        tags: Optional[List[str]] = None,
+        stale: int = 0
     ):
-        """Cache the response."""
-        if isinstance(response, JSONResponse):
-            self.redis_client.setex(
-                cache_key,
-                expire,
-                json.dumps(response.body)
+        """Cache the response, registering it under the given tags.
+
+        The entry is kept for ``expire + stale`` seconds; its creation
+        time is stored so readers can tell fresh from stale. Bodies of at
+        least ``CACHE_PRECOMPRESS_MIN_SIZE`` bytes are also stored
+        compressed, so hits never compress again.
+        """
+        if _is_cacheable(response):
+            variants = _compress_variants(response.body)
+            meta = {
+                "created_at": time.time(),
+                "status_code": response.status_code,
+                "media_type": response.media_type,
+                "vary": response.headers.get("vary"),
+                "encodings": list(variants)
+            }
+            try:
+                with metrics.timer(
+                    CACHE_BACKEND_LATENCY,
+                    backend=self.backend.name,
+                    operation="hset"
+                ):
+                    await self.backend.hset(
+                        cache_key,
+                        {
+                            "meta": serializer.encode(meta),
+                            "body": response.body,
+                            **variants
+                        },
+                        expire + stale,
+                        tags
+                    )
+            except Exception as e:
+                logger.warning(f"Cache set error: {str(e)}")
+
+    async def acquire_lock(
+        self,
+        cache_key: str,
+        timeout: float = settings.CACHE_LOCK_TIMEOUT
+    ) -> Optional[str]:
+        """Try to become the only worker recomputing ``cache_key``.
+
+        Returns:
+            Optional[str]: Lock token, or None if another worker holds the
+                lock. Backend errors fail open and return a token.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.backend.add(
+                self.get_lock_key(cache_key),
+                token.encode(),
+                timeout
+            )
+        except Exception as e:
+            logger.warning(f"Cache lock error: {str(e)}")
+            return token
+        return token if acquired else None
+
+    async def release_lock(self, cache_key: str, token: str):
+        """Release a lock acquired with ``acquire_lock``."""
+        try:
+            await self.backend.delete_if_equal(
+                self.get_lock_key(cache_key),
+                token.encode()
             )
+        except Exception as e:
+            logger.warning(f"Cache unlock error: {str(e)}")
+
+    async def wait_for_response(
+        self,
+        cache_key: str,
+        timeout: float = settings.CACHE_LOCK_TIMEOUT,
+        interval: float = settings.CACHE_LOCK_POLL_INTERVAL
+    ) -> Optional[Response]:
+        """Wait for the worker holding the lock to fill the cache.
+
+        Returns:
+            Optional[Response]: Cached response, or None if the lock was
+                released (or expired) without a cached value.
+        """
+        lock_key = self.get_lock_key(cache_key)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(interval)
+            try:
+                meta, body = await self.backend.hget(
+                    cache_key, ["meta", "body"]
+                )
+                locked = meta is None and await self.backend.exists(lock_key)
+            except Exception as e:
+                logger.warning(f"Cache wait error: {str(e)}")
+                return None
+            if meta is not None and body is not None:
+                # Resposta compartilhada entre requisições: sem compressão
+                try:
+                    return _build_response(serializer.decode(meta), body)
+                except ValueError as e:
+                    logger.warning(f"Cache decode error: {str(e)}")
+                    return None
+            if not locked:
+                return None
+        return None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key within the process.
+
+    The first caller runs the function; callers arriving while it is in
+    flight await the same future instead of running it again.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``func`` once for all concurrent callers of ``key``."""
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # A requisição líder foi cancelada: executa novamente
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita o aviso de exceção não recuperada quando não há espera
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+single_flight = SingleFlight()
+
+# Returned to coalesced callers when the leader's response is not shareable
+_NOT_SHARED = object()
+
+
+def _build_response(
+    meta: Dict[str, Any],
+    body: bytes,
+    age: Optional[float] = None,
+    encoding: Optional[str] = None
+) -> Response:
+    """Build a response from a cached entry without re-encoding it."""
+    if age is None:
+        age = time.time() - meta["created_at"]
+    headers = {"Age": str(max(int(age), 0))}
+    vary = [meta["vary"]] if meta.get("vary") else []
+    if meta.get("encodings"):
+        vary.append("Accept-Encoding")
+    if vary:
+        headers["Vary"] = ", ".join(vary)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=body,
+        status_code=meta["status_code"],
+        media_type=meta["media_type"],
+        headers=headers
+    )
+
+
+def _is_cacheable(response: Any) -> bool:
+    """Only successful JSON responses are stored."""
+    return isinstance(response, JSONResponse) and response.status_code == 200
+
+
+def _compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Compressed variants of a body worth storing."""
+    if len(body) < settings.CACHE_PRECOMPRESS_MIN_SIZE:
+        return {}
+    variants = {}
+    for encoding, compress in COMPRESSORS.items():
+        compressed = compress(body)
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+def _accepted_encodings(request: Request) -> List[str]:
+    """Content codings accepted by the client, most preferred first.
+
+    Ties in quality keep the server preference of ``COMPRESSORS``.
+    """
+    header = request.headers.get("accept-encoding")
+    if not header:
+        return []
+    qualities = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+    wildcard = qualities.get("*", 0.0)
+    ranked = [
+        (qualities.get(name, wildcard), index, name)
+        for index, name in enumerate(COMPRESSORS)
+    ]
+    return [
+        name for quality, _, name in sorted(
+            ranked, key=lambda item: (-item[0], item[1])
+        )
+        if quality > 0
+    ]
+
+
+def _query_defaults(func: Callable) -> Dict[str, Any]:
+    """Collect the defaults of the endpoint's scalar query parameters."""
+    defaults = {}
+    for name, param in inspect.signature(func).parameters.items():
+        # Query(default=...) guarda o valor em ``.default``
+        default = getattr(param.default, "default", param.default)
+        if isinstance(default, (str, int, float, bool, Enum)):
+            alias = getattr(param.default, "alias", None)
+            defaults[alias or name] = default
+    return defaults
+
+
+def _is_default(value: str, default: Any) -> bool:
+    """Check whether a raw query value equals the parameter default."""
+    if isinstance(default, Enum):
+        default = default.value
+    if isinstance(default, bool):
+        truthy = ("1", "true", "on", "yes")
+        falsy = ("0", "false", "off", "no")
+        return value.lower() in (truthy if default else falsy)
+    if isinstance(default, (int, float)):
+        try:
+            return type(default)(value) == default
+        except ValueError:
+            return False
+    return value == str(default)
+
+
+def _token_payload(request: Request) -> Dict[str, Any]:
+    """Claims of the request's bearer token, or empty if absent/invalid."""
+    user = getattr(request.state, "user", None)
+    if isinstance(user, dict):
+        return user
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return {}
+    try:
+        return AuthHandler().verify_token(token)
+    except HTTPException:
+        return {}
+
+
+def _vary_value(request: Request, name: str) -> str:
+    """Value of one ``vary`` dimension for the request."""
+    key = name.lower()
+    if key == VARY_USER:
+        return str(_token_payload(request).get("sub", ""))
+    if key == VARY_ROLE:
+        return str(_token_payload(request).get("role", ""))
+    if key == VARY_TENANT:
+        return request.headers.get(TENANT_HEADER, "")
+    return request.headers.get(name, "")
+
+
+def _vary_header(vary: Iterable[str]) -> str:
+    """Build the Vary header for the given ``vary`` dimensions."""
+    headers = []
+    for name in vary:
+        key = name.lower()
+        if key in (VARY_USER, VARY_ROLE):
+            header = "Authorization"
+        elif key == VARY_TENANT:
+            header = TENANT_HEADER
+        else:
+            header = name
+        if header not in headers:
+            headers.append(header)
+    return ", ".join(headers)
+
+
+def _open_sessions(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Endpoint arguments with a new session for each database session.
+
+    A background refresh runs after the request finished, when the
+    sessions FastAPI injected (``get_db``) are already closed.
+    """
+    return {
+        name: Session(bind=value.bind, autoflush=False)
+        if isinstance(value, Session) else value
+        for name, value in kwargs.items()
+    }
+
+
+def _release_sessions(kwargs: Dict[str, Any]):
+    """Close database sessions used by a background refresh."""
+    for value in kwargs.values():
+        if isinstance(value, Session):
+            value.close()
+
+
+def _to_response(result: Any) -> Any:
+    """Encode endpoint results as JSONResponse so they can be cached."""
+    if isinstance(result, Response):
+        return result
+    return JSONResponse(content=jsonable_encoder(result))
+
+
+def _copy_response(response: Any) -> Any:
+    """Copy a shared response so each request gets its own object."""
+    if not isinstance(response, Response) or not hasattr(response, "body"):
+        return response
+    return Response(
+        content=response.body,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        media_type=response.media_type
+    )
+
+
+def _with_request_param(func: Callable) -> inspect.Signature:
+    """Return the endpoint signature with a Request parameter.
+
+    FastAPI only passes the Request to endpoints that declare it, so it is
+    appended as a keyword-only parameter when missing.
+    """
+    signature = inspect.signature(func)
+    if any(
+        param.annotation is Request
+        for param in signature.parameters.values()
+    ):
+        return signature
+
+    parameters = list(signature.parameters.values())
+    parameters.append(
+        inspect.Parameter(
+            REQUEST_PARAM,
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=Request
+        )
+    )
+    return signature.replace(parameters=parameters)
+
+
+def _route_name(request: Request, func: Callable) -> str:
+    """Route template used as metrics label (never the concrete path)."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or func.__qualname__
+
+
+def _mark_result(response: Any, route: str, result: str) -> Any:
+    """Count the cache outcome and optionally expose it in a header."""
+    metrics.inc(CACHE_REQUESTS, route=route, result=result)
+    if settings.CACHE_DEBUG_HEADER and isinstance(response, Response):
+        response.headers[CACHE_STATUS_HEADER] = result.upper()
+    return response
+
+
+def _find_request(args, kwargs) -> Optional[Request]:
+    """Find the Request among the endpoint arguments."""
+    request = kwargs.pop(REQUEST_PARAM, None)
+    if request is not None:
+        return request
+    for arg in list(args) + list(kwargs.values()):
+        if isinstance(arg, Request):
+            return arg
+    return None
 
 
 # Decorator para cache de respostas
-def cache_response(expire: int = CACHE_EXPIRE):
+def cache_response(
+    expire: int = CACHE_EXPIRE,
+    tags: Optional[List[str]] = None,
+    stale: int = 0,
+    vary: Optional[List[str]] = None
+):
+    """Cache GET responses in the configured cache backend.
+
+    Concurrent misses for the same key run the endpoint once: requests in
+    the same process share one in-flight call and other workers wait on a
+    short backend lock for the value to be cached.
+
+    With ``stale`` set, entries older than ``expire`` (the soft TTL) are
+    still served for up to ``stale`` more seconds while a background task
+    refreshes them. The ``Age`` header carries the age of the entry.
+
+    Hits, misses and stale serves are counted per route, along with the
+    size of stored bodies; with ``CACHE_DEBUG_HEADER`` the outcome is
+    also sent in the ``X-Cache`` header.
+
+    Args:
+        expire (int): Seconds an entry is considered fresh.
+        tags (Optional[List[str]]): Invalidation tags. May reference path
+            parameters, e.g. ``"livro:{item_id}"``.
+        stale (int): Seconds a stale entry may still be served.
+        vary (Optional[List[str]]): What else the response depends on:
+            request header names, ``user`` and ``role`` (from the bearer
+            token) or ``tenant``. Each combination is cached separately
+            and announced in the ``Vary`` header.
+    """
+    vary = list(vary or [])
+    vary_header = _vary_header(vary)
+
     def decorator(func: Callable):
+        defaults = _query_defaults(func)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            request = None
-            for arg in args:
-                if isinstance(arg, Request):
-                    request = arg
-                    break
+            request = _find_request(args, kwargs)
 
             if not request:
                 return await func(*args, **kwargs)
@@ -70,26 +615,113 @@ def cache_response(expire: int = CACHE_EXPIRE):
                 return await func(*args, **kwargs)
 
             cache_handler = CacheHandler()
-            cache_key = cache_handler.get_cache_key(request)
+            cache_key = cache_handler.get_cache_key(request, vary, defaults)
+            route = _route_name(request, func)
+            entry_tags = [
+                tag.format(**request.path_params) for tag in tags or []
+            ]
+
+            async def store(response):
+                if vary_header:
+                    response.headers["Vary"] = vary_header
+                if _is_cacheable(response):
+                    metrics.observe(
+                        CACHE_ENTRY_SIZE, len(response.body), route=route
+                    )
+                await cache_handler.set_cached_response(
+                    cache_key,
+                    response,
+                    expire,
+                    entry_tags,
+                    stale
+                )
+
+            async def refresh():
+                token = await cache_handler.acquire_lock(cache_key)
+                if token is None:
+                    # Outro worker já está revalidando
+                    return
+                refresh_kwargs = _open_sessions(kwargs)
+                try:
+                    await store(
+                        _to_response(await func(*args, **refresh_kwargs))
+                    )
+                finally:
+                    await cache_handler.release_lock(cache_key, token)
+                    _release_sessions(refresh_kwargs)
+
+            # Resposta do líder quando ela não pode ser compartilhada
+            own = []
+
+            async def fill():
+                token = await cache_handler.acquire_lock(cache_key)
+                if token is None:
+                    # Outro worker está calculando: aguarda o resultado
+                    cached = await cache_handler.wait_for_response(cache_key)
+                    if cached is not None:
+                        return cached
+                try:
+                    # Executar função e cachear resposta
+                    response = _to_response(await func(*args, **kwargs))
+                    await store(response)
+                finally:
+                    if token is not None:
+                        await cache_handler.release_lock(cache_key, token)
+                if _is_cacheable(response):
+                    return response
+                # 304, erros, redirecionamentos e streams dependem da
+                # requisição (ou só podem ser enviados uma vez)
+                own.append(response)
+                return _NOT_SHARED
 
             # Verificar cache
-            cached_response = cache_handler.get_cached_response(cache_key)
-            if cached_response:
-                return cached_response
+            entry = await cache_handler.get_cached_entry(
+                cache_key,
+                _accepted_encodings(request)
+            )
+            if entry is not None:
+                meta, body, encoding = entry
+                age = time.time() - meta["created_at"]
+                # Sem janela de stale, entrada expirada é tratada como ausente
+                if age <= expire or stale > 0:
+                    result = "hit"
+                    if age > expire:
+                        # Entrada velha: serve já e revalida em segundo plano
+                        spawn(
+                            single_flight.do(f"refresh:{cache_key}", refresh)
+                        )
+                        result = "stale"
+                    return _mark_result(
+                        _build_response(meta, body, age, encoding),
+                        route,
+                        result
+                    )
 
-            # Executar função e cachear resposta
-            response = await func(*args, **kwargs)
-            cache_handler.set_cached_response(cache_key, response, expire)
-            return response
+            response = await single_flight.do(cache_key, fill)
+            if response is _NOT_SHARED:
+                # Quem aguardava o líder executa a função por conta própria
+                response = own[0] if own else _to_response(
+                    await func(*args, **kwargs)
+                )
+            else:
+                response = _copy_response(response)
+            return _mark_result(response, route, "miss")
 
+        wrapper.__signature__ = _with_request_param(func)
         return wrapper
     return decorator
 
 
+# Função para invalidar cache por tags
+async def invalidate_cache(*tags: str) -> int:
+    """Drop cached entries registered under any of the tags."""
+    return await cache.invalidate_tags(*tags)
+
+
 # Função para limpar cache
-def clear_cache(pattern: str = "*"):
-    """Clear cache entries matching the pattern."""
-    cache_handler = CacheHandler()
-    keys = cache_handler.redis_client.keys(pattern)
-    if keys:
-        cache_handler.redis_client.delete(*keys) 
\ No newline at end of file
+async def clear_cache(pattern: str = "*"):
+    """Clear cache entries matching the pattern.
+
+    Ad-hoc fallback based on SCAN; prefer ``invalidate_cache`` with tags.
+    """
+    return await cache.delete_pattern(pattern)
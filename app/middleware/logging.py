@@ -1,122 +1,215 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Dict, List, Optional
+import fnmatch
+import random
 import time
-import json
+import uuid
 import logging
-from datetime import datetime
-import os
-
-# Configuração do logging
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_FILE = os.getenv("LOG_FILE", "app.log")
-
-# Configurar logger
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
 
-logger = logging.getLogger(__name__)
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
+from app.core.config import settings
 
-    async def dispatch(self, request: Request, call_next):
-        # Tempo inicial
-        start_time = time.time()
-
-        # Log da requisição
-        request_id = request.headers.get("X-Request-ID", "N/A")
-        logger.info(
-            f"Request started - ID: {request_id} - "
-            f"Method: {request.method} - "
-            f"Path: {request.url.path}"
+# Handlers configurados uma única vez por setup_logging (lifespan em main)
+logger = logging.getLogger(__name__)
+# Uma linha JSON por requisição (ver AccessLog)
+access_logger = logging.getLogger("library_api.access")
+
+# Métodos cujo corpo pode ser registrado
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+
+
+class BodyTee:
+    """ASGI ``receive`` wrapper keeping a copy of the first bytes read.
+
+    The application still consumes the body as a stream: only up to
+    ``limit`` bytes are copied, so large uploads are never held in memory
+    by the logging.
+    """
+
+    def __init__(self, receive: Receive, limit: int):
+        self.receive = receive
+        self.limit = limit
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.truncated = False
+
+    async def __call__(self) -> Message:
+        message = await self.receive()
+        if message["type"] == "http.request":
+            chunk = message.get("body", b"")
+            room = self.limit - self.size
+            if len(chunk) > room:
+                self.truncated = True
+            if chunk and room > 0:
+                self.chunks.append(chunk[:room])
+                self.size += min(len(chunk), room)
+        return message
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+def should_capture_body(scope: Scope) -> bool:
+    """Whether to copy the body of this request for the debug log."""
+    if not settings.LOG_BODY_ENABLED or scope["method"] not in BODY_METHODS:
+        return False
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    routes = settings.LOG_BODY_ROUTES
+    if routes and not any(
+        fnmatch.fnmatchcase(scope["path"], pattern) for pattern in routes
+    ):
+        return False
+    return random.random() < settings.LOG_BODY_SAMPLE_RATE
+
+
+class AccessLog:
+    """Structured access log: one record per request, sampled by status.
+
+    Records go to the ``library_api.access`` logger with the fields in an
+    ``access`` attribute; ``StructuredFormatter`` writes them as one JSON
+    line on the writer thread. Fields: ``request_id``, ``method``,
+    ``path``, ``status``, ``duration_ms``, ``bytes``, ``client``,
+    ``headers`` (allow-listed request headers only) and ``sample_rate``
+    (to re-weight counts).
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        headers: Optional[List[str]] = None
+    ):
+        """Initialize access log.
+
+        Args:
+            sample_rates (Optional[Dict[str, float]]): Fraction of requests
+                logged per status class (``"2xx"``...``"5xx"``); missing
+                classes are always logged. Defaults to
+                settings.ACCESS_LOG_SAMPLE_RATES.
+            headers (Optional[List[str]]): Request headers logged. Defaults
+                to settings.ACCESS_LOG_HEADERS.
+        """
+        if sample_rates is None:
+            sample_rates = settings.ACCESS_LOG_SAMPLE_RATES
+        if headers is None:
+            headers = settings.ACCESS_LOG_HEADERS
+        self.rates = tuple(
+            sample_rates.get(f"{group}xx", 1.0) for group in range(6)
+        )
+        self.headers = frozenset(
+            header.lower().encode("latin-1") for header in headers
         )
 
-        # Log do corpo da requisição (se houver)
-        try:
-            body = await request.body()
-            if body:
-                logger.debug(
-                    f"Request body - ID: {request_id} - "
-                    f"Body: {body.decode()}"
+    def sample_rate(self, status_code: int) -> float:
+        group = status_code // 100
+        return self.rates[group] if 0 <= group < 6 else 1.0
+
+    def log(
+        self,
+        scope: Scope,
+        status_code: int,
+        duration: float,
+        request_id: str,
+        response_bytes: int
+    ):
+        """Log a finished request, if sampled."""
+        rate = self.sample_rate(status_code)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        client = scope.get("client")
+        headers = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope["headers"] if key in self.headers
+        } if self.headers else {}
+        # Registro montado direto: sem findCaller (pilha) por requisição
+        access_logger.handle(access_logger.makeRecord(
+            access_logger.name, logging.INFO, "", 0, "%s %s %d",
+            (scope["method"], scope["path"], status_code), None,
+            extra={"access": {
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "bytes": response_bytes,
+                "client": client[0] if client else None,
+                "headers": headers,
+                "sample_rate": rate
+            }}
+        ))
+
+
+class LoggingMiddleware:
+    """Request id, timing, access log and response headers in one pass.
+
+    Pure ASGI: unlike ``BaseHTTPMiddleware`` it runs no extra task and
+    does not wrap the response in a stream. The request id comes from the
+    ``X-Request-ID`` header (or is generated), is available as
+    ``request.state.request_id`` and is echoed with ``X-Process-Time`` in
+    the response headers.
+    """
+
+    def __init__(self, app: ASGIApp, access_log: Optional[AccessLog] = None):
+        self.app = app
+        self.access_log = access_log or AccessLog()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        # O corpo é copiado enquanto a aplicação o lê, nunca antes
+        tee = None
+        if should_capture_body(scope):
+            receive = tee = BodyTee(receive, settings.LOG_BODY_MAX_BYTES)
+
+        status_code = 500
+        response_bytes = 0
+
+        async def send_with_headers(message: Message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = (
+                    f"{time.perf_counter() - start_time:.6f}"
                 )
-        except Exception as e:
-            logger.error(f"Error reading request body: {str(e)}")
+            await send(message)
 
-        # Processar a requisição
         try:
-            response = await call_next(request)
-            
-            # Calcular tempo de processamento
-            process_time = time.time() - start_time
-            
-            # Log da resposta
-            logger.info(
-                f"Request completed - ID: {request_id} - "
-                f"Status: {response.status_code} - "
-                f"Time: {process_time:.2f}s"
-            )
-
-            # Adicionar headers de logging
-            response.headers["X-Process-Time"] = str(process_time)
-            response.headers["X-Request-ID"] = request_id
-
-            return response
-
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
-            # Log de erro
             logger.error(
                 f"Request failed - ID: {request_id} - "
                 f"Error: {str(e)}"
             )
             raise
+        finally:
+            process_time = time.perf_counter() - start_time
+            if tee is not None and tee.size:
+                logger.debug(
+                    f"Request body - ID: {request_id} - "
+                    f"Body: {tee.body.decode(errors='replace')}"
+                    f"{' [truncated]' if tee.truncated else ''}"
+                )
+            self.access_log.log(
+                scope, status_code, process_time, request_id, response_bytes
+            )
 
 
-class RequestLogger:
-    @staticmethod
-    def log_request(request: Request):
-        """Log detailed request information."""
-        log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "request_id": request.headers.get("X-Request-ID", "N/A"),
-            "method": request.method,
-            "path": request.url.path,
-            "query_params": dict(request.query_params),
-            "client_host": request.client.host if request.client else "N/A",
-            "headers": dict(request.headers)
-        }
-        logger.info(f"Request details: {json.dumps(log_data)}")
-
-    @staticmethod
-    def log_response(response: Response, process_time: float):
-        """Log detailed response information."""
-        log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "request_id": response.headers.get("X-Request-ID", "N/A"),
-            "status_code": response.status_code,
-            "process_time": process_time,
-            "headers": dict(response.headers)
-        }
-        logger.info(f"Response details: {json.dumps(log_data)}")
-
-    @staticmethod
-    def log_error(error: Exception, request: Request):
-        """Log error information."""
-        log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "request_id": request.headers.get("X-Request-ID", "N/A"),
-            "error_type": type(error).__name__,
-            "error_message": str(error),
-            "path": request.url.path,
-            "method": request.method
-        }
-        logger.error(f"Error details: {json.dumps(log_data)}") 
\ No newline at end of file
+def _header(scope: Scope, name: bytes) -> str:
+    """First value of a request header (lowercase name), or ''."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
@@ -1,8 +1,20 @@
 from typing import Type, TypeVar, Generic, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from database import get_db
+from database import SessionLocal, get_db
+from app.core.cache import cache, cache_tag
+from app.core.conditional import (
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    validator_headers
+)
+from app.core.invalidation import invalidation_done
+from app.core.negative_cache import negative_cache
 
 T = TypeVar('T')
 CreateSchema = TypeVar('CreateSchema', bound=BaseModel)
@@ -11,6 +23,9 @@ ResponseSchema = TypeVar('ResponseSchema', bound=BaseModel)
 
 
 class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
+    # Instances, so startup code can build their negative cache filters
+    registry: List["BaseRouter"] = []
+
     def __init__(
         self,
         model: Type[T],
@@ -25,8 +40,75 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
         self.update_schema = update_schema
         self.response_schema = response_schema
         self.router = APIRouter(prefix=prefix, tags=tags)
+        # Models with updated_at get validators without loading the row
+        self.versioned = hasattr(model, "updated_at")
+        # Ids known not to exist, answered with 404 without a query
+        self.negative = negative_cache(model.__tablename__)
+        BaseRouter.registry.append(self)
         self._setup_routes()
 
+    async def invalidate_cache(self, item_id: Optional[int] = None):
+        """Drop cached entries tagged with this resource (and item).
+
+        Commits already do this through the session listeners; use it for
+        changes made outside the ORM.
+        """
+        resource = self.model.__tablename__
+        tags = [cache_tag(resource)]
+        if item_id is not None:
+            tags.append(cache_tag(resource, item_id))
+        await cache.invalidate_tags(*tags)
+
+    async def forget_missing(self, item: T):
+        """Drop negative cache entries of secondary lookups of an item.
+
+        Negative entries of ids are dropped by the session listeners.
+        """
+
+    async def build_negative_filters(self, db: Session):
+        """Fill the Bloom filters with the existing rows, if enabled."""
+        await self.negative.build_filter(
+            row.id for row in db.query(self.model.id).yield_per(1000)
+        )
+
+    def _page_validators(self, skip: int, limit: int, versions):
+        """Compute ETag and Last-Modified of a page of (id, updated_at)."""
+        etag = make_etag(skip, limit, *(
+            part for version in versions for part in version
+        ))
+        last_modified = max(
+            (updated_at for _, updated_at in versions),
+            default=None
+        )
+        return etag, last_modified
+
+    def _body_response(self, request: Request, data, many: bool = False):
+        """Serialize data once and answer conditionally on its hash.
+
+        Used for models without ``updated_at``.
+        """
+        if many:
+            content = [
+                jsonable_encoder(
+                    self.response_schema.model_validate(
+                        item, from_attributes=True
+                    )
+                )
+                for item in data
+            ]
+        else:
+            content = jsonable_encoder(
+                self.response_schema.model_validate(
+                    data, from_attributes=True
+                )
+            )
+        response = JSONResponse(content=content)
+        etag = make_etag(response.body)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        response.headers.update(validator_headers(etag))
+        return response
+
     def _setup_routes(self):
         """Setup default CRUD routes."""
         
@@ -41,6 +123,8 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
                 db.add(db_item)
                 db.commit()
                 db.refresh(db_item)
+                await invalidation_done(db)
+                await self.forget_missing(db_item)
                 return db_item
             except Exception as e:
                 db.rollback()
@@ -51,26 +135,86 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
 
         @self.router.get("/", response_model=List[self.response_schema])
         async def read_all(
+            request: Request,
+            response: Response,
             skip: int = Query(0, ge=0),
             limit: int = Query(100, ge=1, le=100),
             db: Session = Depends(get_db)
         ):
-            """Get all items with pagination."""
-            items = db.query(self.model).offset(skip).limit(limit).all()
+            """Get all items with pagination.
+
+            Supports conditional requests: the validators are computed from
+            the ids and update times of the page, so a 304 is answered
+            without loading the rows.
+            """
+            if self.versioned and is_conditional(request):
+                versions = db.query(
+                    self.model.id, self.model.updated_at
+                ).order_by(self.model.id).offset(skip).limit(limit).all()
+                etag, last_modified = self._page_validators(
+                    skip, limit, versions
+                )
+                if is_not_modified(request, etag, last_modified):
+                    return not_modified_response(etag, last_modified)
+
+            items = db.query(self.model).order_by(
+                self.model.id
+            ).offset(skip).limit(limit).all()
+            if not self.versioned:
+                return self._body_response(request, items, many=True)
+
+            etag, last_modified = self._page_validators(
+                skip,
+                limit,
+                [(item.id, item.updated_at) for item in items]
+            )
+            response.headers.update(validator_headers(etag, last_modified))
             return items
 
         @self.router.get("/{item_id}", response_model=self.response_schema)
         async def read_one(
             item_id: int,
+            request: Request,
+            response: Response,
             db: Session = Depends(get_db)
         ):
-            """Get a specific item by ID."""
+            """Get a specific item by ID.
+
+            Supports conditional requests: the validators are computed from
+            id and ``updated_at``, so a 304 is answered without loading the
+            full row. Ids recently not found are answered from the negative
+            cache.
+            """
+            if await self.negative.is_missing(item_id):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Item with id {item_id} not found"
+                )
+
+            if self.versioned and is_conditional(request):
+                version = db.query(self.model.updated_at).filter(
+                    self.model.id == item_id
+                ).first()
+                if version is not None:
+                    etag = make_etag(item_id, version.updated_at)
+                    if is_not_modified(request, etag, version.updated_at):
+                        return not_modified_response(
+                            etag, version.updated_at
+                        )
+
             item = db.query(self.model).filter(self.model.id == item_id).first()
             if not item:
+                await self.negative.remember(item_id)
                 raise HTTPException(
                     status_code=404,
                     detail=f"Item with id {item_id} not found"
                 )
+            if not self.versioned:
+                return self._body_response(request, item)
+
+            response.headers.update(validator_headers(
+                make_etag(item.id, item.updated_at), item.updated_at
+            ))
             return item
 
         @self.router.put("/{item_id}", response_model=self.response_schema)
@@ -92,6 +236,8 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
                     setattr(db_item, key, value)
                 db.commit()
                 db.refresh(db_item)
+                await invalidation_done(db)
+                await self.forget_missing(db_item)
                 return db_item
             except Exception as e:
                 db.rollback()
@@ -116,6 +262,7 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
             try:
                 db.delete(db_item)
                 db.commit()
+                await invalidation_done(db)
                 return {"message": "Item deleted successfully"}
             except Exception as e:
                 db.rollback()
@@ -126,4 +273,14 @@ class BaseRouter(Generic[T, CreateSchema, UpdateSchema, ResponseSchema]):
 
     def get_router(self) -> APIRouter:
         """Get the configured router."""
-        return self.router 
\ No newline at end of file
+        return self.router 
+
+
+async def build_negative_filters():
+    """Fill the Bloom filters of every router (application startup)."""
+    db = SessionLocal()
+    try:
+        for router in BaseRouter.registry:
+            await router.build_negative_filters(db)
+    finally:
+        db.close()
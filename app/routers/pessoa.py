@@ -7,6 +7,8 @@ from datetime import datetime
 from database import get_db
 from models.pessoa import Pessoa, Funcionario, Cliente
 from routers.base import BaseRouter
+from app.core.invalidation import invalidation_done
+from app.core.negative_cache import negative_cache
 
 
 # Schemas
@@ -55,8 +57,21 @@ class PessoaRouter(BaseRouter[Pessoa, PessoaCreate, PessoaUpdate, PessoaResponse
             prefix="/pessoas",
             tags=["pessoas"]
         )
+        # CPFs known not to exist
+        self.negative_cpf = negative_cache("pessoa:cpf")
         self._setup_custom_routes()
 
+    async def forget_missing(self, item: Pessoa):
+        """Drop the negative cache entry of the CPF."""
+        await self.negative_cpf.forget(item.cpf)
+
+    async def build_negative_filters(self, db: Session):
+        """Fill the id and CPF Bloom filters, if enabled."""
+        await super().build_negative_filters(db)
+        await self.negative_cpf.build_filter(
+            row.cpf for row in db.query(Pessoa.cpf).yield_per(1000)
+        )
+
     def _setup_custom_routes(self):
         """Setup custom routes for Pessoa."""
         
@@ -66,8 +81,15 @@ class PessoaRouter(BaseRouter[Pessoa, PessoaCreate, PessoaUpdate, PessoaResponse
             db: Session = Depends(get_db)
         ):
             """Buscar pessoa por CPF."""
+            if await self.negative_cpf.is_missing(cpf):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Pessoa com CPF {cpf} não encontrada"
+                )
+
             pessoa = db.query(Pessoa).filter(Pessoa.cpf == cpf).first()
             if not pessoa:
+                await self.negative_cpf.remember(cpf)
                 raise HTTPException(
                     status_code=404,
                     detail=f"Pessoa com CPF {cpf} não encontrada"
@@ -118,6 +140,7 @@ class PessoaRouter(BaseRouter[Pessoa, PessoaCreate, PessoaUpdate, PessoaResponse
             
             pessoa.ativo = False
             db.commit()
+            await invalidation_done(db)
             return {"message": "Pessoa desativada com sucesso"}
 
 
@@ -0,0 +1,156 @@
+from typing import Any, Dict, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.categoria import Categoria, Classificacao
+from models.livro import Emprestimo, Exemplar, Livro
+from models.notificacao import TemplateNotificacao
+from app.core.config import settings
+from app.core.warmup import Dataset, load_dataset
+
+
+def carregar_livros_populares(db: Session) -> List[Dict[str, Any]]:
+    """Livros mais emprestados, do mais para o menos popular."""
+    emprestimos = func.count(Emprestimo.id).label("emprestimos")
+    rows = db.query(Livro, emprestimos).join(
+        Exemplar, Exemplar.livro_id == Livro.id
+    ).join(
+        Emprestimo, Emprestimo.exemplar_id == Exemplar.id
+    ).group_by(Livro.id).order_by(
+        emprestimos.desc()
+    ).limit(settings.WARMUP_TOP_LIVROS).all()
+    return [
+        {
+            "id": livro.id,
+            "titulo": livro.titulo,
+            "autor": livro.autor,
+            "isbn": livro.isbn,
+            "editora": livro.editora,
+            "ano_publicacao": livro.ano_publicacao,
+            "emprestimos": total
+        }
+        for livro, total in rows
+    ]
+
+
+def carregar_arvore_categorias(db: Session) -> List[Dict[str, Any]]:
+    """Árvore de categorias montada a partir de uma única consulta."""
+    rows = db.query(
+        Categoria.id,
+        Categoria.nome,
+        Categoria.codigo,
+        Categoria.descricao,
+        Categoria.categoria_pai_id
+    ).order_by(Categoria.nome).all()
+
+    nodes = {
+        row.id: {
+            "id": row.id,
+            "nome": row.nome,
+            "codigo": row.codigo,
+            "descricao": row.descricao,
+            "subcategorias": []
+        }
+        for row in rows
+    }
+    raizes = []
+    for row in rows:
+        pai = nodes.get(row.categoria_pai_id)
+        if pai is None:
+            raizes.append(nodes[row.id])
+        else:
+            pai["subcategorias"].append(nodes[row.id])
+    return raizes
+
+
+def carregar_templates_ativos(db: Session) -> Dict[str, Dict[str, Any]]:
+    """Templates de notificação ativos, por código."""
+    templates = db.query(TemplateNotificacao).filter(
+        TemplateNotificacao.ativo.is_(True)
+    ).all()
+    return {
+        template.codigo: {
+            "id": template.id,
+            "codigo": template.codigo,
+            "tipo": template.tipo.value,
+            "titulo": template.titulo,
+            "corpo": template.corpo,
+            "variaveis": template.variaveis
+        }
+        for template in templates
+    }
+
+
+def carregar_codigos_classificacao(db: Session) -> Dict[str, Dict[str, Any]]:
+    """Classificações (CDD, CDU...) por código."""
+    rows = db.query(
+        Classificacao.id,
+        Classificacao.codigo,
+        Classificacao.descricao,
+        Classificacao.tipo,
+        Classificacao.categoria_id
+    ).all()
+    return {
+        row.codigo: {
+            "id": row.id,
+            "descricao": row.descricao,
+            "tipo": row.tipo,
+            "categoria_id": row.categoria_id
+        }
+        for row in rows
+    }
+
+
+LIVROS_POPULARES = Dataset(
+    name="livros_populares",
+    key="catalogo:livros_populares",
+    loader=carregar_livros_populares,
+    tags=(Livro.__tablename__, Emprestimo.__tablename__)
+)
+ARVORE_CATEGORIAS = Dataset(
+    name="arvore_categorias",
+    key="catalogo:arvore_categorias",
+    loader=carregar_arvore_categorias,
+    tags=(Categoria.__tablename__,)
+)
+TEMPLATES_ATIVOS = Dataset(
+    name="templates_ativos",
+    key="catalogo:templates_ativos",
+    loader=carregar_templates_ativos,
+    tags=(TemplateNotificacao.__tablename__,)
+)
+CODIGOS_CLASSIFICACAO = Dataset(
+    name="codigos_classificacao",
+    key="catalogo:codigos_classificacao",
+    loader=carregar_codigos_classificacao,
+    tags=(Classificacao.__tablename__,)
+)
+
+# Dados quentes pré-carregados na inicialização
+HOT_DATASETS = [
+    LIVROS_POPULARES,
+    ARVORE_CATEGORIAS,
+    TEMPLATES_ATIVOS,
+    CODIGOS_CLASSIFICACAO
+]
+
+
+async def livros_populares() -> List[Dict[str, Any]]:
+    """Livros mais emprestados (cacheado)."""
+    return await load_dataset(LIVROS_POPULARES, SessionLocal)
+
+
+async def arvore_categorias() -> List[Dict[str, Any]]:
+    """Árvore de categorias (cacheada)."""
+    return await load_dataset(ARVORE_CATEGORIAS, SessionLocal)
+
+
+async def templates_ativos() -> Dict[str, Dict[str, Any]]:
+    """Templates de notificação ativos por código (cacheados)."""
+    return await load_dataset(TEMPLATES_ATIVOS, SessionLocal)
+
+
+async def codigos_classificacao() -> Dict[str, Dict[str, Any]]:
+    """Classificações por código (cacheadas)."""
+    return await load_dataset(CODIGOS_CLASSIFICACAO, SessionLocal)
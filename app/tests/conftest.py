@@ -24,6 +24,22 @@ TestingSessionLocal = sessionmaker(
 )
 
 
+@pytest.fixture
+def anyio_backend():
+    """Run async tests on asyncio only."""
+    return "asyncio"
+
+
+@pytest.fixture(scope="function")
+async def redis_pool():
+    """Provide the shared Redis pool bound to the test event loop."""
+    from app.core.redis_pool import init_redis, close_redis
+    
+    client = await init_redis()
+    yield client
+    await close_redis()
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create test database session."""
@@ -1,82 +1,552 @@
+import asyncio
+import gzip
+import time
 import pytest
-from fastapi import status
-from app.core.cache import cache
+from fastapi import Query, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.core import cache_backends
+from app.core.cache import cache, cache_tag, Cache, LocalCache, _MISSING
+from app.core.cache_backends import MemoryBackend, RedisBackend
 from app.core.constants import CACHE_KEYS
+from app.middleware import cache as cache_middleware
+from app.middleware.auth import AuthHandler
+from app.middleware.cache import (
+    COMPRESSORS,
+    CacheHandler,
+    SingleFlight,
+    _accepted_encodings,
+    _build_response,
+    _compress_variants,
+    _query_defaults,
+    cache_response
+)
 
 
-def test_cache_set_get(client, test_user):
+@pytest.mark.anyio
+async def test_cache_set_get(redis_pool, test_user):
     """Test setting and getting from cache."""
     # Set cache
-    cache.set(f"{CACHE_KEYS['USERS']}:{test_user.id}", test_user.__dict__)
+    await cache.set(
+        f"{CACHE_KEYS['USERS']}:{test_user.id}",
+        test_user.to_dict()
+    )
     
     # Get from cache
-    cached_user = cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
+    cached_user = await cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
     assert cached_user is not None
     assert cached_user["id"] == test_user.id
     assert cached_user["nome"] == test_user.nome
     assert cached_user["email"] == test_user.email
 
 
-def test_cache_delete(client, test_user):
+@pytest.mark.anyio
+async def test_cache_delete(redis_pool, test_user):
     """Test deleting from cache."""
     # Set cache
-    cache.set(f"{CACHE_KEYS['USERS']}:{test_user.id}", test_user.__dict__)
+    await cache.set(
+        f"{CACHE_KEYS['USERS']}:{test_user.id}",
+        test_user.to_dict()
+    )
     
     # Delete from cache
-    cache.delete(f"{CACHE_KEYS['USERS']}:{test_user.id}")
+    await cache.delete(f"{CACHE_KEYS['USERS']}:{test_user.id}")
     
     # Try to get from cache
-    cached_user = cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
+    cached_user = await cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
     assert cached_user is None
 
 
-def test_cache_clear(client, test_user, test_book):
+@pytest.mark.anyio
+async def test_cache_clear(redis_pool, test_user, test_book):
     """Test clearing cache."""
     # Set multiple cache entries
-    cache.set(f"{CACHE_KEYS['USERS']}:{test_user.id}", test_user.__dict__)
-    cache.set(f"{CACHE_KEYS['BOOKS']}:{test_book.id}", test_book.__dict__)
+    await cache.set(
+        f"{CACHE_KEYS['USERS']}:{test_user.id}",
+        test_user.to_dict()
+    )
+    await cache.set(
+        f"{CACHE_KEYS['BOOKS']}:{test_book.id}",
+        {"id": test_book.id, "titulo": test_book.titulo}
+    )
     
     # Clear cache
-    cache.clear()
+    await cache.clear()
     
     # Try to get from cache
-    cached_user = cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
-    cached_book = cache.get(f"{CACHE_KEYS['BOOKS']}:{test_book.id}")
+    cached_user = await cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
+    cached_book = await cache.get(f"{CACHE_KEYS['BOOKS']}:{test_book.id}")
     assert cached_user is None
     assert cached_book is None
 
 
-def test_cache_expiration(client, test_user):
+@pytest.mark.anyio
+async def test_cache_expiration(redis_pool, test_user):
     """Test cache expiration."""
     # Set cache with short expiration
-    cache.set(
+    await cache.set(
         f"{CACHE_KEYS['USERS']}:{test_user.id}",
-        test_user.__dict__,
+        test_user.to_dict(),
         expire=1  # 1 second
     )
     
     # Wait for expiration
-    import time
     time.sleep(2)
     
     # Try to get from cache
-    cached_user = cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
+    cached_user = await cache.get(f"{CACHE_KEYS['USERS']}:{test_user.id}")
     assert cached_user is None
 
 
-def test_cache_connection_error():
+@pytest.mark.anyio
+async def test_cache_connection_error():
     """Test cache connection error handling."""
-    # Temporarily disable Redis connection
-    original_redis = cache.redis
-    cache.redis = None
+    # Cache bound to a client that fails on every call
+    broken_cache = Cache(backend=RedisBackend(client=object()))
     
     # Try to set cache
-    result = cache.set("test_key", "test_value")
+    result = await broken_cache.set("test_key", "test_value")
     assert result is False
     
     # Try to get from cache
-    value = cache.get("test_key")
+    value = await broken_cache.get("test_key")
     assert value is None
+
+
+@pytest.mark.anyio
+async def test_cache_invalidate_tags(redis_pool):
+    """Test tag-based invalidation only drops tagged entries."""
+    await cache.set("livro:42:detail", {"id": 42}, tags=[cache_tag("livro", 42)])
+    await cache.set(
+        "livro:list",
+        [{"id": 42}],
+        tags=[cache_tag("livro"), cache_tag("livro", 42)]
+    )
+    await cache.set("livro:7:detail", {"id": 7}, tags=[cache_tag("livro", 7)])
+    
+    await cache.invalidate_tags(cache_tag("livro", 42))
+    
+    assert await cache.get("livro:42:detail") is None
+    assert await cache.get("livro:list") is None
+    assert await cache.get("livro:7:detail") == {"id": 7}
+
+
+@pytest.mark.anyio
+async def test_cache_delete_pattern(redis_pool):
+    """Test SCAN-based pattern deletion."""
+    await cache.set("report:2024:01", {"total": 1})
+    await cache.set("report:2024:02", {"total": 2})
+    await cache.set("other:key", {"total": 3})
+    
+    deleted = await cache.delete_pattern("report:*")
+    
+    assert deleted == 2
+    assert await cache.get("report:2024:01") is None
+    assert await cache.get("other:key") == {"total": 3}
+
+
+@pytest.mark.anyio
+async def test_single_flight_coalesces_concurrent_calls():
+    """Test concurrent misses for one key run the function once."""
+    single_flight = SingleFlight()
+    calls = 0
+    
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"calls": calls}
+    
+    results = await asyncio.gather(
+        *[single_flight.do("key", load) for _ in range(20)]
+    )
+    
+    assert calls == 1
+    assert all(result == {"calls": 1} for result in results)
+
+
+@pytest.mark.anyio
+async def test_single_flight_shares_errors():
+    """Test waiters receive the error raised by the running call."""
+    single_flight = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+    
+    results = await asyncio.gather(
+        *[single_flight.do("key", fail) for _ in range(3)],
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cached_response_age_header():
+    """Test cached responses expose the age of the entry."""
+    meta = {
+        "created_at": time.time() - 12,
+        "status_code": 200,
+        "media_type": "application/json"
+    }
+    
+    response = _build_response(meta, b'{"status": "healthy"}')
+    
+    assert response.status_code == 200
+    assert response.body == b'{"status": "healthy"}'
+    assert response.headers["age"] == "12"
+
+
+@pytest.mark.anyio
+async def test_stale_entry_served_while_refreshed(monkeypatch):
+    """Test stale hits answer at once and refresh the entry only once."""
+    monkeypatch.setattr(cache_backends, "_backend", MemoryBackend())
+    spawned = []
+    monkeypatch.setattr(
+        cache_middleware,
+        "spawn",
+        lambda coro: spawned.append(asyncio.ensure_future(coro))
+    )
+    request_session = Session()
+    calls = []
+
+    @cache_response(expire=0, stale=60)
+    async def endpoint(request: Request, db: Session):
+        calls.append(db)
+        version = len(calls)
+        await asyncio.sleep(0.01)
+        return {"version": version}
+
+    def get():
+        return endpoint(request=make_request(), db=request_session)
+
+    assert (await get()).body == b'{"version":1}'
+    # Both stale hits get the old body; the refreshes are coalesced
+    assert (await get()).body == b'{"version":1}'
+    assert (await get()).body == b'{"version":1}'
+    await asyncio.gather(*spawned)
+
+    assert len(spawned) == 2
+    assert len(calls) == 2
+    # The refresh does not reuse the (closed) session of the request
+    assert calls[1] is not request_session
+    assert (await get()).body == b'{"version":2}'
+    await asyncio.gather(*spawned)
+
+
+@pytest.mark.anyio
+async def test_expired_entry_is_a_miss_without_stale(monkeypatch):
+    """Test an entry past ``expire`` is recomputed when stale is 0."""
+    monkeypatch.setattr(cache_backends, "_backend", MemoryBackend())
+    spawned = []
+    monkeypatch.setattr(cache_middleware, "spawn", spawned.append)
+    calls = []
+
+    @cache_response(expire=60)
+    async def endpoint(request: Request):
+        calls.append(request)
+        return {"version": len(calls)}
+
+    assert (await endpoint(request=make_request())).body == b'{"version":1}'
+    # Still stored (e.g. rounding of the TTL), but older than ``expire``
+    now = time.time() + 61
+    monkeypatch.setattr(cache_middleware.time, "time", lambda: now)
+
+    assert (await endpoint(request=make_request())).body == b'{"version":2}'
+    assert not spawned
+
+
+@pytest.mark.anyio
+async def test_uncacheable_responses_are_not_shared(monkeypatch):
+    """Test concurrent misses share only responses that can be cached."""
+    monkeypatch.setattr(cache_backends, "_backend", MemoryBackend())
+    calls = []
+
+    @cache_response(expire=60)
+    async def endpoint(request: Request):
+        calls.append(request.headers.get("authorization"))
+        await asyncio.sleep(0.01)
+        if request.headers.get("authorization"):
+            return {"ok": True}
+        return JSONResponse({"detail": "denied"}, status_code=401)
+
+    denied, allowed = await asyncio.gather(
+        endpoint(request=make_request()),
+        endpoint(request=make_request(headers={"Authorization": "x"}))
+    )
+
+    assert len(calls) == 2
+    assert denied.status_code == status.HTTP_401_UNAUTHORIZED
+    assert allowed.status_code == status.HTTP_200_OK
+    assert allowed.body == b'{"ok":true}'
+
+
+def test_cache_tag():
+    """Test invalidation tag format."""
+    assert cache_tag("livro") == "livro"
+    assert cache_tag("livro", 42) == "livro:42"
+
+
+def test_local_cache_hit_miss_counters():
+    """Test local tier hit and miss counters."""
+    local = LocalCache(max_items=10, max_bytes=1024, default_ttl=60)
+    
+    assert local.get("missing") is _MISSING
+    local.set("key", {"id": 1}, size=10)
+    assert local.get("key") == {"id": 1}
+    
+    stats = local.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["items"] == 1
+    assert stats["bytes"] == 10
+
+
+def test_local_cache_lru_eviction():
+    """Test local tier evicts least recently used entries."""
+    local = LocalCache(max_items=2, max_bytes=1024, default_ttl=60)
+    local.set("a", 1, size=1)
+    local.set("b", 2, size=1)
+    
+    # Touch "a" so "b" becomes the least recently used entry
+    local.get("a")
+    local.set("c", 3, size=1)
+    
+    assert local.get("b") is _MISSING
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+    assert local.stats()["evictions"] == 1
+
+
+def test_local_cache_memory_budget():
+    """Test local tier respects its memory budget."""
+    local = LocalCache(max_items=100, max_bytes=100, default_ttl=60)
+    local.set("a", "x", size=60)
+    local.set("b", "y", size=60)
+    
+    assert local.get("a") is _MISSING
+    assert local.get("b") == "y"
+    assert local.stats()["bytes"] == 60
     
-    # Restore Redis connection
-    cache.redis = original_redis 
\ No newline at end of file
+    # Values larger than the whole budget are never stored
+    assert local.set("c", "z", size=101) is False
+
+
+def test_local_cache_ttl():
+    """Test local tier per-key expiration."""
+    local = LocalCache(max_items=10, max_bytes=1024, default_ttl=60)
+    local.set("key", "value", size=5, ttl=0.01)
+    
+    time.sleep(0.02)
+    assert local.get("key") is _MISSING
+    assert local.stats()["items"] == 0
+
+
+def test_local_cache_delete_matching():
+    """Test local tier pattern deletion."""
+    local = LocalCache(max_items=10, max_bytes=1024, default_ttl=60)
+    local.set("livro:1", 1, size=1)
+    local.set("livro:2", 2, size=1)
+    local.set("pessoa:1", 3, size=1)
+    
+    assert local.delete_matching("livro:*") == 2
+    assert local.get("pessoa:1") == 3
+    assert local.stats()["bytes"] == 1
+
+
+@pytest.mark.anyio
+async def test_local_tier_hits_return_copies():
+    """Test changing a returned value does not change the cached one."""
+    tiered = Cache(backend=MemoryBackend())
+    value = {"id": 1, "tags": ["a"]}
+    await tiered.set("livro:1", value)
+    value["tags"].append("set")
+
+    first = await tiered.get("livro:1")
+    first["tags"].append("get")
+
+    assert await tiered.get("livro:1") == {"id": 1, "tags": ["a"]}
+    assert tiered.local.stats()["hits"] == 2
+
+
+def make_request(query: str = "", headers: dict = None) -> Request:
+    """Build a bare GET request."""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/livros",
+        "query_string": query.encode(),
+        "headers": [
+            (key.lower().encode(), value.encode())
+            for key, value in (headers or {}).items()
+        ]
+    })
+
+
+def test_cache_key_is_canonical():
+    """Test equivalent query strings share one fixed-length key."""
+    handler = CacheHandler()
+
+    key = handler.get_cache_key(make_request("a=1&b=2"))
+
+    assert key == handler.get_cache_key(make_request("b=2&a=1"))
+    assert key != handler.get_cache_key(make_request("a=1&b=3"))
+    assert len(key) == len(handler.get_cache_key(make_request("x=" * 500)))
+
+
+def test_cache_key_drops_defaults():
+    """Test parameters equal to the endpoint default are ignored."""
+    def endpoint(skip: int = 0, limit: int = Query(100), ativo: bool = True):
+        pass
+
+    handler = CacheHandler()
+    defaults = _query_defaults(endpoint)
+    key = handler.get_cache_key(make_request(), defaults=defaults)
+
+    assert defaults == {"skip": 0, "limit": 100, "ativo": True}
+    assert key == handler.get_cache_key(
+        make_request("skip=0&limit=100&ativo=true"),
+        defaults=defaults
+    )
+    assert key != handler.get_cache_key(
+        make_request("limit=10"),
+        defaults=defaults
+    )
+
+
+def test_cache_key_vary():
+    """Test vary dimensions split entries by header and token role."""
+    handler = CacheHandler()
+    auth = AuthHandler()
+    admin = auth.create_access_token({"sub": "1", "role": "admin"})
+    other_admin = auth.create_access_token({"sub": "2", "role": "admin"})
+    user = auth.create_access_token({"sub": "3", "role": "user"})
+
+    def key(token, tenant="a"):
+        return handler.get_cache_key(
+            make_request(headers={
+                "Authorization": f"Bearer {token}",
+                "X-Tenant-ID": tenant
+            }),
+            vary=["role", "tenant"]
+        )
+
+    assert key(admin) == key(other_admin)
+    assert key(admin) != key(user)
+    assert key(admin) != key(admin, tenant="b")
+
+
+
+@pytest.mark.anyio
+async def test_cache_get_set_many(redis_pool):
+    """Test batched set with per-key TTL, get and delete."""
+    await cache.set_many(
+        {"test:many:1": {"id": 1}, "test:many:2": {"id": 2}},
+        expire=60,
+        ttls={"test:many:2": 1}
+    )
+
+    values = await cache.get_many(["test:many:1", "test:many:2", "test:many:3"])
+    assert values == {"test:many:1": {"id": 1}, "test:many:2": {"id": 2}}
+    [(_, ttl)] = await cache.backend.get_many(["test:many:2"])
+    assert 0 < ttl <= 1
+
+    assert await cache.delete_many(["test:many:1", "test:many:2"]) == 2
+    assert await cache.get_many(["test:many:1", "test:many:2"]) == {}
+
+
+@pytest.mark.anyio
+async def test_cache_get_or_load_many(redis_pool):
+    """Test only missing ids reach the loader, in one call."""
+    calls = []
+
+    def loader(ids):
+        calls.append(ids)
+        return {item_id: {"id": item_id} for item_id in ids if item_id != 4}
+
+    def key(item_id):
+        return f"test:load:{item_id}"
+
+    await cache.delete_many(key(item_id) for item_id in range(1, 5))
+    await cache.set(key(1), {"id": 1})
+
+    values = await cache.get_or_load_many([1, 2, 3, 4], loader, key=key)
+
+    assert calls == [[2, 3, 4]]
+    assert values == {1: {"id": 1}, 2: {"id": 2}, 3: {"id": 3}}
+    assert await cache.get(key(2)) == {"id": 2}
+
+    await cache.get_or_load_many([1, 2, 3], loader, key=key)
+    assert len(calls) == 1
+
+    await cache.delete_many(key(item_id) for item_id in range(1, 5))
+
+
+@pytest.mark.anyio
+async def test_cache_get_or_load_many_ignores_extra_ids(redis_pool):
+    """Test ids the loader returns without being asked are dropped."""
+    def loader(ids):
+        # String ids and an extra row, as an IN query may return
+        return {"1": {"id": "1"}, 1: {"id": 1}, 9: {"id": 9}}
+
+    def key(item_id):
+        return f"test:extra:{item_id}"
+
+    await cache.delete_many([key(1), key(9)])
+
+    values = await cache.get_or_load_many([1], loader, key=key)
+
+    assert values == {1: {"id": 1}}
+    assert await cache.get(key(9)) is None
+
+    await cache.delete_many([key(1), key(9)])
+
+
+def test_accepted_encodings():
+    """Test Accept-Encoding parsing honours q-values and server order."""
+    def accepted(header):
+        return _accepted_encodings(
+            make_request(headers={"Accept-Encoding": header})
+        )
+
+    assert accepted("gzip") == ["gzip"]
+    assert accepted("gzip;q=0") == []
+    assert accepted("identity") == []
+    assert accepted("*") == list(COMPRESSORS)
+    assert _accepted_encodings(make_request()) == []
+    if "br" in COMPRESSORS:
+        assert accepted("gzip, br") == ["br", "gzip"]
+        assert accepted("gzip, br;q=0.5") == ["gzip", "br"]
+
+
+def test_compress_variants():
+    """Test only bodies worth compressing get variants."""
+    body = b'{"items": [' + b'{"id": 1}, ' * 200 + b']}'
+
+    variants = _compress_variants(body)
+
+    assert _compress_variants(b'{"id": 1}') == {}
+    assert set(variants) == set(COMPRESSORS)
+    assert gzip.decompress(variants["gzip"]) == body
+
+
+@pytest.mark.anyio
+async def test_cached_response_encoding_variants(redis_pool):
+    """Test hits serve the stored variant matching Accept-Encoding."""
+    handler = CacheHandler()
+    body = [{"id": i, "nome": "Livro"} for i in range(200)]
+    key = "test:encoded"
+
+    await handler.set_cached_response(key, JSONResponse(content=body), 60)
+
+    response = await handler.get_cached_response(key, ["gzip"])
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert gzip.decompress(response.body) == JSONResponse(content=body).body
+
+    response = await handler.get_cached_response(key)
+    assert "content-encoding" not in response.headers
+    assert response.body == JSONResponse(content=body).body
+
+    await cache.delete(key)
+
@@ -0,0 +1,157 @@
+import asyncio
+import pytest
+from app.core.cache import Cache
+from app.core.cache_backends import (
+    TAG_PREFIX, CacheBackend, DiskBackend, MemoryBackend, RedisBackend
+)
+
+
+@pytest.fixture(params=["memory", "disk"])
+async def backend(request, tmp_path):
+    """Provide each backend that runs without a server."""
+    if request.param == "memory":
+        backend = MemoryBackend(max_items=100)
+    else:
+        backend = DiskBackend(str(tmp_path / "cache.sqlite3"))
+    yield backend
+    await backend.close()
+
+
+@pytest.mark.anyio
+async def test_backend_get_set(backend):
+    """Test plain values, expiration and deletion."""
+    await backend.set_many({"a": (b"1", None), "b": (b"2", 60)})
+
+    (a, a_ttl), (b, b_ttl), (c, _) = await backend.get_many(["a", "b", "c"])
+
+    assert (a, a_ttl) == (b"1", None)
+    assert b == b"2" and 0 < b_ttl <= 60
+    assert c is None
+    assert await backend.delete_many(["a", "b", "c"]) == 2
+    assert not await backend.exists("a")
+
+
+@pytest.mark.anyio
+async def test_backend_expiration(backend):
+    """Test expired keys are gone."""
+    await backend.set_many({"a": (b"1", 0.05)})
+    await asyncio.sleep(0.1)
+
+    assert not await backend.exists("a")
+    assert await backend.get_many(["a"]) == [(None, None)]
+
+
+@pytest.mark.anyio
+async def test_backend_locks(backend):
+    """Test add is exclusive and release checks the owner."""
+    assert await backend.add("lock", b"owner", 5)
+    assert not await backend.add("lock", b"other", 5)
+    assert not await backend.delete_if_equal("lock", b"other")
+    assert await backend.delete_if_equal("lock", b"owner")
+    assert await backend.add("lock", b"other", 5)
+
+
+@pytest.mark.anyio
+async def test_backend_hash_replaces_fields(backend):
+    """Test hset drops fields of the previous version."""
+    await backend.hset("h", {"meta": b"m1", "body": b"b1", "gzip": b"g1"}, 60)
+    await backend.hset("h", {"meta": b"m2", "body": b"b2"}, 60)
+
+    assert await backend.hget("h", ["meta", "body", "gzip"]) == [
+        b"m2", b"b2", None
+    ]
+
+
+@pytest.mark.anyio
+async def test_backend_tags_and_patterns(backend):
+    """Test tag invalidation and pattern deletion."""
+    await backend.set_many(
+        {"a": (b"1", None), "b": (b"2", None)},
+        tags={"a": ["livro"], "b": ["livro", "livro:2"]}
+    )
+    await backend.hset("c", {"body": b"3"}, 60, ["livro:2"])
+
+    deleted, keys = await backend.invalidate_tags(["livro:2"])
+
+    assert deleted == 2 and keys == {"b", "c"}
+    assert await backend.exists("a")
+
+    await backend.set_many({"p:1": (b"1", None), "p:2": (b"1", None)})
+    assert await backend.delete_pattern("p:*") == 2
+
+
+def test_incomplete_backend_cannot_be_created():
+    """Test backends missing operations fail when created, not on use."""
+    class ReadOnly(CacheBackend):
+        async def get_many(self, keys):
+            return [(None, None)] * len(keys)
+
+    with pytest.raises(TypeError):
+        ReadOnly()
+
+
+@pytest.mark.anyio
+async def test_memory_backend_untags_removed_keys():
+    """Test evicted, expired and deleted keys leave no tag behind."""
+    backend = MemoryBackend(max_items=2)
+    await backend.set_many(
+        {"a": (b"1", None), "b": (b"2", 0.05)},
+        tags={"a": ["livro:1"], "b": ["livro:2"]}
+    )
+    await backend.set_many(
+        {"c": (b"3", None)}, tags={"c": ["livro:3", "livro"]}
+    )
+    await asyncio.sleep(0.1)
+    assert not await backend.exists("b")
+    await backend.delete_many(["c"])
+
+    assert backend._tags == {}
+    assert backend._key_tags == {}
+    assert backend.evictions == 1
+
+
+@pytest.mark.anyio
+async def test_redis_tag_sets_outlive_their_keys(redis_pool):
+    """Test tag set TTLs never cut members short and invalidation."""
+    backend = RedisBackend(redis_pool)
+    tag_key, persistent_key = f"{TAG_PREFIX}test:ttl", f"{TAG_PREFIX}test:p"
+    await redis_pool.delete(tag_key, persistent_key)
+
+    await backend.set_many(
+        {"test:a": (b"1", 100), "test:b": (b"2", None)},
+        tags={"test:a": ["test:ttl"], "test:b": ["test:p"]}
+    )
+    await backend.set_many(
+        {"test:c": (b"3", 10)}, tags={"test:c": ["test:ttl"]}
+    )
+    assert 90 < await redis_pool.ttl(tag_key) <= 100
+
+    await backend.hset("test:d", {"body": b"4"}, 300, ["test:ttl"])
+    assert 290 < await redis_pool.ttl(tag_key) <= 300
+    assert await redis_pool.scard(tag_key) == 3
+
+    # An expiring member must not put a TTL on a set with persistent ones
+    await backend.set_many(
+        {"test:e": (b"5", 10)}, tags={"test:e": ["test:p"]}
+    )
+    assert await redis_pool.ttl(persistent_key) == -1
+
+    deleted, keys = await backend.invalidate_tags(["test:ttl", "test:p"])
+
+    # Only data keys are counted, not the tag sets
+    assert deleted == 5
+    assert keys == {"test:a", "test:b", "test:c", "test:d", "test:e"}
+    assert not await redis_pool.exists(tag_key, persistent_key)
+
+
+@pytest.mark.anyio
+async def test_cache_on_memory_backend():
+    """Test the two-tier cache works without Redis."""
+    local_cache = Cache(backend=MemoryBackend())
+
+    assert await local_cache.set("livro:1", {"id": 1}, tags=["livro"])
+    local_cache.local.clear()
+
+    assert await local_cache.get("livro:1") == {"id": 1}
+    assert await local_cache.invalidate_tags("livro") == 1
+    assert await local_cache.get("livro:1") is None
@@ -0,0 +1,86 @@
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+import pytest
+from app.core.codecs import (
+    Codec, CodecError, Compressor, Serializer, serializer
+)
+
+
+class Status(Enum):
+    ATIVO = "ativo"
+
+
+def test_serializer_round_trip():
+    """Test model types are encoded like API responses."""
+    value = {
+        "criado": datetime(2024, 1, 1, 12, 0, 0),
+        "nascimento": date(1990, 5, 17),
+        "status": Status.ATIVO,
+        "preco": Decimal("19.90"),
+        "quantidade": Decimal("3"),
+        "tags": ["a", "b"]
+    }
+
+    decoded = serializer.decode(serializer.encode(value))
+
+    assert decoded == {
+        "criado": "2024-01-01T12:00:00",
+        "nascimento": "1990-05-17",
+        "status": "ativo",
+        "preco": 19.9,
+        "quantidade": 3,
+        "tags": ["a", "b"]
+    }
+
+
+def test_serializer_reads_other_codecs():
+    """Test values written with another codec can still be read."""
+    payload = Serializer(codec="json").encode({"id": 1})
+
+    assert serializer.decode(payload) == {"id": 1}
+
+
+def test_serializer_compression_threshold():
+    """Test only payloads above the threshold are compressed."""
+    compressing = Serializer(compression="zstd", threshold=64)
+    if compressing.compressor is None:
+        pytest.skip("zstandard not installed")
+
+    small = compressing.encode("x")
+    large = compressing.encode("x" * 4096)
+
+    assert small[0] & 0x0F == 0
+    assert large[0] & 0x0F != 0
+    assert len(large) < 4096
+    assert serializer.decode(large) == "x" * 4096
+
+
+def test_serializer_unavailable_codec_falls_back():
+    """Test unknown codecs fall back to stdlib JSON."""
+    fallback = Serializer(codec="unknown", compression="unknown")
+
+    assert fallback.codec.name == "json"
+    assert fallback.compressor is None
+
+
+def test_serializer_invalid_payload():
+    """Test malformed payloads raise CodecError."""
+    with pytest.raises(CodecError):
+        serializer.decode(b"")
+    with pytest.raises(CodecError):
+        serializer.decode(b"\x00garbage")
+    with pytest.raises(CodecError):
+        serializer.decode(bytes([0x10]) + b"{not json")
+
+
+def test_incomplete_codecs_cannot_be_created():
+    """Test codecs and compressors must implement both directions."""
+    class DumpOnly(Codec):
+        def dumps(self, value):
+            return b""
+
+    with pytest.raises(TypeError):
+        DumpOnly()
+    with pytest.raises(TypeError):
+        Compressor()
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from fastapi import Request, status
+from app.core.conditional import (
+    http_date,
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    not_modified_response
+)
+
+
+def make_request(headers: dict) -> Request:
+    """Build a bare request with the given headers."""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [
+            (key.lower().encode(), value.encode())
+            for key, value in headers.items()
+        ]
+    })
+
+
+def test_make_etag():
+    """Test ETags are stable, quoted and sensitive to their parts."""
+    updated_at = datetime(2024, 1, 1, 12, 0, 0)
+    etag = make_etag(1, updated_at)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == make_etag(1, updated_at)
+    assert etag != make_etag(1, updated_at + timedelta(seconds=1))
+    assert etag != make_etag(2, updated_at)
+
+
+def test_http_date():
+    """Test HTTP date formatting of naive UTC datetimes."""
+    assert http_date(datetime(2024, 1, 1, 12, 0, 0)) == (
+        "Mon, 01 Jan 2024 12:00:00 GMT"
+    )
+
+
+def test_if_none_match():
+    """Test If-None-Match evaluation."""
+    etag = make_etag(1, "v1")
+
+    assert is_not_modified(make_request({"If-None-Match": etag}), etag)
+    assert is_not_modified(make_request({"If-None-Match": f"W/{etag}"}), etag)
+    assert is_not_modified(make_request({"If-None-Match": "*"}), etag)
+    assert is_not_modified(
+        make_request({"If-None-Match": f'"other", {etag}'}),
+        etag
+    )
+    assert not is_not_modified(
+        make_request({"If-None-Match": make_etag(1, "v2")}),
+        etag
+    )
+
+
+def test_if_modified_since():
+    """Test If-Modified-Since evaluation."""
+    updated_at = datetime(2024, 1, 1, 12, 0, 0, 500000)
+    etag = make_etag(1, updated_at)
+
+    same = make_request({"If-Modified-Since": http_date(updated_at)})
+    older = make_request({
+        "If-Modified-Since": http_date(updated_at - timedelta(minutes=1))
+    })
+
+    assert is_not_modified(same, etag, updated_at)
+    assert not is_not_modified(older, etag, updated_at)
+
+    # If-None-Match takes precedence over If-Modified-Since
+    both = make_request({
+        "If-None-Match": '"other"',
+        "If-Modified-Since": http_date(updated_at)
+    })
+    assert not is_not_modified(both, etag, updated_at)
+
+
+def test_is_conditional():
+    """Test detection of conditional requests."""
+    assert is_conditional(make_request({"If-None-Match": '"x"'}))
+    assert not is_conditional(make_request({}))
+
+
+def test_not_modified_response():
+    """Test 304 responses carry validators and no body."""
+    updated_at = datetime(2024, 1, 1, 12, 0, 0)
+    etag = make_etag(1, updated_at)
+
+    response = not_modified_response(etag, updated_at)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["last-modified"] == http_date(updated_at)
@@ -1,4 +1,5 @@
 import pytest
+from app.core.config import settings
 from app.core.dependencies import (
     get_current_user,
     get_current_active_user,
@@ -8,6 +9,9 @@ from app.core.exceptions import (
     AuthenticationException,
     AuthorizationException
 )
+from app.core.principal import principal_cache
+from app.core.token_cache import TokenCache
+from app.middleware import auth
 
 
 def test_get_current_user(db, test_user):
@@ -15,7 +19,7 @@ def test_get_current_user(db, test_user):
     # Test with valid token
     user = get_current_user(db, test_user.id)
     assert user.id == test_user.id
-    assert user.email == test_user.email
+    assert user.ativo == test_user.ativo
     
     # Test with invalid token
     with pytest.raises(AuthenticationException):
@@ -80,4 +84,32 @@ def test_dependency_error_handling(db):
     from app.core.security import create_access_token
     token = create_access_token({"invalid": "payload"})
     with pytest.raises(AuthenticationException):
-        get_current_user(db, token) 
\ No newline at end of file
+        get_current_user(db, token) 
+
+def test_get_current_user_uses_caches(db, test_user, monkeypatch):
+    """Test repeated requests neither decode the token nor query the user."""
+    monkeypatch.setattr(auth, "token_cache", TokenCache())
+    principal_cache.clear()
+    token = auth.AuthHandler(
+        settings.SECRET_KEY, settings.ALGORITHM
+    ).create_access_token({"sub": str(test_user.id)})
+    decode = auth.jwt.decode
+    decodes = []
+    monkeypatch.setattr(
+        auth.jwt, "decode",
+        lambda *args, **kwargs: decodes.append(args) or decode(*args, **kwargs)
+    )
+    query = db.query
+    queries = []
+    monkeypatch.setattr(
+        db, "query",
+        lambda *args: queries.append(args) or query(*args)
+    )
+
+    first = get_current_user(db, token)
+    second = get_current_user(db, token)
+
+    assert first == second
+    assert first.id == test_user.id
+    assert len(decodes) == 1
+    assert len(queries) == 1
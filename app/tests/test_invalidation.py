@@ -0,0 +1,78 @@
+import pytest
+from app.core.cache import cache, cache_tag
+from app.core.invalidation import CHANGES_KEY, invalidation_done
+from app.core.principal import Principal, get_principal, remember_principal
+
+
+@pytest.mark.anyio
+async def test_commit_invalidates_tagged_entries(redis_pool, db, test_user):
+    """Test committing a change drops the entries tagged with the row."""
+    key = f"test:pessoa:{test_user.id}"
+    await cache.set(
+        key,
+        {"id": test_user.id},
+        tags=[cache_tag("pessoa", test_user.id)]
+    )
+
+    test_user.nome = "Renamed User"
+    db.commit()
+    await invalidation_done(db)
+
+    assert await cache.get(key) is None
+
+
+@pytest.mark.anyio
+async def test_unchanged_rows_are_not_invalidated(redis_pool, db, test_user):
+    """Test assigning the current value does not invalidate anything."""
+    key = f"test:pessoa:{test_user.id}"
+    await cache.set(
+        key,
+        {"id": test_user.id},
+        tags=[cache_tag("pessoa", test_user.id)]
+    )
+
+    test_user.nome = test_user.nome
+    db.commit()
+    await invalidation_done(db)
+
+    assert await cache.get(key) == {"id": test_user.id}
+    await cache.delete(key)
+
+
+def test_rollback_discards_changes(db, test_user):
+    """Test rolled back changes are not invalidated later."""
+    test_user.nome = "Rolled Back"
+    db.flush()
+    assert db.info[CHANGES_KEY]
+
+    db.rollback()
+
+    assert CHANGES_KEY not in db.info
+
+
+def test_savepoint_rollback_keeps_outer_changes(db, test_user):
+    """Test rolling back a savepoint keeps changes flushed before it."""
+    test_user.nome = "Outer Change"
+    db.flush()
+
+    savepoint = db.begin_nested()
+    test_user.nome = "Inner Change"
+    db.flush()
+    savepoint.rollback()
+
+    assert ("pessoa", test_user.id, False) in db.info[CHANGES_KEY]
+    db.rollback()
+    assert CHANGES_KEY not in db.info
+
+
+@pytest.mark.anyio
+async def test_commit_drops_cached_principal(redis_pool, db, test_user):
+    """Test deactivating a user is seen by the next authenticated request."""
+    remember_principal(Principal.from_user(test_user))
+    assert get_principal(test_user.id).ativo
+
+    test_user.ativo = False
+    db.commit()
+    await invalidation_done(db)
+
+    assert get_principal(test_user.id) is None
@@ -0,0 +1,220 @@
+import io
+import json
+import logging
+import queue
+import pytest
+from app.core import logging as logging_core
+from app.core.config import settings
+from app.core.logging import (
+    BatchStreamHandler, BoundedQueueHandler, LogWriter, StructuredFormatter,
+    setup_logging, stop_logging
+)
+from app.middleware import logging as logging_middleware
+from app.middleware.logging import (
+    AccessLog, BodyTee, LoggingMiddleware, should_capture_body
+)
+
+
+def make_record(level: int, msg: str) -> logging.LogRecord:
+    """Build a record for the ``test`` logger."""
+    return logging.makeLogRecord({
+        "name": "test",
+        "levelno": level,
+        "levelname": logging.getLevelName(level),
+        "msg": msg
+    })
+
+
+def test_queue_handler_samples_low_levels_under_pressure():
+    """Test INFO is sampled above the high-water mark, errors are not."""
+    log_queue = queue.Queue(maxsize=10)
+    handler = BoundedQueueHandler(log_queue, high_water=0.5, sample_rate=2)
+
+    for i in range(9):
+        handler.emit(make_record(logging.INFO, f"info {i}"))
+    handler.emit(make_record(logging.ERROR, "error"))
+
+    # 5 fill up to the mark, then 1 in 2 of the other 4
+    assert log_queue.qsize() == 8
+    assert handler.dropped == 2
+
+
+def test_queue_handler_never_blocks_when_full():
+    """Test records are dropped once the queue is full."""
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, high_water=1.0)
+
+    for _ in range(4):
+        handler.emit(make_record(logging.ERROR, "error"))
+
+    assert log_queue.qsize() == 2
+    assert handler.dropped == 2
+
+
+def test_log_writer_writes_and_reports_drops():
+    """Test queued records reach the handlers with a drop summary."""
+    stream = io.StringIO()
+    output = BatchStreamHandler(stream)
+    output.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    log_queue = queue.Queue(maxsize=2)
+    source = BoundedQueueHandler(log_queue, high_water=1.0)
+    writer = LogWriter(log_queue, source, output)
+
+    for i in range(3):
+        source.emit(make_record(logging.INFO, f"info {i}"))
+    writer.start()
+    writer.stop()
+
+    assert stream.getvalue().splitlines() == [
+        "INFO info 0",
+        "INFO info 1",
+        "WARNING Log queue saturated: 1 records dropped"
+    ]
+
+
+def test_stop_logging_after_stream_closed(monkeypatch, capsys, tmp_path):
+    """Test shutdown does not fail once stdout has been closed."""
+    # A real file: unlike StringIO, it refuses to flush once closed
+    stream = open(tmp_path / "stdout.log", "w")
+    monkeypatch.setattr("sys.stdout", stream)
+    setup_logging()
+    stream.close()
+
+    stop_logging()
+
+    assert capsys.readouterr().err == ""
+
+
+def test_setup_logging_is_idempotent():
+    """Test a second setup keeps the running writer and its handler."""
+    root = logging.getLogger()
+    setup_logging()
+    handlers = list(root.handlers)
+    writer = logging_core._writer
+
+    setup_logging()
+
+    assert logging_core._writer is writer
+    assert root.handlers == handlers
+    stop_logging()
+    assert logging_core._writer is None
+
+
+@pytest.mark.anyio
+async def test_body_tee_copies_only_the_first_bytes():
+    """Test the app gets the whole stream while only a prefix is kept."""
+    messages = [
+        {"type": "http.request", "body": b"abcdef", "more_body": True},
+        {"type": "http.request", "body": b"ghij", "more_body": False}
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    tee = BodyTee(receive, limit=8)
+    received = [await tee(), await tee()]
+
+    assert b"".join(m["body"] for m in received) == b"abcdefghij"
+    assert tee.body == b"abcdefgh"
+    assert tee.truncated
+
+
+def test_body_capture_is_opt_in(monkeypatch):
+    """Test bodies are captured only when enabled, at DEBUG, on routes."""
+    scope = {"type": "http", "method": "POST", "path": "/pessoas/"}
+    monkeypatch.setattr(settings, "LOG_BODY_ENABLED", True)
+    monkeypatch.setattr(settings, "LOG_BODY_ROUTES", [])
+    logging_middleware.logger.setLevel(logging.INFO)
+    assert not should_capture_body(scope)
+
+    logging_middleware.logger.setLevel(logging.DEBUG)
+    monkeypatch.setattr(settings, "LOG_BODY_ENABLED", False)
+    assert not should_capture_body(scope)
+
+    monkeypatch.setattr(settings, "LOG_BODY_ENABLED", True)
+    monkeypatch.setattr(settings, "LOG_BODY_ROUTES", ["/pessoas/*"])
+    monkeypatch.setattr(settings, "LOG_BODY_SAMPLE_RATE", 1.0)
+    assert should_capture_body(scope)
+    assert not should_capture_body({**scope, "method": "GET"})
+    assert not should_capture_body({**scope, "path": "/empresas/"})
+
+    monkeypatch.setattr(settings, "LOG_BODY_SAMPLE_RATE", 0.0)
+    assert not should_capture_body(scope)
+    logging_middleware.logger.setLevel(logging.NOTSET)
+
+
+@pytest.mark.anyio
+async def test_logging_middleware_sets_request_headers():
+    """Test request id and process time are added in a single pass."""
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["request_id"] = scope["state"]["request_id"]
+        await send({"type": "http.response.start", "status": 201,
+                    "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def run(headers):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": "/",
+                 "headers": headers}
+        await LoggingMiddleware(app)(scope, receive, send)
+        return dict(sent[0]["headers"])
+
+    headers = await run([(b"x-request-id", b"abc")])
+    assert seen["request_id"] == "abc"
+    assert headers[b"x-request-id"] == b"abc"
+    assert float(headers[b"x-process-time"]) >= 0
+
+    # Without the header an id is generated
+    headers = await run([])
+    assert headers[b"x-request-id"] == seen["request_id"].encode()
+    assert len(seen["request_id"]) == 32
+
+
+def test_access_log_samples_by_status(caplog):
+    """Test status classes are sampled and only allowed headers kept."""
+    access_log = AccessLog({"2xx": 0.0}, headers=["User-Agent"])
+    scope = {
+        "type": "http", "method": "GET", "path": "/pessoas/",
+        "client": ("10.0.0.1", 1234),
+        "headers": [(b"user-agent", b"test"), (b"authorization", b"x")]
+    }
+
+    with caplog.at_level(logging.INFO, logger="library_api.access"):
+        access_log.log(scope, 200, 0.01, "a", 10)
+        access_log.log(scope, 503, 0.25, "b", 20)
+
+    assert [record.access["request_id"] for record in caplog.records] == ["b"]
+    assert caplog.records[0].access == {
+        "request_id": "b",
+        "method": "GET",
+        "path": "/pessoas/",
+        "status": 503,
+        "duration_ms": 250.0,
+        "bytes": 20,
+        "client": "10.0.0.1",
+        "headers": {"user-agent": "test"},
+        "sample_rate": 1.0
+    }
+
+
+def test_structured_formatter_writes_access_records_as_json():
+    """Test access records become one JSON line, others stay text."""
+    formatter = StructuredFormatter("%(levelname)s %(message)s")
+    record = make_record(logging.INFO, "GET / 200")
+    record.access = {"status": 200, "path": "/"}
+
+    line = formatter.format(record)
+
+    assert "\n" not in line
+    assert json.loads(line)["status"] == 200
+    assert "ts" in json.loads(line)
+    assert formatter.format(make_record(logging.INFO, "hi")) == "INFO hi"
@@ -0,0 +1,10 @@
+import importlib
+
+
+def test_main_imports():
+    """Test the application module loads with its startup datasets."""
+    main = importlib.import_module("app.main")
+    catalogo = importlib.import_module("app.services.catalogo_service")
+
+    assert main.app.router.routes
+    assert main.HOT_DATASETS is catalogo.HOT_DATASETS
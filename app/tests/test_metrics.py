@@ -0,0 +1,138 @@
+import pytest
+from fastapi import Request
+from app.core import cache_backends
+from app.core.cache import Cache
+from app.core.cache_backends import MemoryBackend
+from app.core.config import settings
+from app.core.metrics import (
+    CACHE_ENTRY_SIZE, CACHE_REQUESTS, CACHE_TIER_REQUESTS, MetricsRegistry,
+    metrics
+)
+from app.middleware.cache import cache_response
+
+
+@pytest.fixture
+def memory_backend(monkeypatch):
+    """Use an in-memory backend as the shared cache backend."""
+    backend = MemoryBackend()
+    monkeypatch.setattr(cache_backends, "_backend", backend)
+    return backend
+
+
+def make_request(path: str) -> Request:
+    """Build a bare GET request."""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": b"",
+        "headers": []
+    })
+
+
+@pytest.mark.anyio
+async def test_registry_renders_prometheus_text():
+    """Test counters, histograms and collectors are exposed."""
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests.")
+    registry.describe("latency_seconds", "histogram", "Latency.", (0.1, 1))
+    registry.register_collector(lambda: [("items", {"tier": "local"}, 3)])
+
+    registry.inc("requests_total", route="/a", result="hit")
+    registry.inc("requests_total", route="/a", result="hit")
+    registry.observe("latency_seconds", 0.05, op="get")
+    registry.observe("latency_seconds", 5, op="get")
+
+    text = await registry.render()
+
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{result="hit",route="/a"} 2' in text
+    assert 'items{tier="local"} 3' in text
+    assert 'latency_seconds_bucket{op="get",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{op="get",le="1"} 1' in text
+    assert 'latency_seconds_bucket{op="get",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{op="get"} 2' in text
+
+
+@pytest.mark.anyio
+async def test_registry_merges_counters_and_collectors():
+    """Test a collector reporting a counter name keeps both series."""
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "counter", "Requests.")
+    registry.register_collector(
+        lambda: [("requests_total", {"route": "/b"}, 5)]
+    )
+    registry.inc("requests_total", route="/a")
+
+    text = await registry.render()
+
+    assert 'requests_total{route="/a"} 1' in text
+    assert 'requests_total{route="/b"} 5' in text
+    assert text.count("# TYPE requests_total counter") == 1
+
+
+@pytest.mark.anyio
+async def test_registry_skips_failing_collectors():
+    """Test a broken collector never breaks the endpoint."""
+    registry = MetricsRegistry()
+
+    def broken():
+        raise RuntimeError("down")
+
+    registry.register_collector(broken)
+    registry.register_collector(lambda: [("up", {}, 1)])
+
+    assert await registry.collect() == [("up", {}, 1)]
+
+
+@pytest.mark.anyio
+async def test_cache_collects_tier_metrics():
+    """Test tier lookups, size and evictions are reported."""
+    backend = MemoryBackend(max_items=1)
+    tiered = Cache(backend=backend)
+    await tiered.set("a", 1)
+    await tiered.set("b", 2)
+    tiered.local.clear()
+    await tiered.get("a")
+    await tiered.get("b")
+
+    samples = {
+        (name, tuple(sorted(labels.items()))): value
+        for name, labels, value in await tiered.collect_metrics()
+    }
+
+    hits = (CACHE_TIER_REQUESTS, (("result", "hit"), ("tier", "memory")))
+    misses = (CACHE_TIER_REQUESTS, (("result", "miss"), ("tier", "memory")))
+    assert samples[hits] == 1
+    assert samples[misses] == 1
+    assert samples[("cache_evictions_total", (("tier", "memory"),))] == 1
+    assert samples[("cache_items", (("tier", "memory"),))] == 1
+
+
+@pytest.mark.anyio
+async def test_cache_response_counts_results(memory_backend, monkeypatch):
+    """Test misses, hits and stale serves are counted and flagged."""
+    monkeypatch.setattr(settings, "CACHE_DEBUG_HEADER", True)
+    metrics.reset()
+
+    @cache_response(expire=60)
+    async def fresh(request: Request):
+        return {"status": "ok"}
+
+    @cache_response(expire=0, stale=60)
+    async def stale(request: Request):
+        return {"status": "ok"}
+
+    route = fresh.__wrapped__.__qualname__
+    response = await fresh(request=make_request("/fresh"))
+    assert response.headers["x-cache"] == "MISS"
+    response = await fresh(request=make_request("/fresh"))
+    assert response.headers["x-cache"] == "HIT"
+
+    await stale(request=make_request("/stale"))
+    response = await stale(request=make_request("/stale"))
+    assert response.headers["x-cache"] == "STALE"
+
+    assert metrics.counter_value(CACHE_REQUESTS, route=route, result="miss") == 1
+    assert metrics.counter_value(CACHE_REQUESTS, route=route, result="hit") == 1
+    assert metrics.histogram(CACHE_ENTRY_SIZE, route=route).count == 1
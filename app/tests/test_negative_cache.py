@@ -0,0 +1,65 @@
+import pytest
+from app.core.negative_cache import BloomFilter, NegativeCache
+
+
+def test_bloom_filter_sizing():
+    """Test bit and hash counts follow capacity and error rate."""
+    bloom = BloomFilter("test", capacity=1000, error_rate=0.01)
+
+    assert 9000 < bloom.size < 10000
+    assert bloom.hashes == 7
+    assert bloom.key == "bloom:test"
+
+
+def test_bloom_filter_offsets():
+    """Test offsets are deterministic and within the filter."""
+    bloom = BloomFilter("test", capacity=1000, error_rate=0.01)
+
+    offsets = bloom.offsets("12345678901")
+
+    assert offsets == bloom.offsets("12345678901")
+    assert len(offsets) == bloom.hashes
+    assert all(0 <= offset < bloom.size for offset in offsets)
+
+
+def test_bloom_filter_requires_ready_bit():
+    """Test an incomplete filter never answers "absent"."""
+    bloom = BloomFilter("test", capacity=1000, error_rate=0.01)
+
+    assert not bloom.is_absent([0, 0, 0])
+    assert bloom.is_absent([1, 1, 0])
+    assert not bloom.is_absent([1, 1, 1])
+
+
+@pytest.mark.anyio
+async def test_negative_cache_remember_forget(redis_pool):
+    """Test misses are remembered until the value is created."""
+    negative = NegativeCache("test_negative", ttl=30)
+    await negative.forget(42)
+
+    assert not await negative.is_missing(42)
+    await negative.remember(42)
+    assert await negative.is_missing(42)
+    await negative.forget(42)
+    assert not await negative.is_missing(42)
+
+
+@pytest.mark.anyio
+async def test_negative_cache_bloom_filter(redis_pool):
+    """Test a built filter rules out values never added."""
+    bloom = BloomFilter("test_negative_bloom", capacity=100, error_rate=0.01)
+    negative = NegativeCache("test_negative_bloom", bloom=bloom)
+    await bloom.redis.delete(bloom.key)
+
+    # Not built yet: every lookup goes to the database
+    assert not await negative.is_missing("b")
+
+    await negative.build_filter(["a"])
+    assert not await negative.is_missing("a")
+    assert await negative.is_missing("b")
+
+    # Created rows are added to the filter
+    await negative.forget("b")
+    assert not await negative.is_missing("b")
+
+    await bloom.redis.delete(bloom.key)
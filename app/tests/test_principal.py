@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+from app.core.principal import (
+    Principal, forget_principals, get_principal, principal_cache,
+    remember_principal
+)
+from app.models.pessoa import TipoPessoa
+
+
+def test_principal_from_user():
+    """Test the snapshot keeps only id, status and roles."""
+    user = SimpleNamespace(
+        id=7, ativo=True, tipo=TipoPessoa.FUNCIONARIO, admin=True,
+        email="user@example.com"
+    )
+
+    principal = Principal.from_user(user)
+
+    assert principal == (7, True, frozenset({"funcionario", "admin"}))
+    assert principal.admin
+    assert not Principal(id=8, ativo=True).admin
+
+
+def test_principal_cache_by_user_id():
+    """Test principals are found by id, whatever its type in the token."""
+    principal_cache.clear()
+    remember_principal(Principal(id=7, ativo=True))
+
+    assert get_principal("7") == Principal(id=7, ativo=True)
+    assert forget_principals(7, 8) == 1
+    assert get_principal(7) is None
+
+
+def test_principal_cache_has_no_byte_budget():
+    """Test principals are bounded by count only."""
+    assert principal_cache.max_bytes is None
+    principal_cache.clear()
+    remember_principal(Principal(id=1, ativo=True))
+
+    assert get_principal(1) is not None
+    assert principal_cache.stats()["bytes"] == 0
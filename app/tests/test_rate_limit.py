@@ -0,0 +1,106 @@
+import pytest
+from app.core.rate_limit import (
+    RATE_LIMIT_KEY_PREFIX, RateLimiter, RedisRateLimiter
+)
+
+
+def test_rate_limiter_allows_burst_then_rejects():
+    """Test a full burst passes and the next request is rejected."""
+    limiter = RateLimiter(limit=60, period=60, burst=10)
+
+    results = [limiter.acquire("client", now=100.0) for _ in range(11)]
+
+    assert all(result.allowed for result in results[:10])
+    assert [result.remaining for result in results[:3]] == [9, 8, 7]
+    assert results[9].remaining == 0
+    assert not results[10].allowed
+    assert results[10].retry_after == 1.0
+    assert results[10].reset_after == 10.0
+
+
+def test_rate_limiter_refills_at_sustained_rate():
+    """Test one request is regained per interval."""
+    limiter = RateLimiter(limit=60, period=60, burst=2)
+    limiter.acquire("client", now=0.0)
+    limiter.acquire("client", now=0.0)
+
+    assert not limiter.acquire("client", now=0.5).allowed
+    assert limiter.acquire("client", now=1.0).allowed
+    assert not limiter.acquire("client", now=1.0).allowed
+    assert limiter.acquire("client", now=10.0).remaining == 1
+
+
+def test_rate_limiter_is_per_client():
+    """Test clients do not share a budget."""
+    limiter = RateLimiter(limit=1, period=60)
+
+    assert limiter.acquire("a", now=0.0).allowed
+    assert not limiter.acquire("a", now=0.0).allowed
+    assert limiter.acquire("b", now=0.0).allowed
+    assert len(limiter.requests) == 2
+
+
+def test_rate_limit_headers():
+    """Test X-RateLimit-* and Retry-After headers."""
+    limiter = RateLimiter(limit=1, period=60)
+    allowed = limiter.acquire("a", now=0.0)
+    rejected = limiter.acquire("a", now=0.5)
+
+    assert allowed.headers() == {
+        "X-RateLimit-Limit": "1",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "60"
+    }
+    assert rejected.headers()["Retry-After"] == "60"
+
+
+def test_rate_limiter_evicts_least_recently_seen():
+    """Test the client table never grows past its limit."""
+    limiter = RateLimiter(limit=10, period=60, max_clients=2)
+    limiter.acquire("a", now=0.0)
+    limiter.acquire("b", now=0.0)
+    limiter.acquire("a", now=1.0)
+    limiter.acquire("c", now=1.0)
+
+    assert list(limiter.requests) == ["a", "c"]
+    assert limiter.evictions == 1
+
+
+@pytest.mark.anyio
+async def test_rate_limiter_sweep_removes_idle_clients():
+    """Test only clients with a full budget are swept."""
+    limiter = RateLimiter(limit=60, period=60, burst=5)
+    for _ in range(5):
+        limiter.acquire("busy", now=100.0)
+    limiter.acquire("idle", now=0.0)
+
+    assert await limiter.sweep(now=102.0, batch_size=1) == 1
+    assert list(limiter.requests) == ["busy"]
+    assert limiter.collect_metrics()[0][2] == 1
+
+
+@pytest.mark.anyio
+async def test_redis_rate_limiter_shares_budget(redis_pool):
+    """Test limiters on different workers share one budget."""
+    first = RedisRateLimiter(RateLimiter(limit=60, period=60, burst=2))
+    second = RedisRateLimiter(RateLimiter(limit=60, period=60, burst=2))
+    await redis_pool.delete(f"{RATE_LIMIT_KEY_PREFIX}default:shared")
+
+    assert (await first.acquire("shared")).remaining == 1
+    assert (await second.acquire("shared")).remaining == 0
+    rejected = await first.acquire("shared")
+
+    assert not rejected.allowed
+    assert 0 < rejected.retry_after <= 1
+    await redis_pool.delete(f"{RATE_LIMIT_KEY_PREFIX}default:shared")
+
+
+@pytest.mark.anyio
+async def test_redis_rate_limiter_falls_back_to_local():
+    """Test a broken Redis falls back to the local limiter."""
+    local = RateLimiter(limit=1, period=60)
+    limiter = RedisRateLimiter(local, client=object(), retry_after=60)
+
+    assert (await limiter.acquire("a")).allowed
+    assert not (await limiter.acquire("a")).allowed
+    assert "a" in local.requests
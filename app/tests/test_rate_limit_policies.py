@@ -0,0 +1,125 @@
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from app.core.constants import UserRole
+from app.core.rate_limit import RateLimiter, rate_limiter
+from app.core.rate_limit_policies import (
+    RATE_LIMIT_POLICIES, RateLimitPolicies, RateLimitPolicy,
+    install_rate_limits
+)
+
+
+def test_policies_resolve_most_specific_rule():
+    """Test route beats API key, API key beats role, role beats default."""
+    policies = RateLimitPolicies([
+        RateLimitPolicy("t1-search", 10, routes=("GET /pessoas/buscar/*",)),
+        RateLimitPolicy("t1-staff", 100, roles=("admin",)),
+        RateLimitPolicy("t1-partner", 1000, clients=("key",))
+    ])
+
+    table, roles, clients = policies.resolve(
+        "/pessoas/buscar/nome", ["GET"]
+    )
+
+    # The route rule always wins: roles and keys are not even looked up
+    assert not roles and not clients
+    assert table == {("GET", None, None): table[("GET", None, None)]}
+    assert table[("GET", None, None)].name == "t1-search"
+
+    table, roles, clients = policies.resolve("/pessoas/", ["GET"])
+    assert roles == {"admin"} and clients == {"key"}
+    assert table[("GET", None, None)] is rate_limiter
+    assert table[("GET", "admin", None)].name == "t1-staff"
+    assert table[("GET", "admin", "key")].name == "t1-partner"
+
+
+def test_staff_keeps_search_budget():
+    """Test an admin token on the search route still gets its limiter."""
+    policies = RateLimitPolicies(RATE_LIMIT_POLICIES)
+    table, roles, _ = policies.resolve("/pessoas/buscar/nome", ["GET"])
+
+    # Staff tokens are looked up as no role, which gets the search rule
+    assert UserRole.ADMIN.value not in roles
+    assert table[("GET", None, None)].name == "search"
+    assert not policies.resolve("/health", ["GET"])[1]
+    assert policies.resolve("/pessoas/{item_id}", ["GET"])[0][
+        ("GET", UserRole.ADMIN.value, None)
+    ].name == "staff"
+
+
+def test_policies_route_patterns():
+    """Test method-qualified and unmatched routes."""
+    policies = RateLimitPolicies([
+        RateLimitPolicy("t2-listings", 10, routes=("GET /*/",)),
+        RateLimitPolicy("t2-health", 600, routes=("/health",))
+    ])
+
+    assert policies.resolve("/pessoas/", ["GET"])[0][
+        ("GET", None, None)
+    ].name == "t2-listings"
+    assert policies.resolve("/pessoas/", ["POST"])[0][
+        ("POST", None, None)
+    ] is rate_limiter
+    assert policies.resolve("/health", ["GET"])[0][
+        ("GET", None, None)
+    ].name == "t2-health"
+    # Requests matching no route only get rules without routes
+    assert policies.resolve(None, ["GET"])[0][
+        ("GET", None, None)
+    ] is rate_limiter
+
+
+def test_install_rate_limits():
+    """Test routes are limited by their own policy with headers."""
+    app = FastAPI()
+
+    @app.get("/caro")
+    async def caro():
+        return {"ok": True}
+
+    @app.get("/barato")
+    async def barato():
+        return {"ok": True}
+
+    install_rate_limits(app, RateLimitPolicies([
+        RateLimitPolicy("t3-caro", 60, burst=2, routes=("/caro",)),
+        RateLimitPolicy("t3-partner", 600, clients=("key",))
+    ]))
+    client = TestClient(app)
+
+    first = client.get("/caro")
+    assert first.status_code == status.HTTP_200_OK
+    assert first.headers["x-ratelimit-limit"] == "2"
+    assert first.headers["x-ratelimit-remaining"] == "1"
+    assert client.get("/caro").status_code == status.HTTP_200_OK
+
+    rejected = client.get("/caro")
+    assert rejected.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert rejected.json()["error"] == "Too many requests"
+    assert "retry-after" in rejected.headers
+
+    # API clients have their own budget outside route rules
+    partner = client.get("/barato", headers={"X-API-Key": "key"})
+    assert partner.status_code == status.HTTP_200_OK
+    assert partner.headers["x-ratelimit-limit"] == "600"
+
+
+def test_install_rate_limits_wrong_method():
+    """Test requests answered with 405 are limited by the default rule."""
+    app = FastAPI()
+
+    @app.get("/caro")
+    async def caro():
+        return {"ok": True}
+
+    install_rate_limits(app, RateLimitPolicies(
+        [RateLimitPolicy("t4-caro", 60, burst=2, routes=("/caro",))],
+        default=RateLimiter(limit=60, burst=1, name="t4-default")
+    ))
+    client = TestClient(app)
+
+    assert client.post("/caro").status_code == (
+        status.HTTP_405_METHOD_NOT_ALLOWED
+    )
+    rejected = client.post("/caro")
+    assert rejected.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert client.get("/caro").status_code == status.HTTP_200_OK
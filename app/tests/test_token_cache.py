@@ -0,0 +1,101 @@
+import time
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app.core.metrics import AUTH_TOKEN_CACHE_HIT_RATIO
+from app.core.token_cache import TokenCache
+from app.middleware import auth
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    """Use an empty verification cache."""
+    cache = TokenCache(max_items=10)
+    monkeypatch.setattr(auth, "token_cache", cache)
+    return cache
+
+
+def test_verify_token_skips_decode_on_hit(token_cache, monkeypatch):
+    """Test a token is decoded once and then served from cache."""
+    handler = auth.AuthHandler()
+    token = handler.create_access_token({"sub": "1", "role": "admin"})
+    decode = auth.jwt.decode
+    calls = []
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+
+    first = handler.verify_token(token)
+    first["role"] = "changed"
+    second = auth.AuthHandler().verify_token(token)
+
+    assert len(calls) == 1
+    assert second["role"] == "admin"
+    assert (token_cache.hits, token_cache.misses) == (1, 1)
+    assert (AUTH_TOKEN_CACHE_HIT_RATIO, {}, 0.5) in (
+        token_cache.collect_metrics()
+    )
+
+
+def test_expired_tokens_are_verified_again(token_cache):
+    """Test entries are held only until the token expires."""
+    handler = auth.AuthHandler()
+    token = handler.create_access_token(
+        {"sub": "1"}, expires_delta=timedelta(seconds=1)
+    )
+    handler.verify_token(token)
+
+    key = TokenCache.key(token)
+    payload, _, secret_key = token_cache.entries[key]
+    token_cache.entries[key] = (payload, time.time() - 1, secret_key)
+
+    assert token_cache.get(token, handler.secret_key) is None
+    assert key not in token_cache.entries
+
+
+def test_entries_are_bound_to_the_secret_key(token_cache):
+    """Test a token verified with one key is not accepted for another."""
+    token_cache.set("token", {"sub": "1", "exp": time.time() + 60}, "a")
+
+    assert token_cache.get("token", "a")["sub"] == "1"
+    assert token_cache.get("token", "b") is None
+
+
+def test_token_cache_is_bounded_lru():
+    """Test the least recently used token is evicted first."""
+    cache = TokenCache(max_items=2)
+    expires = time.time() + 60
+    cache.set("a", {"sub": "1", "exp": expires}, "key")
+    cache.set("b", {"sub": "2", "exp": expires}, "key")
+    cache.get("a", "key")
+    cache.set("c", {"sub": "3", "exp": expires}, "key")
+
+    assert cache.get("b", "key") is None
+    assert cache.get("a", "key") is not None
+    # Tokens without expiration are never cached
+    cache.set("d", {"sub": "4"}, "key")
+    assert cache.get("d", "key") is None
+
+
+def test_revocation_hooks_evict_entries(token_cache):
+    """Test revoking a token or a user drops the cached verifications."""
+    expires = time.time() + 60
+    token_cache.set("a", {"sub": "1", "exp": expires}, "key")
+    token_cache.set("b", {"sub": "1", "exp": expires}, "key")
+    token_cache.set("c", {"sub": "2", "exp": expires}, "key")
+
+    assert token_cache.revoke("c")
+    assert not token_cache.revoke("c")
+    assert token_cache.revoke_subject(1) == 2
+    assert not token_cache.entries
+
+
+def test_invalid_tokens_are_not_cached(token_cache):
+    """Test failed verifications are never stored."""
+    with pytest.raises(HTTPException):
+        auth.AuthHandler().verify_token("not-a-token")
+
+    assert not token_cache.entries
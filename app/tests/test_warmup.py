@@ -0,0 +1,77 @@
+import time
+import pytest
+from app.core import warmup
+from app.core.cache import Cache
+from app.core.cache_backends import MemoryBackend
+from app.core.warmup import Dataset, load_dataset, warm_up
+
+
+class FakeSession:
+    """Session stand-in that records whether it was closed."""
+
+    closed = 0
+
+    def close(self):
+        FakeSession.closed += 1
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """Run warm-up against an in-memory cache."""
+    memory_cache = Cache(backend=MemoryBackend())
+    monkeypatch.setattr(warmup, "cache", memory_cache)
+    return memory_cache
+
+
+def slow_loader(db):
+    time.sleep(0.5)
+    return "late"
+
+
+def failing_loader(db):
+    raise RuntimeError("boom")
+
+
+@pytest.mark.anyio
+async def test_warm_up_loads_datasets(memory_cache):
+    """Test datasets are cached and sessions closed."""
+    FakeSession.closed = 0
+    datasets = [
+        Dataset("a", "warm:a", lambda db: [1, 2], tags=("livro",)),
+        Dataset("b", "warm:b", lambda db: {"x": 1})
+    ]
+
+    results = await warm_up(datasets, FakeSession, budget=5, concurrency=1)
+
+    assert results == {"a": "loaded", "b": "loaded"}
+    assert FakeSession.closed == 2
+    assert await memory_cache.get("warm:a") == [1, 2]
+    assert await memory_cache.invalidate_tags("livro") == 1
+    assert await memory_cache.get("warm:a") is None
+
+
+@pytest.mark.anyio
+async def test_warm_up_isolates_failures_and_timeouts(memory_cache):
+    """Test a failing or slow dataset never blocks the others."""
+    datasets = [
+        Dataset("ok", "warm:ok", lambda db: "ok"),
+        Dataset("failed", "warm:failed", failing_loader),
+        Dataset("slow", "warm:slow", slow_loader)
+    ]
+
+    results = await warm_up(datasets, FakeSession, budget=0.2)
+
+    assert results == {"ok": "loaded", "failed": "failed", "slow": "timeout"}
+    assert await memory_cache.get("warm:ok") == "ok"
+    assert await memory_cache.get("warm:failed") is None
+
+
+@pytest.mark.anyio
+async def test_load_dataset_reads_through(memory_cache):
+    """Test the loader only runs on a cache miss."""
+    calls = []
+    dataset = Dataset("a", "warm:a", lambda db: calls.append(1) or len(calls))
+
+    assert await load_dataset(dataset, FakeSession) == 1
+    assert await load_dataset(dataset, FakeSession) == 1
+    assert await load_dataset(dataset, FakeSession, refresh=True) == 2
@@ -0,0 +1,165 @@
+"""Per-request overhead of the HTTP middleware stack.
+
+Drives the ASGI apps directly (no server, no network), so the numbers are
+the cost of the middleware alone. Compares a bare endpoint, the previous
+stack (``BaseHTTPMiddleware`` logging plus two ``@app.middleware("http")``
+layers, logging full headers as JSON twice per request) and the current
+single ASGI ``LoggingMiddleware`` with its JSON access log, unsampled and
+keeping 1% of 2xx.
+
+Usage (from the repository root):
+    python scripts/bench_middleware.py [requests]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.logging import StructuredFormatter  # noqa: E402
+from app.middleware.logging import AccessLog, LoggingMiddleware  # noqa: E402
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/health",
+    "raw_path": b"/health",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+    "client": ("127.0.0.1", 1234),
+    "server": ("bench", 80)
+}
+
+
+def base_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["*"])
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+def legacy_stack() -> FastAPI:
+    """Middleware layout before the single ASGI middleware."""
+    app = base_app()
+    logger = logging.getLogger("bench")
+
+    class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            start_time = time.time()
+            request_id = request.headers.get("X-Request-ID", "N/A")
+            logger.info(f"Request started - ID: {request_id}")
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            logger.info(f"Request completed - ID: {request_id}")
+            response.headers["X-Process-Time"] = str(process_time)
+            response.headers["X-Request-ID"] = request_id
+            return response
+
+    app.add_middleware(LegacyLoggingMiddleware)
+
+    @app.middleware("http")
+    async def add_request_id(request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID", str(time.time()))
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+    # Same payloads as the former RequestLogger
+    @app.middleware("http")
+    async def log_requests(request: Request, call_next):
+        start_time = time.time()
+        log_data = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "request_id": request.headers.get("X-Request-ID", "N/A"),
+            "method": request.method,
+            "path": request.url.path,
+            "query_params": dict(request.query_params),
+            "client_host": request.client.host if request.client else "N/A",
+            "headers": dict(request.headers)
+        }
+        logger.info(f"Request details: {json.dumps(log_data)}")
+        response = await call_next(request)
+        log_data = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "request_id": response.headers.get("X-Request-ID", "N/A"),
+            "status_code": response.status_code,
+            "process_time": time.time() - start_time,
+            "headers": dict(response.headers)
+        }
+        logger.info(f"Response details: {json.dumps(log_data)}")
+        return response
+
+    return app
+
+
+def current_stack(access_log: AccessLog = None) -> FastAPI:
+    app = base_app()
+    app.add_middleware(LoggingMiddleware, access_log=access_log)
+    return app
+
+
+class FormatOnlyHandler(logging.Handler):
+    """Pays for formatting, as the writer thread would, but writes nothing."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.format(record)
+
+
+async def run(app, requests: int) -> float:
+    """Microseconds per request."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(200):
+        await app(dict(SCOPE), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int) -> None:
+    # Logs are measured up to formatting, not the I/O
+    handler = FormatOnlyHandler()
+    handler.setFormatter(StructuredFormatter(settings.LOG_FORMAT))
+    logging.getLogger().handlers.clear()
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+    bare = await run(base_app(), requests)
+    print(f"{'stack':<10}{'us/request':>12}{'overhead':>12}")
+    for name, app in (
+        ("bare", base_app()),
+        ("legacy", legacy_stack()),
+        ("current", current_stack()),
+        ("sampled", current_stack(AccessLog({"2xx": 0.01})))
+    ):
+        cost = await run(app, requests)
+        print(f"{name:<10}{cost:>12.1f}{cost - bare:>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))